@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from api.v1.endpoints import auth, agents, tools, executions, websockets
+from api.v1.endpoints import auth, agents, tools, executions, websockets, admin
 
 api_router = APIRouter()
 
@@ -9,4 +9,5 @@ api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(agents.router, prefix="/agents", tags=["agents"])
 api_router.include_router(tools.router, prefix="/tools", tags=["tools"])
 api_router.include_router(executions.router, prefix="/executions", tags=["executions"])
-api_router.include_router(websockets.router, tags=["websockets"]) 
\ No newline at end of file
+api_router.include_router(websockets.router, tags=["websockets"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"]) 
\ No newline at end of file
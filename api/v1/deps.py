@@ -1,12 +1,14 @@
-from typing import Annotated, Generator
-from fastapi import Depends, HTTPException, status
+from typing import Annotated, Generator, Optional
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
+from core.idempotency import idempotency, request_hash, scoped_key
+from db import reads
 from db.base import get_db
-from models.user import User
 from schemas.user import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login/token")
@@ -19,8 +21,8 @@ TokenDep = Annotated[str, Depends(oauth2_scheme)]
 async def get_current_user(
     db: AsyncSessionDep,
     token: TokenDep,
-) -> User:
-    """Get the current user from the token."""
+) -> Row:
+    """Get the current user row from the token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -34,8 +36,8 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Get user from database
-    user = await db.get(User, token_data.sub)
+    # Get user from database; a plain row is enough for auth checks
+    user = await reads.get_user(db, token_data.sub)
     if not user:
         raise credentials_exception
     if not user.is_active:
@@ -47,8 +49,8 @@ async def get_current_user(
 
 
 async def get_current_active_superuser(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[Row, Depends(get_current_user)],
+) -> Row:
     """Check if the current user is a superuser."""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -58,6 +60,25 @@ async def get_current_active_superuser(
     return current_user
 
 
+async def idempotency_key(
+    request: Request,
+    current_user: Annotated[Row, Depends(get_current_user)],
+    key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+) -> None:
+    """Claim the request's Idempotency-Key, replaying the stored response if it has one.
+
+    The response is recorded against the claim by the idempotency
+    middleware in main.py.
+    """
+    if key is None:
+        return
+    scoped = scoped_key(current_user.id, request.method, request.url.path, key)
+    body_hash = request_hash(await request.body())
+    await idempotency.claim(scoped, body_hash)
+    request.state.idempotency_claim = (scoped, body_hash)
+
+
 # Common dependency types
-CurrentUser = Annotated[User, Depends(get_current_user)]
-CurrentSuperUser = Annotated[User, Depends(get_current_active_superuser)] 
\ No newline at end of file
+CurrentUser = Annotated[Row, Depends(get_current_user)]
+CurrentSuperUser = Annotated[Row, Depends(get_current_active_superuser)]
+IdempotencyKeyDep = Depends(idempotency_key) 
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from api.v1.deps import CurrentSuperUser
+from core.config import settings
+from core.memory import GROUP_BY, snapshots
+from core.metrics import registry
+from core.outbox import toolhouse_outbox
+from core.profiling import SamplingProfiler, profile_lock, request_profiles
+
+router = APIRouter()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    current_user: CurrentSuperUser,
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(settings.PROFILER_INTERVAL_MS, ge=1),
+) -> Any:
+    """Sample the event loop thread for N seconds.
+
+    Returns a collapsed-stack profile that can be fed straight into
+    flamegraph.pl or speedscope.
+    """
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profile duration cannot exceed {settings.PROFILER_MAX_SECONDS} seconds",
+        )
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running",
+        )
+
+    try:
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    finally:
+        profile_lock.release()
+
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"X-Profile-Samples": str(profiler.sample_count)},
+    )
+
+
+@router.get("/profile/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    current_user: CurrentSuperUser,
+    profile_id: str,
+) -> Any:
+    """Get a profile captured for a single request."""
+    collapsed = request_profiles.get(profile_id)
+    if collapsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    return PlainTextResponse(collapsed)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(
+    current_user: CurrentSuperUser,
+) -> Any:
+    """Export in-process metrics in Prometheus text format."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.post("/outbox/retry")
+async def retry_parked_outbox_events(
+    current_user: CurrentSuperUser,
+    entity_type: Optional[str] = Query(None, pattern="^(agent|tool)$"),
+    entity_id: Optional[int] = None,
+) -> Any:
+    """Requeue Toolhouse calls parked after exhausting their retries."""
+    return {"requeued": await toolhouse_outbox.retry_parked(entity_type, entity_id)}
+
+
+@router.get("/memory")
+async def get_memory_status(
+    current_user: CurrentSuperUser,
+) -> Any:
+    """Get tracemalloc state and stored snapshots."""
+    return snapshots.status()
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(
+    current_user: CurrentSuperUser,
+    frames: int = Query(1, ge=1, le=100),
+) -> Any:
+    """Start tracing allocations.
+
+    Tracing slows allocations down noticeably; stop it when done.
+    """
+    snapshots.start(frames)
+    return snapshots.status()
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc(
+    current_user: CurrentSuperUser,
+) -> Any:
+    """Stop tracing allocations and drop stored snapshots."""
+    snapshots.stop()
+    return snapshots.status()
+
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot(
+    current_user: CurrentSuperUser,
+) -> Any:
+    """Take a tracemalloc snapshot."""
+    try:
+        return await asyncio.to_thread(snapshots.take)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    current_user: CurrentSuperUser,
+    base: int,
+    target: Optional[int] = None,
+    group_by: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY)})$"),
+    limit: int = Query(25, ge=1, le=500),
+) -> Any:
+    """Compare two snapshots, largest growth first.
+
+    Without a target, the most recent snapshot is compared to the base.
+    """
+    try:
+        return await asyncio.to_thread(snapshots.diff, base, target, group_by, limit)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Snapshot not found",
+        )
@@ -1,62 +1,100 @@
-from typing import Any, List
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from typing import Any, List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import delete, select
 
-from api.v1.deps import AsyncSessionDep, CurrentUser
+from api.v1.deps import AsyncSessionDep, CurrentUser, IdempotencyKeyDep
+from core.bulk_import import bulk_import, iter_ndjson_lines
+from core.config import settings
+from core.configurations import delete_versions, list_versions, record_configuration
+from core.export import export_response
+from core.fieldsets import parse_fields
+from core.outbox import toolhouse_outbox
+from core.output_stream import output_notifier
+from core.responses import RowJSONResponse
+from core.stats import record_agent_deletion, stats_response
+from core.status_cache import status_cache
 from core.toolhouse import toolhouse_client
+from core.toolsets import tool_sets
+from core.websockets import manager
+from db import reads
+from db.archive import archive
 from models.agent import Agent
+from models.execution import Execution, ExecutionOutputChunk
+from models.rollup import ExecutionRollup, ExecutionRollupLatency
+from models.tool import AgentTool
 from schemas.agent import (
     Agent as AgentSchema,
     AgentCreate,
     AgentUpdate,
     AgentWithTools,
     AgentComplete,
+    AgentSummary,
 )
+from schemas.bulk import BulkImportResult
+from schemas.configuration import ConfigurationVersion
+from schemas.execution import ExecutionSummary
+from schemas.stats import ExecutionStats
 
 router = APIRouter()
 
+# Execution fields embedded in the agent detail response
+RECENT_EXECUTION_FIELDS = ("id", "status", "created_at", "started_at", "completed_at")
 
-@router.get("/", response_model=List[AgentSchema])
+
+@router.get("/", response_model=List[AgentSummary])
 async def list_agents(
     db: AsyncSessionDep,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,status"),
 ) -> Any:
     """List all agents for current user."""
-    query = select(Agent).where(Agent.user_id == current_user.id)
-    if not current_user.is_superuser:
-        query = query.where(Agent.user_id == current_user.id)
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+    names = parse_fields(fields, AgentSummary)
+    rows = await reads.list_rows(db, reads.agents, names, skip, limit, user_id=current_user.id)
+    return RowJSONResponse(rows)
 
 
-@router.post("/", response_model=AgentSchema)
+@router.get("/export")
+async def export_agents(
+    current_user: CurrentUser,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export; defaults to all"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    gzip: bool = False,
+) -> Any:
+    """Stream all of the current user's agents as NDJSON or CSV."""
+    names = parse_fields(fields, AgentSummary)
+    table = reads.agents
+    conditions = [table.c.user_id == current_user.id]
+    if status_filter is not None:
+        conditions.append(table.c.status == status_filter)
+    return export_response(table, names, conditions, format, gzip)
+
+
+@router.post("/", response_model=AgentSchema, dependencies=[IdempotencyKeyDep])
 async def create_agent(
     *,
     db: AsyncSessionDep,
     current_user: CurrentUser,
     agent_in: AgentCreate,
 ) -> Any:
-    """Create a new agent."""
+    """Create a new agent.
+
+    Registration with Toolhouse happens in the background through the
+    outbox; the agent is returned with sync_status "pending_sync".
+    """
     try:
-        # Register agent with Toolhouse
-        toolhouse_agent_id = await toolhouse_client.register_agent(
-            name=agent_in.name,
-            configuration=agent_in.configuration,
-        )
-        
-        # Create agent in database
-        agent = Agent(
-            **agent_in.model_dump(),
-            user_id=current_user.id,
-            toolhouse_agent_id=toolhouse_agent_id,
-        )
+        agent = Agent(**agent_in.model_dump(), user_id=current_user.id)
         db.add(agent)
+        await record_configuration(db, "agent", agent, agent_in.configuration)
+        await toolhouse_outbox.enqueue(db, "agent", agent, "register", {
+            "name": agent_in.name,
+            "configuration": agent_in.configuration,
+        })
         await db.commit()
         await db.refresh(agent)
+        toolhouse_outbox.notify()
         return agent
         
     except Exception as e:
@@ -66,22 +104,40 @@ async def create_agent(
         )
 
 
-@router.get("/{agent_id}", response_model=AgentComplete)
+@router.post("/import", response_model=BulkImportResult)
+async def import_agents(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    request: Request,
+) -> Any:
+    """Create agents in bulk from an NDJSON body, one AgentCreate per line."""
+    return await bulk_import(
+        db,
+        iter_ndjson_lines(request.stream()),
+        AgentCreate,
+        "agent",
+        register=lambda agent_in: toolhouse_client.register_agent(
+            name=agent_in.name,
+            configuration=agent_in.configuration,
+        ),
+        user_id=current_user.id,
+    )
+
+
+@router.get("/{agent_id}", response_model=AgentComplete, response_model_exclude_unset=True)
 async def get_agent(
     *,
     db: AsyncSessionDep,
     current_user: CurrentUser,
     agent_id: int,
+    recent: int = Query(
+        settings.AGENT_RECENT_EXECUTIONS, ge=0, le=100,
+        description="Number of most recent executions to embed",
+    ),
 ) -> Any:
-    """Get agent by ID."""
-    query = (
-        select(Agent)
-        .where(Agent.id == agent_id)
-        .options(
-            selectinload(Agent.agent_tools).selectinload(Agent.tool),
-            selectinload(Agent.executions),
-        )
-    )
+    """Get agent by ID, with its tool set, most recent executions and execution counts."""
+    query = select(Agent).where(Agent.id == agent_id)
     if not current_user.is_superuser:
         query = query.where(Agent.user_id == current_user.id)
     
@@ -93,7 +149,80 @@ async def get_agent(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Agent not found",
         )
-    return agent
+
+    # Embed a bounded page of executions; the full history is paginated separately
+    stats = stats_response(await reads.get_agent_stats(db, agent.id))
+    executions = await reads.list_rows(
+        db, reads.executions, RECENT_EXECUTION_FIELDS, 0, recent,
+        newest_first=True, agent_id=agent.id,
+    )
+    tool_set = await tool_sets.get(db, agent)
+    return {
+        **AgentSchema.model_validate(agent).model_dump(),
+        "tools": tool_set.tools,
+        "tool_set_version": tool_set.version,
+        "executions": executions,
+        "execution_count": stats.run_count,
+        "execution_status_counts": stats.status_counts,
+    }
+
+
+@router.get("/{agent_id}/executions", response_model=List[ExecutionSummary])
+async def list_agent_executions(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    agent_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,created_at"),
+) -> Any:
+    """List an agent's executions, newest first."""
+    names = parse_fields(fields, ExecutionSummary)
+    owner_id = await reads.get_agent_owner(db, agent_id)
+    if owner_id is None or (not current_user.is_superuser and owner_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agent not found",
+        )
+    rows = await reads.list_rows(
+        db, reads.executions, names, skip, limit, newest_first=True, agent_id=agent_id,
+    )
+    return RowJSONResponse(rows)
+
+
+@router.get("/{agent_id}/stats", response_model=ExecutionStats)
+async def get_agent_stats(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    agent_id: int,
+) -> Any:
+    """Get an agent's execution statistics."""
+    owner_id = await reads.get_agent_owner(db, agent_id)
+    if owner_id is None or (not current_user.is_superuser and owner_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agent not found",
+        )
+    return stats_response(await reads.get_agent_stats(db, agent_id))
+
+
+@router.get("/{agent_id}/configurations", response_model=List[ConfigurationVersion])
+async def list_agent_configurations(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    agent_id: int,
+) -> Any:
+    """List the agent's configuration versions, newest first."""
+    owner_id = await reads.get_agent_owner(db, agent_id)
+    if owner_id is None or (not current_user.is_superuser and owner_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agent not found",
+        )
+    return await list_versions(db, "agent", agent_id)
 
 
 @router.put("/{agent_id}", response_model=AgentSchema)
@@ -118,19 +247,22 @@ async def update_agent(
         )
     
     try:
-        # Update agent in Toolhouse if configuration changed
-        if agent_in.configuration is not None and agent.toolhouse_agent_id:
-            await toolhouse_client.update_agent(
-                agent_id=agent.toolhouse_agent_id,
-                configuration=agent_in.configuration,
-            )
-        
         # Update agent attributes
-        for field, value in agent_in.model_dump(exclude_unset=True).items():
+        for field, value in agent_in.model_dump(exclude_unset=True, exclude={"configuration"}).items():
             setattr(agent, field, value)
+
+        # Only a configuration that actually changed is versioned and sent to Toolhouse
+        if (
+            agent_in.configuration is not None
+            and await record_configuration(db, "agent", agent, agent_in.configuration)
+        ):
+            await toolhouse_outbox.enqueue(db, "agent", agent, "update", {
+                "configuration": agent_in.configuration,
+            })
         
         await db.commit()
         await db.refresh(agent)
+        toolhouse_outbox.notify()
         return agent
         
     except Exception as e:
@@ -147,7 +279,7 @@ async def delete_agent(
     current_user: CurrentUser,
     agent_id: int,
 ) -> None:
-    """Delete an agent."""
+    """Delete an agent with its executions, hot and archived, and their stats and rollups."""
     agent = await db.get(Agent, agent_id)
     if not agent:
         raise HTTPException(
@@ -163,5 +295,29 @@ async def delete_agent(
     # Note: We don't delete the agent from Toolhouse as it might be used by other systems
     # or needed for historical data
     
+    # Archived runs live in another database; delete them first so a failure
+    # here leaves the agent in place and the delete can simply be retried
+    execution_ids = await archive.delete_agent_executions(agent.id)
+
+    # Child relationships are passive on delete, so remove children explicitly.
+    # Blobs of the deleted executions are left to the blob collector (db.blob_gc).
+    agent_executions = select(Execution.id).where(Execution.agent_id == agent.id)
+    execution_ids += (await db.execute(agent_executions)).scalars().all()
+    await db.execute(
+        delete(ExecutionOutputChunk).where(ExecutionOutputChunk.execution_id.in_(agent_executions))
+    )
+    await db.execute(delete(Execution).where(Execution.agent_id == agent.id))
+    await record_agent_deletion(db, agent.id)
+    await db.execute(delete(AgentTool).where(AgentTool.agent_id == agent.id))
+    await db.execute(delete(ExecutionRollup).where(ExecutionRollup.agent_id == agent.id))
+    await db.execute(delete(ExecutionRollupLatency).where(ExecutionRollupLatency.agent_id == agent.id))
+    await toolhouse_outbox.discard(db, "agent", agent.id)
+    await delete_versions(db, "agent", agent.id)
     await db.delete(agent)
-    await db.commit() 
\ No newline at end of file
+    await db.commit()
+    tool_sets.discard(agent.id)
+    # Same cleanup as delete_execution, for every execution that went with the agent
+    for execution_id in execution_ids:
+        status_cache.discard(execution_id)
+        manager.discard_output_state(execution_id)
+        output_notifier.notify(execution_id) 
\ No newline at end of file
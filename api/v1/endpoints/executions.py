@@ -1,23 +1,55 @@
-from datetime import datetime
-from typing import Any, List
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
 
-from api.v1.deps import AsyncSessionDep, CurrentUser
+from api.v1.deps import AsyncSessionDep, CurrentUser, IdempotencyKeyDep
+from core.blobstore import blob_store
+from core.export import export_response
+from core.config import settings
+from core.fieldsets import parse_fields
+from core.input_validation import validate_input, validate_inputs
+from core.responses import RowJSONResponse
+from core.rollups import GRANULARITIES, query_analytics
+from core.stats import record_creations, record_deletion, record_status_change
+from core.status_cache import status_cache
+from core.output_stream import output_notifier
 from core.toolhouse import toolhouse_client
+from core.toolsets import tool_sets
 from core.websockets import manager
-from models.execution import Execution
+from db import reads
+from db.archive import archive
+from db.base import get_db_session
+from models.execution import Execution, ExecutionOutputChunk
 from models.agent import Agent
+from schemas.analytics import ExecutionAnalytics
 from schemas.execution import (
     Execution as ExecutionSchema,
     ExecutionCreate,
     ExecutionUpdate,
     ExecutionResult,
+    ExecutionOutputChunk as ExecutionOutputChunkSchema,
+    ExecutionSummary,
+    ExecutionBatchItem,
+    ExecutionBatchResult,
+    ExecutionStatusBatch,
+    ExecutionStatusItem,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Updates after which no further output is broadcast for an execution
+FINAL_UPDATE_TYPES = ("execution_completed", "execution_failed", "execution_cancelled")
+# Statuses after which an execution produces no more output
+TERMINAL_STATUSES = ("completed", "failed")
+
 
 async def send_execution_update(
     execution: Execution,
@@ -28,17 +60,57 @@ async def send_execution_update(
     data = {
         "execution_id": execution.id,
         "status": execution.status,
-        "output_data": execution.output_data,
+        "output_data": await execution.load_payload("output_data"),
         "error_message": execution.error_message,
         "completed_at": execution.completed_at.isoformat() if execution.completed_at else None,
     }
     if additional_data:
         data.update(additional_data)
     
-    # Send to execution-specific subscribers
-    await manager.broadcast_to_execution(execution.id, update_type, data)
-    # Send to user's general connection
-    await manager.broadcast_to_user(execution.user_id, update_type, data)
+    # Send to execution-specific subscribers and the user's general connections
+    await manager.broadcast_execution_update(
+        execution.id,
+        execution.user_id,
+        update_type,
+        data,
+        # Also final when a status refresh, not the worker, saw the execution finish
+        final=update_type in FINAL_UPDATE_TYPES or execution.status in TERMINAL_STATUSES,
+    )
+
+
+async def fetch_output_chunks(
+    db: AsyncSessionDep,
+    execution: Execution,
+    next_seq: int,
+) -> int:
+    """Store and broadcast output chunks Toolhouse produced since next_seq.
+
+    Returns the sequence number of the next expected chunk.
+    """
+    response = await toolhouse_client.get_execution_output(
+        execution.toolhouse_execution_id,
+        after=next_seq,
+    )
+    chunks = response.get("chunks") or []
+    if not chunks:
+        return next_seq
+
+    rows = [
+        ExecutionOutputChunk(execution_id=execution.id, seq=next_seq + offset, data=chunk)
+        for offset, chunk in enumerate(chunks)
+    ]
+    db.add_all(rows)
+    await db.commit()
+    output_notifier.notify(execution.id)
+
+    for row in rows:
+        await manager.broadcast_execution_event(
+            execution.id,
+            execution.user_id,
+            "execution_output_chunk",
+            {"execution_id": execution.id, "seq": row.seq, "data": row.data},
+        )
+    return next_seq + len(rows)
 
 
 async def process_execution(
@@ -53,9 +125,12 @@ async def process_execution(
     
     try:
         # Update status to running
+        previous_status = execution.status
         execution.status = "running"
         execution.started_at = datetime.utcnow()
+        await record_status_change(db, execution, previous_status)
         await db.commit()
+        status_cache.update(execution.id, execution.status)
         await send_execution_update(execution, "execution_started")
         
         # Get agent
@@ -66,7 +141,7 @@ async def process_execution(
         # Start execution in Toolhouse
         toolhouse_execution_id = await toolhouse_client.start_execution(
             agent_id=agent.toolhouse_agent_id,
-            input_data=execution.input_data,
+            input_data=await execution.load_payload("input_data"),
         )
         
         # Update execution with Toolhouse ID
@@ -75,15 +150,34 @@ async def process_execution(
         
         # Poll for execution status
         last_status = execution.status
+        next_seq = 0
+        stream_output = True
         while True:
             status_data = await toolhouse_client.get_execution_status(toolhouse_execution_id)
             current_status = status_data.get("status", "unknown")
+            status_cache.update(execution.id, current_status, status_data.get("progress"))
+            
+            # Pick up partial output produced since the last poll
+            if stream_output:
+                try:
+                    next_seq = await fetch_output_chunks(db, execution, next_seq)
+                except SQLAlchemyError:
+                    # The session is unusable until rolled back, and the rollback
+                    # drops uncommitted status changes; fail the run below
+                    await db.rollback()
+                    raise
+                except Exception as e:
+                    logger.warning(f"Disabling output streaming for execution {execution.id}: {e}")
+                    stream_output = False
             
             # Send update if status changed
             if current_status != last_status:
                 execution.status = current_status
-                execution.output_data = status_data.get("output_data")
+                await execution.set_payload("output_data", status_data.get("output_data"))
                 execution.error_message = status_data.get("error_message")
+                if current_status in TERMINAL_STATUSES:
+                    execution.completed_at = datetime.utcnow()
+                await record_status_change(db, execution, last_status)
                 await send_execution_update(
                     execution,
                     "execution_status_changed",
@@ -91,12 +185,10 @@ async def process_execution(
                 )
                 last_status = current_status
             
-            if current_status in ["completed", "failed"]:
-                execution.completed_at = datetime.utcnow()
+            if current_status in TERMINAL_STATUSES:
                 break
             
             # Add a small delay between polls
-            import asyncio
             await asyncio.sleep(2)
         
         # Send final update
@@ -106,31 +198,129 @@ async def process_execution(
         )
         
     except Exception as e:
+        # Start over from the stored state: a failed flush or commit leaves the
+        # session unusable, and stats must match the status actually stored
+        await db.rollback()
+        await db.refresh(execution)
+        previous_status = execution.status
         execution.status = "failed"
         execution.error_message = str(e)
         execution.completed_at = datetime.utcnow()
+        await record_status_change(db, execution, previous_status)
         await send_execution_update(execution, "execution_failed")
     
     await db.commit()
+    status_cache.discard(execution.id)
+    output_notifier.notify(execution.id)
 
 
-@router.get("/", response_model=List[ExecutionSchema])
+async def process_executions(execution_ids: List[int]) -> None:
+    """Process a batch of executions concurrently, each in its own session."""
+    async def process_one(execution_id: int) -> None:
+        async with get_db_session() as session:
+            await process_execution(session, execution_id)
+
+    await asyncio.gather(*(process_one(execution_id) for execution_id in execution_ids))
+
+
+@router.get("/", response_model=List[ExecutionSummary])
 async def list_executions(
     db: AsyncSessionDep,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,created_at"),
 ) -> Any:
     """List all executions."""
-    query = select(Execution)
+    names = parse_fields(fields, ExecutionSummary)
+    owner_id = None if current_user.is_superuser else current_user.id
+    rows = await reads.list_rows(db, reads.executions, names, skip, limit, user_id=owner_id)
+    return RowJSONResponse(rows)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Normalize to the naive UTC datetimes executions are stored with."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Declared before /{execution_id} so "export" and "analytics" are not parsed as IDs
+@router.get("/export")
+async def export_executions(
+    current_user: CurrentUser,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export; defaults to all"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    agent_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    gzip: bool = False,
+) -> Any:
+    """Stream all matching executions as NDJSON or CSV."""
+    names = parse_fields(fields, ExecutionSummary)
+    table = reads.executions
+    conditions = []
     if not current_user.is_superuser:
-        query = query.where(Execution.user_id == current_user.id)
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+        conditions.append(table.c.user_id == current_user.id)
+    if status_filter is not None:
+        conditions.append(table.c.status == status_filter)
+    if agent_id is not None:
+        conditions.append(table.c.agent_id == agent_id)
+    if created_after is not None:
+        conditions.append(table.c.created_at >= _naive_utc(created_after))
+    if created_before is not None:
+        conditions.append(table.c.created_at < _naive_utc(created_before))
+    return export_response(table, names, conditions, format, gzip)
 
 
-@router.post("/", response_model=ExecutionSchema)
+@router.get("/analytics", response_model=ExecutionAnalytics)
+async def get_execution_analytics(
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    granularity: str = Query("hour", pattern="^(minute|hour|day)$"),
+    start: Optional[datetime] = Query(None, description="Defaults to 60 buckets before end"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    agent_id: Optional[int] = None,
+    user_id: Optional[int] = Query(None, description="Superusers only; others see their own executions"),
+    percentiles: str = Query("50,90,99", description="Comma-separated latency percentiles"),
+) -> Any:
+    """Execution counts, failure rates and latency percentiles per time bucket.
+
+    Answered from the rollup tables, never by scanning executions.
+    """
+    width = GRANULARITIES[granularity]
+    end = _naive_utc(end) if end else datetime.utcnow()
+    start = _naive_utc(start) if start else end - 60 * width
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    if (end - start) / width > settings.ROLLUP_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range spans more than {settings.ROLLUP_MAX_BUCKETS} {granularity} buckets",
+        )
+    try:
+        quantiles = [float(p) / 100 for p in percentiles.split(",") if p.strip()]
+    except ValueError:
+        quantiles = []
+    if not quantiles or not all(0 <= q <= 1 for q in quantiles):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="percentiles must be comma-separated numbers between 0 and 100",
+        )
+    if not current_user.is_superuser:
+        user_id = current_user.id
+
+    buckets = await query_analytics(
+        db, granularity, start, end, quantiles, user_id=user_id, agent_id=agent_id,
+    )
+    return ExecutionAnalytics(granularity=granularity, start=start, end=end, buckets=buckets)
+
+
+@router.post("/", response_model=ExecutionSchema, dependencies=[IdempotencyKeyDep])
 async def create_execution(
     *,
     db: AsyncSessionDep,
@@ -154,18 +344,36 @@ async def create_execution(
     
     # Check if agent is registered with Toolhouse
     if not agent.toolhouse_agent_id:
+        if agent.sync_status == "pending_sync":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Agent registration with Toolhouse is still pending; retry shortly",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Agent not registered with Toolhouse",
         )
     
+    tool_set = await tool_sets.get(db, agent)
+    input_errors = validate_input(tool_set, execution_in.input_data)
+    if input_errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=input_errors,
+        )
     execution = Execution(
-        **execution_in.model_dump(),
+        **execution_in.model_dump(exclude={"input_data"}),
         user_id=current_user.id,
+        tool_set_version=tool_set.version,
     )
+    await execution.set_payload("input_data", execution_in.input_data)
     db.add(execution)
+    await db.flush()
+    await record_status_change(db, execution, None)
     await db.commit()
     await db.refresh(execution)
+    # Attach the loaded agent so serializing the response doesn't lazy-load it
+    execution.agent = agent
     
     # Send creation notification
     await send_execution_update(execution, "execution_created")
@@ -176,6 +384,131 @@ async def create_execution(
     return execution
 
 
+@router.post("/batch", response_model=ExecutionBatchResult, dependencies=[IdempotencyKeyDep])
+async def create_executions(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    executions_in: List[ExecutionCreate],
+    background_tasks: BackgroundTasks,
+) -> Any:
+    """Create many executions at once.
+
+    Each one is checked like in create_execution; those that fail are
+    reported per item and the rest are created and started.
+    """
+    if len(executions_in) > settings.EXECUTION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.EXECUTION_BATCH_MAX_SIZE} executions per batch",
+        )
+
+    agent_ids = {execution_in.agent_id for execution_in in executions_in}
+    agents = {
+        agent.id: agent
+        for agent in (await db.execute(select(Agent).where(Agent.id.in_(agent_ids)))).scalars()
+    }
+
+    results: List[ExecutionBatchItem] = []
+    accepted = []
+    for index, execution_in in enumerate(executions_in):
+        agent = agents.get(execution_in.agent_id)
+        error = None
+        if not agent or (not current_user.is_superuser and agent.user_id != current_user.id):
+            error = "Agent not found"
+        elif not agent.toolhouse_agent_id:
+            error = "Agent not registered with Toolhouse"
+        if error:
+            results.append(ExecutionBatchItem(index=index, status="rejected", error=error))
+            continue
+        accepted.append((index, execution_in, await tool_sets.get(db, agent)))
+
+    # Large batches are validated in a worker thread to keep the event loop free
+    input_errors = await validate_inputs(
+        [(tool_set, execution_in.input_data) for _, execution_in, tool_set in accepted]
+    )
+    created = []
+    for (index, execution_in, tool_set), errors in zip(accepted, input_errors):
+        if errors:
+            results.append(ExecutionBatchItem(
+                index=index,
+                status="invalid",
+                error="Input does not match tool schemas",
+                input_errors=errors,
+            ))
+            continue
+        execution = Execution(
+            **execution_in.model_dump(exclude={"input_data"}),
+            user_id=current_user.id,
+            tool_set_version=tool_set.version,
+        )
+        await execution.set_payload("input_data", execution_in.input_data)
+        db.add(execution)
+        created.append((index, execution))
+
+    if created:
+        await db.flush()
+        await record_creations(db, [execution for _, execution in created])
+        await db.commit()
+    for index, execution in created:
+        results.append(ExecutionBatchItem(index=index, status="created", id=execution.id))
+        await send_execution_update(execution, "execution_created")
+
+    if created:
+        background_tasks.add_task(process_executions, [execution.id for _, execution in created])
+
+    results.sort(key=lambda item: item.index)
+    return ExecutionBatchResult(
+        created=len(created),
+        failed=len(executions_in) - len(created),
+        results=results,
+    )
+
+
+@router.post("/status:batch", response_model=List[ExecutionStatusItem])
+async def get_execution_statuses(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    lookup: ExecutionStatusBatch,
+) -> Any:
+    """Get the status of many executions at once.
+
+    Answered from the database in one query, with running executions
+    filled in from the latest Toolhouse poll. Unknown IDs are left out.
+    """
+    if len(lookup.ids) > settings.EXECUTION_STATUS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.EXECUTION_STATUS_BATCH_MAX_IDS} IDs per lookup",
+        )
+    owner_id = None if current_user.is_superuser else current_user.id
+    execution_ids = list(dict.fromkeys(lookup.ids))
+    rows = {
+        row.id: row
+        for row in await reads.get_execution_statuses(db, execution_ids, owner_id)
+    }
+
+    items = []
+    for execution_id in execution_ids:
+        row = rows.get(execution_id)
+        if row is None:
+            continue
+        execution_status = row.status
+        progress = 1.0 if execution_status == "completed" else None
+        cached = status_cache.get(execution_id) if execution_status not in TERMINAL_STATUSES else None
+        if cached is not None:
+            execution_status = cached.status
+            progress = cached.progress
+        items.append({
+            "id": execution_id,
+            "status": execution_status,
+            "progress": progress,
+            "completed_at": row.completed_at,
+        })
+    return RowJSONResponse(items)
+
+
 @router.get("/{execution_id}", response_model=ExecutionSchema)
 async def get_execution(
     *,
@@ -184,23 +517,14 @@ async def get_execution(
     execution_id: int,
 ) -> Any:
     """Get execution by ID."""
-    query = (
-        select(Execution)
-        .where(Execution.id == execution_id)
-        .options(selectinload(Execution.agent))
-    )
-    if not current_user.is_superuser:
-        query = query.where(Execution.user_id == current_user.id)
-    
-    result = await db.execute(query)
-    execution = result.scalar_one_or_none()
-    
+    owner_id = None if current_user.is_superuser else current_user.id
+    execution = await reads.get_execution(db, execution_id, owner_id)
     if not execution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Execution not found",
         )
-    return execution
+    return RowJSONResponse(execution)
 
 
 @router.get("/{execution_id}/result", response_model=ExecutionResult)
@@ -211,62 +535,219 @@ async def get_execution_result(
     execution_id: int,
 ) -> Any:
     """Get execution result."""
-    execution = await get_execution(
-        db=db,
-        current_user=current_user,
-        execution_id=execution_id,
-    )
-    
+    owner_id = None if current_user.is_superuser else current_user.id
+    row = await reads.get_execution_result(db, execution_id, owner_id)
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Execution not found",
+        )
+
     # If execution has Toolhouse ID and is still running, get latest status
-    if execution.toolhouse_execution_id and execution.status == "running":
-        try:
-            status_data = await toolhouse_client.get_execution_status(
-                execution.toolhouse_execution_id
+    if row.toolhouse_execution_id and row.status == "running":
+        execution = await db.get(Execution, execution_id)
+        await refresh_execution_status(db, execution)
+        if execution.output_blob is None:
+            return ExecutionResult(
+                execution_id=execution.id,
+                status=execution.status,
+                output_data=execution.output_data,
+                error_message=execution.error_message,
+                completed_at=execution.completed_at,
             )
-            current_status = status_data.get("status", execution.status)
-            
-            if current_status != execution.status:
-                execution.status = current_status
-                execution.output_data = status_data.get("output_data")
-                execution.error_message = status_data.get("error_message")
-                if current_status in ["completed", "failed"]:
-                    execution.completed_at = datetime.utcnow()
-                await db.commit()
-                
-                # Send status update
-                await send_execution_update(
-                    execution,
-                    "execution_status_changed",
-                    {"previous_status": execution.status}
-                )
+        row = execution
+
+    if row.output_blob is not None:
+        return stream_result_from_blob(row)
+
+    return RowJSONResponse({
+        "execution_id": row.id,
+        "status": row.status,
+        "output_data": row.output_data,
+        "error_message": row.error_message,
+        "completed_at": row.completed_at,
+    })
+
+
+async def refresh_execution_status(db: AsyncSessionDep, execution: Execution) -> None:
+    """Pull the latest status of a running execution from Toolhouse."""
+    try:
+        status_data = await toolhouse_client.get_execution_status(
+            execution.toolhouse_execution_id
+        )
+        current_status = status_data.get("status", execution.status)
         
-        except Exception:
-            # If we can't get the status, return the current execution data
-            pass
+        if current_status != execution.status:
+            previous_status = execution.status
+            execution.status = current_status
+            await execution.set_payload("output_data", status_data.get("output_data"))
+            execution.error_message = status_data.get("error_message")
+            if current_status in TERMINAL_STATUSES:
+                execution.completed_at = datetime.utcnow()
+            await record_status_change(db, execution, previous_status)
+            await db.commit()
+            
+            # Send status update
+            await send_execution_update(
+                execution,
+                "execution_status_changed",
+                {"previous_status": execution.status}
+            )
     
-    return ExecutionResult(
+    except Exception:
+        # If we can't get the status, return the current execution data
+        pass
+
+
+def stream_result_from_blob(execution: Any) -> StreamingResponse:
+    """Serve an ExecutionResult whose output_data is streamed straight from the blob store."""
+    result = ExecutionResult(
         execution_id=execution.id,
         status=execution.status,
-        output_data=execution.output_data,
         error_message=execution.error_message,
         completed_at=execution.completed_at,
     )
+    head = result.model_dump_json(exclude={"output_data"})[:-1] + ',"output_data":'
 
+    def body() -> Iterator[bytes]:
+        yield head.encode()
+        yield from blob_store.iter_bytes(execution.output_blob)
+        yield b"}"
 
-@router.delete("/{execution_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_execution(
+    return StreamingResponse(body(), media_type="application/json")
+
+
+async def stream_output_chunks(
+    execution_id: int,
+    after: int,
+    sse: bool,
+) -> AsyncIterator[str]:
+    """Yield stored output chunks, then new ones as they arrive.
+
+    Each round uses a short-lived session so an idle stream holds no DB
+    connection. Ends once the execution is finished and fully sent.
+    """
+    seq = after
+    while True:
+        event = output_notifier.event(execution_id)
+        async with get_db_session() as session:
+            # Read the status first: chunks are committed before the final status
+            execution_status = (await session.execute(
+                select(Execution.status).where(Execution.id == execution_id)
+            )).scalar_one_or_none()
+            chunks = (await session.execute(
+                select(ExecutionOutputChunk)
+                .where(
+                    ExecutionOutputChunk.execution_id == execution_id,
+                    ExecutionOutputChunk.seq >= seq,
+                )
+                .order_by(ExecutionOutputChunk.seq)
+                .limit(settings.OUTPUT_STREAM_BATCH_SIZE)
+            )).scalars().all()
+        if execution_status is None:
+            # Archived executions are finished: send whatever the archive holds
+            archived = await archive.get_execution(execution_id)
+            if archived is not None:
+                execution_status = archived.status
+                chunks = await archive.get_chunks(execution_id, seq)
+
+        for chunk in chunks:
+            payload = ExecutionOutputChunkSchema.model_validate(chunk).model_dump_json()
+            if sse:
+                yield f"id: {chunk.seq}\nevent: chunk\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+            seq = chunk.seq + 1
+
+        if len(chunks) == settings.OUTPUT_STREAM_BATCH_SIZE:
+            continue
+        if execution_status is None or execution_status in TERMINAL_STATUSES:
+            if sse:
+                end = json.dumps({"execution_id": execution_id, "status": execution_status})
+                yield f"event: end\ndata: {end}\n\n"
+            return
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout=settings.OUTPUT_STREAM_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            if sse:
+                yield ": keep-alive\n\n"
+
+
+@router.get("/{execution_id}/output")
+async def stream_execution_output(
     *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    request: Request,
+    execution_id: int,
+    after: int = Query(0, ge=0),
+    last_event_id: Optional[str] = Header(None),
+) -> Any:
+    """Stream execution output chunks as they are produced.
+
+    Responds with NDJSON, or with Server-Sent Events when the client
+    accepts text/event-stream (resumable through Last-Event-ID).
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    query = select(Execution.id).where(Execution.id == execution_id)
+    if owner_id is not None:
+        query = query.where(Execution.user_id == owner_id)
+    if (
+        (await db.execute(query)).scalar_one_or_none() is None
+        and await archive.get_execution(execution_id, owner_id) is None
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Execution not found",
+        )
+
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    if sse and last_event_id and last_event_id.isdigit():
+        after = int(last_event_id) + 1
+
+    return StreamingResponse(
+        stream_output_chunks(execution_id, after, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def delete_archived_execution(
     db: AsyncSessionDep,
     current_user: CurrentUser,
     execution_id: int,
 ) -> None:
-    """Delete an execution."""
-    execution = await db.get(Execution, execution_id)
-    if not execution:
+    """Delete an execution from the archive; archived executions still count in stats."""
+    archived = await archive.get_execution(execution_id)
+    if archived is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Execution not found",
         )
+    if not current_user.is_superuser and archived.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    await archive.delete_execution(execution_id)
+    await record_deletion(db, archived)
+    await db.commit()
+    manager.discard_output_state(execution_id)
+
+
+@router.delete("/{execution_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_execution(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    execution_id: int,
+) -> None:
+    """Delete an execution, whether hot or archived."""
+    execution = await db.get(Execution, execution_id)
+    if not execution:
+        await delete_archived_execution(db, current_user, execution_id)
+        return
     if not current_user.is_superuser and execution.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -287,5 +768,12 @@ async def delete_execution(
             # Continue with deletion even if we can't stop the execution
             pass
     
+    await db.execute(
+        delete(ExecutionOutputChunk).where(ExecutionOutputChunk.execution_id == execution_id)
+    )
+    await record_deletion(db, execution)
     await db.delete(execution)
-    await db.commit() 
\ No newline at end of file
+    await db.commit()
+    status_cache.discard(execution_id)
+    manager.discard_output_state(execution_id)
+    output_notifier.notify(execution_id) 
\ No newline at end of file
@@ -1,12 +1,22 @@
-from typing import Any, List
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
+from typing import Any, List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import delete, select
 from sqlalchemy.orm import selectinload
 
-from api.v1.deps import AsyncSessionDep, CurrentUser
+from api.v1.deps import AsyncSessionDep, CurrentUser, IdempotencyKeyDep
+from core.bulk_import import bulk_import, iter_ndjson_lines
+from core.configurations import delete_versions, list_versions, record_configuration
+from core.export import export_response
+from core.fieldsets import parse_fields
+from core.outbox import toolhouse_outbox
+from core.responses import RowJSONResponse
+from core.stats import record_tool_change, stats_response, tool_enabled
 from core.toolhouse import toolhouse_client
+from core.toolsets import TOOL_SNAPSHOT_FIELDS, invalidate_agent, invalidate_tool
+from db import reads
 from models.tool import Tool, AgentTool
 from models.agent import Agent
+from models.stats import ToolStats
 from schemas.tool import (
     Tool as ToolSchema,
     ToolCreate,
@@ -15,52 +25,73 @@ from schemas.tool import (
     AgentToolCreate,
     AgentToolUpdate,
     ToolWithAgents,
+    ToolSummary,
 )
+from schemas.bulk import BulkImportResult
+from schemas.configuration import ConfigurationVersion
+from schemas.stats import ExecutionStats
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[ToolSchema])
+@router.get("/", response_model=List[ToolSummary])
 async def list_tools(
     db: AsyncSessionDep,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,version"),
 ) -> Any:
     """List all tools."""
-    query = select(Tool)
+    names = parse_fields(fields, ToolSummary)
+    owner_id = None if current_user.is_superuser else current_user.id
+    rows = await reads.list_rows(db, reads.tools, names, skip, limit, user_id=owner_id)
+    return RowJSONResponse(rows)
+
+
+@router.get("/export")
+async def export_tools(
+    current_user: CurrentUser,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export; defaults to all"),
+    name: Optional[str] = None,
+    gzip: bool = False,
+) -> Any:
+    """Stream all matching tools as NDJSON or CSV."""
+    names = parse_fields(fields, ToolSummary)
+    table = reads.tools
+    conditions = []
     if not current_user.is_superuser:
-        query = query.where(Tool.user_id == current_user.id)
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+        conditions.append(table.c.user_id == current_user.id)
+    if name is not None:
+        conditions.append(table.c.name == name)
+    return export_response(table, names, conditions, format, gzip)
 
 
-@router.post("/", response_model=ToolSchema)
+@router.post("/", response_model=ToolSchema, dependencies=[IdempotencyKeyDep])
 async def create_tool(
     *,
     db: AsyncSessionDep,
     current_user: CurrentUser,
     tool_in: ToolCreate,
 ) -> Any:
-    """Create a new tool."""
+    """Create a new tool.
+
+    Registration with Toolhouse happens in the background through the
+    outbox; the tool is returned with sync_status "pending_sync".
+    """
     try:
-        # Register tool with Toolhouse
-        toolhouse_tool_id = await toolhouse_client.register_tool(
-            name=tool_in.name,
-            schema=tool_in.schema,
-            configuration=tool_in.configuration,
-        )
-        
-        # Create tool in database
-        tool = Tool(
-            **tool_in.model_dump(),
-            user_id=current_user.id,
-            toolhouse_tool_id=toolhouse_tool_id,
-        )
+        tool = Tool(**tool_in.model_dump(), user_id=current_user.id)
         db.add(tool)
+        await record_configuration(db, "tool", tool, tool_in.configuration)
+        await toolhouse_outbox.enqueue(db, "tool", tool, "register", {
+            "name": tool_in.name,
+            "schema": tool_in.schema,
+            "configuration": tool_in.configuration,
+        })
         await db.commit()
         await db.refresh(tool)
+        toolhouse_outbox.notify()
         return tool
         
     except Exception as e:
@@ -70,6 +101,28 @@ async def create_tool(
         )
 
 
+@router.post("/import", response_model=BulkImportResult)
+async def import_tools(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    request: Request,
+) -> Any:
+    """Create tools in bulk from an NDJSON body, one ToolCreate per line."""
+    return await bulk_import(
+        db,
+        iter_ndjson_lines(request.stream()),
+        ToolCreate,
+        "tool",
+        register=lambda tool_in: toolhouse_client.register_tool(
+            name=tool_in.name,
+            schema=tool_in.schema,
+            configuration=tool_in.configuration,
+        ),
+        user_id=current_user.id,
+    )
+
+
 @router.get("/{tool_id}", response_model=ToolWithAgents)
 async def get_tool(
     *,
@@ -81,7 +134,7 @@ async def get_tool(
     query = (
         select(Tool)
         .where(Tool.id == tool_id)
-        .options(selectinload(Tool.agent_tools).selectinload(Tool.agent))
+        .options(selectinload(Tool.agent_tools).selectinload(AgentTool.agent))
     )
     if not current_user.is_superuser:
         query = query.where(Tool.user_id == current_user.id)
@@ -94,7 +147,44 @@ async def get_tool(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tool not found",
         )
-    return tool
+    return {
+        **ToolSchema.model_validate(tool).model_dump(),
+        "agents": [agent_tool.agent for agent_tool in tool.agent_tools],
+    }
+
+
+@router.get("/{tool_id}/stats", response_model=ExecutionStats)
+async def get_tool_stats(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    tool_id: int,
+) -> Any:
+    """Get a tool's execution statistics across the agents using it."""
+    owner_id = await reads.get_tool_owner(db, tool_id)
+    if owner_id is None or (not current_user.is_superuser and owner_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tool not found",
+        )
+    return stats_response(await reads.get_tool_stats(db, tool_id))
+
+
+@router.get("/{tool_id}/configurations", response_model=List[ConfigurationVersion])
+async def list_tool_configurations(
+    *,
+    db: AsyncSessionDep,
+    current_user: CurrentUser,
+    tool_id: int,
+) -> Any:
+    """List the tool's configuration versions, newest first."""
+    owner_id = await reads.get_tool_owner(db, tool_id)
+    if owner_id is None or (not current_user.is_superuser and owner_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tool not found",
+        )
+    return await list_versions(db, "tool", tool_id)
 
 
 @router.put("/{tool_id}", response_model=ToolSchema)
@@ -119,19 +209,29 @@ async def update_tool(
         )
     
     try:
-        # Update tool in Toolhouse if configuration changed
-        if tool_in.configuration is not None and tool.toolhouse_tool_id:
-            await toolhouse_client.update_tool(
-                tool_id=tool.toolhouse_tool_id,
-                configuration=tool_in.configuration,
-            )
-        
         # Update tool attributes
-        for field, value in tool_in.model_dump(exclude_unset=True).items():
+        snapshot_changed = False
+        for field, value in tool_in.model_dump(exclude_unset=True, exclude={"configuration"}).items():
+            if field in TOOL_SNAPSHOT_FIELDS and getattr(tool, field) != value:
+                snapshot_changed = True
             setattr(tool, field, value)
+
+        # Only a configuration that actually changed is versioned and sent to Toolhouse
+        if (
+            tool_in.configuration is not None
+            and await record_configuration(db, "tool", tool, tool_in.configuration)
+        ):
+            snapshot_changed = True
+            await toolhouse_outbox.enqueue(db, "tool", tool, "update", {
+                "configuration": tool_in.configuration,
+            })
+        # Agents' cached tool sets stay valid across no-op updates
+        if snapshot_changed:
+            await invalidate_tool(db, tool.id)
         
         await db.commit()
         await db.refresh(tool)
+        toolhouse_outbox.notify()
         return tool
         
     except Exception as e:
@@ -164,6 +264,12 @@ async def delete_tool(
     # Note: We don't delete the tool from Toolhouse as it might be used by other systems
     # or needed for historical data
     
+    # Child relationships are passive on delete, so remove children explicitly
+    await invalidate_tool(db, tool.id)
+    await db.execute(delete(AgentTool).where(AgentTool.tool_id == tool.id))
+    await db.execute(delete(ToolStats).where(ToolStats.tool_id == tool.id))
+    await toolhouse_outbox.discard(db, "tool", tool.id)
+    await delete_versions(db, "tool", tool.id)
     await db.delete(tool)
     await db.commit()
 
@@ -195,12 +301,16 @@ async def create_agent_tool(
                 detail="Not enough permissions",
             )
     
+    was_enabled = await tool_enabled(db, agent.id, tool.id)
     agent_tool = AgentTool(
         **agent_tool_in.model_dump(),
     )
     db.add(agent_tool)
+    await record_tool_change(db, agent.id, tool.id, was_enabled)
+    await invalidate_agent(db, agent.id)
     await db.commit()
     await db.refresh(agent_tool)
+    await db.refresh(agent_tool, ["tool"])
     return agent_tool
 
 
@@ -229,11 +339,15 @@ async def update_agent_tool(
         )
     
     # Update attributes
+    was_enabled = await tool_enabled(db, agent.id, agent_tool.tool_id)
     for field, value in agent_tool_in.model_dump(exclude_unset=True).items():
         setattr(agent_tool, field, value)
+    await record_tool_change(db, agent.id, agent_tool.tool_id, was_enabled)
+    await invalidate_agent(db, agent.id)
     
     await db.commit()
     await db.refresh(agent_tool)
+    await db.refresh(agent_tool, ["tool"])
     return agent_tool
 
 
@@ -260,5 +374,8 @@ async def delete_agent_tool(
             detail="Not enough permissions",
         )
     
+    was_enabled = await tool_enabled(db, agent.id, agent_tool.tool_id)
     await db.delete(agent_tool)
+    await record_tool_change(db, agent.id, agent_tool.tool_id, was_enabled)
+    await invalidate_agent(db, agent.id)
     await db.commit() 
\ No newline at end of file
@@ -1,9 +1,38 @@
+"""WebSocket endpoints.
+
+Server messages are `{"type": ..., "data": ...}` objects. Clients may send
+these control messages:
+
+- `{"type": "ping", "data": <any>}`: answered with `{"type": "pong", "data": <same>}`
+- `{"type": "pong"}`: reply to a server ping; no response
+- `{"type": "resync", "data": {"execution_id": <id>}}`: answered with an
+  `execution_snapshot` carrying the full `output_data` and `output_version`
+
+Execution updates carry `output_version`. When the socket already holds the
+previous version they carry an RFC 6902 `output_patch` against
+`base_version` instead of `output_data`; a client whose version does not
+match `base_version` should send `resync`.
+
+Clients pick a wire format at connect time with the `encoding` (`json` or
+`msgpack`) and `compression` (`none` or `deflate`) query parameters. Plain
+JSON is sent as text frames; every other format as binary frames, with
+`deflate` meaning raw DEFLATE compressed once per broadcast. Transport-level
+permessage-deflate is negotiated by the ASGI server independently.
+
+Control messages are JSON text frames in every wire format; binary frames
+are answered with an error. Any client message counts as liveness. The server pings quiet sockets every
+WS_PING_INTERVAL seconds and closes those silent for WS_IDLE_TIMEOUT.
+"""
+import json
 from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
 from jose import jwt, JWTError
 
 from core.config import settings
-from core.websockets import manager
+from core.websockets import Connection, ConnectionLimitExceeded, SendQueueFull, manager
+from core.ws_codec import negotiate_format
+from db import reads
+from db.base import get_db_session
 from schemas.user import TokenPayload
 
 router = APIRouter()
@@ -24,28 +53,91 @@ async def get_user_id_from_token(token: str) -> int:
         )
 
 
+async def can_access_execution(user_id: int, execution_id: int) -> bool:
+    """Whether a user may watch an execution: it exists and is theirs, or they are a superuser."""
+    async with get_db_session() as db:
+        user = await reads.get_user(db, user_id)
+        if user is None or not user.is_active:
+            return False
+        owner_id = None if user.is_superuser else user.id
+        return bool(await reads.get_execution_statuses(db, [execution_id], owner_id))
+
+
+async def handle_control_message(connection: Connection, text: str) -> None:
+    """Handle one client control message."""
+    try:
+        message = json.loads(text)
+    except ValueError:
+        message = None
+    if not isinstance(message, dict):
+        await connection.send({"type": "error", "data": {"message": "Invalid message"}})
+        return
+    message_type = message.get("type")
+
+    if message_type == "ping":
+        await connection.send({"type": "pong", "data": message.get("data")})
+    elif message_type == "pong":
+        return
+    elif message_type == "resync":
+        data = message.get("data")
+        execution_id = data.get("execution_id") if isinstance(data, dict) else None
+        if type(execution_id) is not int or not manager.can_view(connection, execution_id):
+            await connection.send({"type": "error", "data": {"message": "Invalid execution_id"}})
+            return
+        if not await can_access_execution(connection.user_id, execution_id):
+            await manager.close(connection, status.WS_1008_POLICY_VIOLATION, "Not allowed to view this execution")
+            return
+        await manager.send_snapshot(connection, execution_id)
+    else:
+        await connection.send({
+            "type": "error",
+            "data": {"message": f"Unknown message type: {message_type}"},
+        })
+
+
+async def receive_loop(connection: Connection) -> None:
+    """Read client messages until the socket goes away."""
+    try:
+        while True:
+            frame = await connection.websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", status.WS_1000_NORMAL_CLOSURE))
+            manager.touch(connection)
+            if frame.get("text") is None:
+                # Control messages are JSON text whatever wire format the server sends
+                await connection.send({
+                    "type": "error",
+                    "data": {"message": "Control messages must be JSON text frames"},
+                })
+                continue
+            await handle_control_message(connection, frame["text"])
+    except (WebSocketDisconnect, SendQueueFull, RuntimeError):
+        # RuntimeError: socket already closed by the heartbeat reaper
+        pass
+    finally:
+        await manager.disconnect(connection.websocket)
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
     token: str,
+    encoding: Optional[str] = None,
+    compression: Optional[str] = None,
 ) -> None:
     """General WebSocket endpoint for user updates."""
     try:
         user_id = await get_user_id_from_token(token)
-        await manager.connect(websocket, user_id)
-        
-        try:
-            while True:
-                # Wait for messages (can be used for ping/pong or client requests)
-                data = await websocket.receive_json()
-                # Handle client messages if needed
-                await websocket.send_json({"status": "received"})
-                
-        except WebSocketDisconnect:
-            await manager.disconnect(websocket, user_id)
+        wire_format = negotiate_format(encoding, compression)
+        connection = await manager.connect(websocket, user_id, wire_format=wire_format)
+        await receive_loop(connection)
             
+    except ValueError as e:
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=str(e))
     except HTTPException:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    except ConnectionLimitExceeded as e:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(e))
 
 
 @router.websocket("/ws/executions/{execution_id}")
@@ -53,30 +145,36 @@ async def execution_websocket_endpoint(
     websocket: WebSocket,
     execution_id: int,
     token: str,
+    encoding: Optional[str] = None,
+    compression: Optional[str] = None,
 ) -> None:
-    """WebSocket endpoint for specific execution updates."""
+    """WebSocket endpoint for updates of one execution the user owns."""
     try:
         user_id = await get_user_id_from_token(token)
-        await manager.connect(websocket, user_id, execution_id)
+        if not await can_access_execution(user_id, execution_id):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        wire_format = negotiate_format(encoding, compression)
+        connection = await manager.connect(websocket, user_id, execution_id, wire_format)
         
         # Send initial connection confirmation
-        await websocket.send_json({
-            "type": "connected",
-            "data": {
-                "execution_id": execution_id,
-                "message": "Connected to execution updates"
-            }
-        })
-        
         try:
-            while True:
-                # Wait for messages
-                data = await websocket.receive_json()
-                # Handle client messages if needed
-                await websocket.send_json({"status": "received"})
-                
-        except WebSocketDisconnect:
-            await manager.disconnect(websocket, user_id, execution_id)
+            await connection.send({
+                "type": "connected",
+                "data": {
+                    "execution_id": execution_id,
+                    "message": "Connected to execution updates"
+                }
+            })
+        except Exception:
+            await manager.disconnect(websocket)
+            return
+        await manager.send_snapshot(connection, execution_id)
+        await receive_loop(connection)
             
+    except ValueError as e:
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=str(e))
     except HTTPException:
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION) 
\ No newline at end of file
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    except ConnectionLimitExceeded as e:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(e)) 
\ No newline at end of file
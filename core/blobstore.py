@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Collection, Iterator, Optional, Tuple
+
+import zstandard
+
+from core.config import settings
+
+# Blobs written before the store switched to zstd are zlib streams
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class BlobStore:
+    """Content-addressed, compressed on-disk store for large JSON payloads.
+
+    Blobs are keyed by the SHA-256 of their JSON encoding, so identical
+    payloads are stored once. Files are zstd-compressed, like CompressedJSON
+    columns but without a dictionary, which pays off only for small values.
+    They are memory-mapped on read, which keeps large payloads out of the
+    SQLite page cache.
+
+    Blobs are not deleted when the rows referencing them go away;
+    sweep() removes the ones nothing references any more (see db.blob_gc).
+    Async code should use offload_async() and load_async(), which do the
+    file I/O and (de)compression in a worker thread.
+    """
+
+    def __init__(self, root: str, threshold: int, level: int) -> None:
+        self.root = Path(root)
+        self.threshold = threshold
+        self.level = level
+        # Keeps a sweep from deleting a blob between put() finding and reusing it
+        self._lock = threading.Lock()
+
+    def path(self, digest: str) -> Path:
+        """Location of a blob on disk."""
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, payload: bytes) -> str:
+        """Store an encoded payload and return its digest."""
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self.path(digest)
+        with self._lock:
+            try:
+                # Refresh the mtime so the next sweep treats the blob as new
+                os.utime(path)
+                return digest
+            except FileNotFoundError:
+                pass
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # Compressors aren't thread-safe, and puts run in worker threads
+                f.write(zstandard.ZstdCompressor(level=self.level).compress(payload))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return digest
+
+    def offload(self, value: Any) -> Tuple[Optional[str], Any]:
+        """Split a JSON value into (blob digest, inline value).
+
+        Values whose JSON encoding reaches the threshold go to the store
+        and come back as (digest, None); smaller ones as (None, value).
+        """
+        payload = self._encode(value)
+        if payload is None:
+            return None, value
+        return self.put(payload), None
+
+    async def offload_async(self, value: Any) -> Tuple[Optional[str], Any]:
+        """offload() that writes blobs in a worker thread."""
+        payload = self._encode(value)
+        if payload is None:
+            return None, value
+        return await asyncio.to_thread(self.put, payload), None
+
+    def _encode(self, value: Any) -> Optional[bytes]:
+        """JSON encoding of a value that belongs in the store, else None."""
+        if value is None:
+            return None
+        payload = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+        if len(payload) < self.threshold:
+            return None
+        return payload
+
+    def read(self, digest: str) -> bytes:
+        """Read and decompress a blob's JSON encoding."""
+        with open(self.path(digest), "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:4] != ZSTD_MAGIC:
+                return zlib.decompress(mapped)
+            return zstandard.ZstdDecompressor().decompress(mapped)
+
+    def load(self, digest: str) -> Any:
+        """Load a blob as a JSON value."""
+        return json.loads(self.read(digest))
+
+    async def load_async(self, digest: str) -> Any:
+        """load() in a worker thread."""
+        return await asyncio.to_thread(self.load, digest)
+
+    def sweep(self, referenced: Collection[str], grace: float) -> int:
+        """Delete blobs not in referenced, and stray temp files, older than grace seconds.
+
+        The grace period protects blobs written (or re-put) by transactions
+        that have not committed yet. Returns how many files were removed.
+        """
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - grace
+        removed = 0
+        for directory in self.root.iterdir():
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                if directory.name + path.name in referenced:
+                    continue
+                with self._lock:
+                    try:
+                        if path.stat().st_mtime < cutoff:
+                            path.unlink()
+                            removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+    def iter_bytes(self, digest: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Yield a blob's JSON encoding incrementally, without holding it all in memory."""
+        with open(self.path(digest), "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:4] == ZSTD_MAGIC:
+                decompressor = zstandard.ZstdDecompressor().decompressobj()
+            else:
+                decompressor = zlib.decompressobj()
+            for offset in range(0, len(mapped), chunk_size):
+                data = decompressor.decompress(mapped[offset:offset + chunk_size])
+                if data:
+                    yield data
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+
+
+# Create a global blob store instance
+blob_store = BlobStore(
+    settings.BLOB_STORE_DIR,
+    threshold=settings.BLOB_THRESHOLD_BYTES,
+    level=settings.BLOB_COMPRESSION_LEVEL,
+)
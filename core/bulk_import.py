@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.canonical import content_hash
+from core.config import settings
+from core.configurations import record_initial_configurations
+from core.outbox import ENTITY_MODELS, REMOTE_ID_COLUMNS
+from schemas.bulk import BulkImportItem, BulkImportResult
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into (line number, line) pairs, skipping blank lines."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+async def bulk_import(
+    db: AsyncSession,
+    lines: AsyncIterator[Tuple[int, bytes]],
+    schema: Type[BaseModel],
+    entity_type: str,
+    register: Callable[[Any], Awaitable[str]],
+    user_id: int,
+) -> BulkImportResult:
+    """Validate NDJSON records and create them in batched rounds.
+
+    Each line is validated against schema as it is read. Every
+    IMPORT_BATCH_SIZE valid records, register() runs for the whole batch
+    with at most IMPORT_CONCURRENCY calls in flight, and the records it
+    registered are inserted as entity_type rows owned by user_id, with
+    one multi-row INSERT. Failures are reported per line and do not stop
+    the import.
+    """
+    model = ENTITY_MODELS[entity_type]
+    remote_id_column = REMOTE_ID_COLUMNS[entity_type]
+    result = BulkImportResult()
+    semaphore = asyncio.Semaphore(settings.IMPORT_CONCURRENCY)
+    batch: List[Tuple[int, Any]] = []
+
+    def report(line: int, item_status: str, item_id: Optional[int] = None, error: Optional[str] = None) -> None:
+        result.results.append(BulkImportItem(line=line, status=item_status, id=item_id, error=error))
+        if item_status == "created":
+            result.created += 1
+        else:
+            result.failed += 1
+
+    async def register_one(line: int, record: Any) -> Tuple[int, Any, Optional[str], Optional[str]]:
+        async with semaphore:
+            try:
+                return line, record, await register(record), None
+            except Exception as e:
+                return line, record, None, str(e)
+
+    async def flush() -> None:
+        registered = await asyncio.gather(*(register_one(line, record) for line, record in batch))
+        batch.clear()
+
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        for line, record, remote_id, error in registered:
+            if error is not None:
+                report(line, "failed", error=f"Registration failed: {error}")
+            else:
+                rows.append((line, {
+                    **record.model_dump(),
+                    "configuration_hash": content_hash(record.configuration),
+                    "user_id": user_id,
+                    remote_id_column: remote_id,
+                }))
+        if not rows:
+            return
+
+        # RETURNING order is not guaranteed for a multi-row INSERT (asking
+        # SQLAlchemy to sort it degrades to one INSERT per row), so new IDs
+        # are matched back to lines through the unique Toolhouse ID.
+        remote_column = getattr(model, remote_id_column)
+        try:
+            inserted = await db.execute(
+                insert(model).returning(remote_column, model.id),
+                [values for _, values in rows],
+            )
+            ids = dict(inserted.all())
+            await record_initial_configurations(db, entity_type, [
+                (ids[values[remote_id_column]], values["configuration_hash"], values["configuration"])
+                for _, values in rows
+            ])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Bulk import batch insert failed: {e}")
+            for line, _ in rows:
+                report(line, "failed", error=f"Insert failed: {e}")
+            return
+        for line, values in rows:
+            report(line, "created", item_id=ids.get(values[remote_id_column]))
+
+    async for line, raw in lines:
+        try:
+            record = schema.model_validate(json.loads(raw))
+        except ValueError as e:
+            message = _validation_message(e) if isinstance(e, ValidationError) else f"Invalid JSON: {e}"
+            report(line, "invalid", error=message)
+            continue
+        batch.append((line, record))
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    result.results.sort(key=lambda item: item.line)
+    return result
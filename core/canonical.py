@@ -0,0 +1,23 @@
+import hashlib
+import json
+from typing import Any
+
+
+def canonical_json(value: Any) -> bytes:
+    """Encode JSON canonically: sorted keys, no whitespace, UTF-8.
+
+    Equal values always encode to the same bytes, whatever key order or
+    formatting they arrived with.
+    """
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        allow_nan=False,
+    ).encode("utf-8")
+
+
+def content_hash(value: Any) -> str:
+    """SHA-256 hex digest of a value's canonical JSON."""
+    return hashlib.sha256(canonical_json(value)).hexdigest()
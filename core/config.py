@@ -26,7 +26,92 @@ class Settings(BaseSettings):
     DB_SYNCHRONOUS: str = "NORMAL"  # NORMAL provides good balance of safety and speed
     DB_TEMP_STORE: str = "MEMORY"  # Store temporary tables and indices in memory
     DB_MMAP_SIZE: int = 268435456  # 256MB memory-mapped I/O
+    DB_QUERY_STATS: bool = True  # Per-request query count/time in Server-Timing and logs
+    DB_SLOW_QUERY_MS: float = 100.0  # Log queries slower than this with their query plan
+    DB_N_PLUS_ONE_THRESHOLD: int = 10  # Flag requests repeating a statement more than this
+    AGENT_RECENT_EXECUTIONS: int = 10  # Executions embedded in the agent detail response
+    ROLLUP_SKETCH_ACCURACY: float = 0.01  # Latency percentile relative error; changing it invalidates stored rollups
+    ROLLUP_MAX_BUCKETS: int = 2000  # Largest number of buckets one analytics query may span
     
+    # Blob store for large execution payloads
+    BLOB_STORE_DIR: str = "./blobs"  # Directory of the content-addressed store
+    BLOB_THRESHOLD_BYTES: int = 65536  # Payloads this large are stored out of row
+    BLOB_COMPRESSION_LEVEL: int = 3  # zstd level; low levels keep writes cheap
+    BLOB_GC_INTERVAL: int = 3600  # Seconds between sweeps of unreferenced blobs; 0 disables them
+    BLOB_GC_GRACE_SECONDS: int = 3600  # Unreferenced blobs younger than this are kept
+
+    # Archival of old finished executions
+    ARCHIVE_DB_PATH: str = "./archive.db"  # SQLite file archived executions move into
+    ARCHIVE_AFTER_DAYS: int = 90  # Archive executions finished longer ago than this
+    ARCHIVE_BATCH_SIZE: int = 200  # Executions moved per transaction
+    ARCHIVE_INTERVAL: int = 3600  # Seconds between archival runs; 0 disables the background job
+
+    # Streaming exports
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched from the cursor per batch
+    EXPORT_GZIP_LEVEL: int = 6  # Compression level for gzipped exports
+
+    # Bulk imports
+    IMPORT_CONCURRENCY: int = 16  # Toolhouse registrations in flight at once
+    IMPORT_BATCH_SIZE: int = 200  # Records registered and inserted per round
+
+    # Toolhouse outbox
+    OUTBOX_BATCH_SIZE: int = 100  # Events claimed per dispatch round
+    OUTBOX_CONCURRENCY: int = 8  # Toolhouse calls in flight at once
+    OUTBOX_POLL_INTERVAL: float = 5.0  # Re-check for due events without a notification
+    OUTBOX_LEASE_SECONDS: float = 60.0  # How long a claimed event is held before it is retried
+    OUTBOX_MAX_ATTEMPTS: int = 10  # Attempts before an event is parked as sync_failed
+    OUTBOX_RETRY_BASE: float = 1.0  # First retry delay in seconds; doubles per attempt
+    OUTBOX_RETRY_MAX: float = 300.0  # Longest retry delay in seconds
+
+    # Resolved agent tool sets
+    TOOL_SET_CACHE_SIZE: int = 1024  # Agents whose tool set snapshot is kept in memory
+
+    # Execution input validation
+    INPUT_VALIDATOR_CACHE_SIZE: int = 512  # Compiled tool input validators kept in memory
+    INPUT_VALIDATION_THREAD_THRESHOLD: int = 50  # Batches this large are validated in a worker thread
+    EXECUTION_BATCH_MAX_SIZE: int = 500  # Executions accepted per batch submission
+
+    # Batch execution status lookups
+    EXECUTION_STATUS_BATCH_MAX_IDS: int = 500  # Execution IDs accepted per status lookup
+    EXECUTION_STATUS_CACHE_SIZE: int = 10000  # Executions whose latest polled status is kept in memory
+
+    # Idempotency-Key handling for creation endpoints
+    IDEMPOTENCY_TTL: int = 86400  # Seconds a key's response can be replayed
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # How long an unfinished request holds its key
+    IDEMPOTENCY_CACHE_SIZE: int = 4096  # Completed keys whose response is kept in memory
+    IDEMPOTENCY_PURGE_INTERVAL: int = 600  # Seconds between deletions of expired keys
+
+    # Compressed JSON columns
+    JSON_COMPRESSION_THRESHOLD: int = 512  # Encoded JSON this large is zstd-compressed
+    JSON_COMPRESSION_LEVEL: int = 3  # zstd level
+    JSON_COMPRESSION_DICT_PATH: Optional[str] = None  # Trained zstd dictionary, if any
+
+    # Execution output streaming
+    OUTPUT_STREAM_BATCH_SIZE: int = 500  # Chunks read per query while streaming
+    OUTPUT_STREAM_POLL_INTERVAL: float = 15.0  # Re-check for output without a notification
+
+    # Profiling
+    PROFILER_MAX_SECONDS: int = 60  # Longest on-demand profile an admin may request
+    PROFILER_INTERVAL_MS: float = 5.0  # Default sampling interval
+    PROFILER_REQUEST_HEADER: str = "X-Profile-Request"  # Header that profiles a single request
+    PROFILER_REQUEST_TOKEN: Optional[str] = None  # Header value required; None disables it
+    PROFILER_KEEP_REQUEST_PROFILES: int = 20  # Per-request profiles kept for retrieval
+
+    # Event loop monitoring
+    LOOP_MONITOR_ENABLED: bool = True  # Continuously measure event loop lag
+    LOOP_MONITOR_INTERVAL: float = 0.25  # Heartbeat interval in seconds
+    LOOP_LAG_THRESHOLD_MS: float = 100.0  # Lag that counts as a blocked loop
+    LOOP_MONITOR_DEBUG: bool = False  # Name the task that blocked the loop
+
+    # WebSockets
+    WS_SEND_QUEUE_SIZE: int = 100  # Messages queued per socket behind an in-flight send
+    WS_PING_INTERVAL: float = 20.0  # Ping sockets that have been quiet this long (seconds)
+    WS_IDLE_TIMEOUT: float = 60.0  # Close sockets silent for this long, pongs included
+    WS_OUTPUT_STATE_TTL: float = 3600.0  # Forget an execution's last broadcast output after this long without updates
+    WS_MAX_CONNECTIONS: int = 10000  # Global cap on open sockets per worker
+    WS_MAX_CONNECTIONS_PER_USER: int = 20  # Cap on open sockets per user per worker
+    WS_PER_MESSAGE_DEFLATE: bool = True  # Let clients negotiate transport-level permessage-deflate
+
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:8000"]
     
@@ -0,0 +1,133 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.canonical import content_hash
+from models.configuration import ConfigurationContent, ConfigurationVersion
+
+
+def current_hash(entity: Any) -> str:
+    """Hash of an entity's stored configuration, computed if not recorded yet."""
+    return entity.configuration_hash or content_hash(entity.configuration or {})
+
+
+async def _store_contents(db: AsyncSession, contents: Dict[str, Any]) -> None:
+    await db.execute(
+        insert(ConfigurationContent).on_conflict_do_nothing(),
+        [{"hash": digest, "configuration": configuration} for digest, configuration in contents.items()],
+    )
+
+
+async def _has_versions(db: AsyncSession, entity_type: str, entity_id: int) -> bool:
+    result = await db.execute(
+        select(ConfigurationVersion.id)
+        .where(
+            ConfigurationVersion.entity_type == entity_type,
+            ConfigurationVersion.entity_id == entity_id,
+        )
+        .limit(1)
+    )
+    return result.first() is not None
+
+
+async def _add_version(
+    db: AsyncSession,
+    entity_type: str,
+    entity_id: int,
+    digest: str,
+    configuration: Dict[str, Any],
+) -> None:
+    await _store_contents(db, {digest: configuration})
+    next_version = (
+        select(func.coalesce(func.max(ConfigurationVersion.version), 0) + 1)
+        .where(
+            ConfigurationVersion.entity_type == entity_type,
+            ConfigurationVersion.entity_id == entity_id,
+        )
+        .scalar_subquery()
+    )
+    await db.execute(
+        insert(ConfigurationVersion).values(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            version=next_version,
+            configuration_hash=digest,
+        )
+    )
+
+
+async def record_configuration(
+    db: AsyncSession,
+    entity_type: str,
+    entity: Any,
+    configuration: Dict[str, Any],
+) -> bool:
+    """Set an entity's configuration, recording a new version if it changed.
+
+    Returns False, leaving the entity untouched, when configuration hashes
+    the same as what is stored. Runs in the caller's transaction.
+    """
+    digest = content_hash(configuration)
+    if entity.id is not None:
+        previous = current_hash(entity)
+        if digest == previous:
+            return False
+        if entity.configuration_hash is None and not await _has_versions(db, entity_type, entity.id):
+            # Created before history was kept: start it with what was stored
+            await _add_version(db, entity_type, entity.id, previous, entity.configuration or {})
+
+    entity.configuration = configuration
+    entity.configuration_hash = digest
+    if entity.id is None:
+        await db.flush()
+    await _add_version(db, entity_type, entity.id, digest, configuration)
+    return True
+
+
+async def record_initial_configurations(
+    db: AsyncSession,
+    entity_type: str,
+    entities: Sequence[Tuple[int, str, Dict[str, Any]]],
+) -> None:
+    """Record version 1 for newly inserted (id, hash, configuration) entities."""
+    if not entities:
+        return
+    await _store_contents(db, {digest: configuration for _, digest, configuration in entities})
+    await db.execute(
+        insert(ConfigurationVersion),
+        [
+            {"entity_type": entity_type, "entity_id": entity_id, "version": 1, "configuration_hash": digest}
+            for entity_id, digest, _ in entities
+        ],
+    )
+
+
+async def list_versions(db: AsyncSession, entity_type: str, entity_id: int) -> List[Any]:
+    """An entity's configuration versions, newest first, with their contents."""
+    result = await db.execute(
+        select(
+            ConfigurationVersion.version,
+            ConfigurationVersion.configuration_hash,
+            ConfigurationVersion.created_at,
+            ConfigurationContent.configuration,
+        )
+        .join(ConfigurationContent, ConfigurationContent.hash == ConfigurationVersion.configuration_hash)
+        .where(
+            ConfigurationVersion.entity_type == entity_type,
+            ConfigurationVersion.entity_id == entity_id,
+        )
+        .order_by(ConfigurationVersion.version.desc())
+    )
+    return result.all()
+
+
+async def delete_versions(db: AsyncSession, entity_type: str, entity_id: int) -> None:
+    """Drop a deleted entity's history; shared contents are kept."""
+    await db.execute(
+        delete(ConfigurationVersion).where(
+            ConfigurationVersion.entity_type == entity_type,
+            ConfigurationVersion.entity_id == entity_id,
+        )
+    )
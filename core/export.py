@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Table
+
+from core.config import settings
+from core.responses import json_default
+from db import reads
+from db.base import get_db_session
+
+# Export formats and their media types
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    """Flatten a value for a CSV cell; nested JSON is written as JSON text."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(rows: List[Dict[str, Any]]) -> str:
+    return "".join(
+        json.dumps(row, ensure_ascii=False, separators=(",", ":"), default=json_default) + "\n"
+        for row in rows
+    )
+
+
+def encode_csv(rows: List[Dict[str, Any]], fields: Sequence[str]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(row.get(name)) for name in fields] for row in rows)
+    return buffer.getvalue()
+
+
+async def export_stream(
+    table: Table,
+    fields: Sequence[str],
+    conditions: Sequence[Any],
+    export_format: str,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """Encode a table's matching rows batch by batch, optionally gzipped.
+
+    Opens its own session, since the stream outlives the request's one.
+    """
+    compressor = (
+        zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        if compress else None
+    )
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if export_format == "csv":
+        header = io.StringIO()
+        csv.writer(header).writerow(fields)
+        yield encode(header.getvalue())
+
+    async with get_db_session() as session:
+        async for rows in reads.stream_rows(
+            session, table, fields, conditions, settings.EXPORT_BATCH_SIZE
+        ):
+            text = encode_csv(rows, fields) if export_format == "csv" else encode_ndjson(rows)
+            data = encode(text)
+            if data:
+                yield data
+
+    if compressor:
+        yield compressor.flush()
+
+
+def export_response(
+    table: Table,
+    fields: Sequence[str],
+    conditions: Sequence[Any],
+    export_format: str,
+    compress: bool = False,
+) -> StreamingResponse:
+    """Stream an export of table as a file download."""
+    filename = f"{table.name}.{export_format}"
+    media_type = EXPORT_FORMATS[export_format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        export_stream(table, fields, conditions, export_format, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
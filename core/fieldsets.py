@@ -0,0 +1,24 @@
+from typing import List, Optional, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> List[str]:
+    """Parse a comma-separated `fields=` value against the fields a schema exposes.
+
+    Without a fieldset every schema field is returned. `id` is always included.
+    """
+    if fields is None:
+        return list(schema.model_fields)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(schema.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+                   f"Allowed: {', '.join(schema.model_fields)}",
+        )
+    names = ["id"]
+    names.extend(name for name in requested if name != "id")
+    return names
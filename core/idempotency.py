@@ -0,0 +1,230 @@
+"""Idempotency-Key support for creation endpoints.
+
+A request carrying an Idempotency-Key first claims the key in its own
+committed transaction, so a concurrent duplicate sees the claim and gets
+409 instead of running the handler a second time. Once the handler
+succeeds, its response is stored under the key for IDEMPOTENCY_TTL
+seconds; retries with the same key and body replay it verbatim. Failed
+requests release the key so they can be retried.
+
+Keys are scoped to the user, method and path. Completed keys are also
+kept in an in-memory LRU so replays usually cost no query. Claims left
+by a crashed request lapse after IDEMPOTENCY_LOCK_SECONDS.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from core.canonical import content_hash
+from core.config import settings
+from core.metrics import registry
+from db.base import get_db_session
+from models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+replays_counter = registry.counter(
+    "idempotency_replays_total",
+    "Responses replayed for a repeated Idempotency-Key, by where they were found",
+)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """The response recorded for a completed Idempotency-Key."""
+
+    request_hash: str
+    status_code: int
+    body: bytes
+    expires_at: datetime
+
+
+class IdempotentReplay(Exception):
+    """Raised instead of running a handler whose response is already stored."""
+
+    def __init__(self, response: StoredResponse) -> None:
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def scoped_key(user_id: int, method: str, path: str, key: str) -> str:
+    """Table key for a client's Idempotency-Key on one endpoint."""
+    return hashlib.sha256(f"{user_id}:{method}:{path}:{key}".encode()).hexdigest()
+
+
+def request_hash(body: bytes) -> str:
+    """Hash of a request body; JSON bodies hash the same however they are formatted."""
+    try:
+        return content_hash(json.loads(body))
+    except ValueError:
+        return hashlib.sha256(body).hexdigest()
+
+
+class IdempotencyStore:
+    """Claims and completed responses of Idempotency-Keys."""
+
+    def __init__(self, ttl: float, lock_seconds: float, capacity: int, purge_interval: float) -> None:
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.capacity = capacity
+        self.purge_interval = purge_interval
+        self._responses: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def _cached(self, key: str, now: datetime) -> Optional[StoredResponse]:
+        response = self._responses.get(key)
+        if response is None:
+            return None
+        if response.expires_at <= now:
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return response
+
+    def _remember(self, key: str, response: StoredResponse) -> None:
+        self._responses[key] = response
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.capacity:
+            self._responses.popitem(last=False)
+
+    @staticmethod
+    def _check_reuse(stored_hash: str, body_hash: str) -> None:
+        if stored_hash != body_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request body",
+            )
+
+    async def claim(self, key: str, body_hash: str) -> None:
+        """Claim key for a new request.
+
+        Raises IdempotentReplay if the key already has a response, and 409
+        while another request holding the key is still running.
+        """
+        now = datetime.utcnow()
+        cached = self._cached(key, now)
+        if cached is not None:
+            self._check_reuse(cached.request_hash, body_hash)
+            replays_counter.inc(source="memory")
+            raise IdempotentReplay(cached)
+
+        values = {
+            "request_hash": body_hash,
+            "status_code": None,
+            "response_body": None,
+            "expires_at": now + timedelta(seconds=self.lock_seconds),
+        }
+        statement = (
+            insert(IdempotencyKey)
+            .values(key=key, **values)
+            # Expired keys are claimed afresh
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_=values,
+                where=IdempotencyKey.expires_at <= now,
+            )
+            .returning(IdempotencyKey.key)
+        )
+        async with get_db_session() as session:
+            if (await session.execute(statement)).first() is not None:
+                return
+            row = (await session.execute(
+                select(
+                    IdempotencyKey.request_hash,
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.response_body,
+                    IdempotencyKey.expires_at,
+                ).where(IdempotencyKey.key == key)
+            )).first()
+        if row is None:
+            # Released by its request in the meantime; try again
+            return await self.claim(key, body_hash)
+
+        self._check_reuse(row.request_hash, body_hash)
+        if row.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        response = StoredResponse(row.request_hash, row.status_code, row.response_body, row.expires_at)
+        self._remember(key, response)
+        replays_counter.inc(source="db")
+        raise IdempotentReplay(response)
+
+    async def complete(self, key: str, body_hash: str, status_code: int, body: bytes) -> None:
+        """Store the response of a claimed key for replay."""
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+        async with get_db_session() as session:
+            await session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(status_code=status_code, response_body=body, expires_at=expires_at)
+            )
+        self._remember(key, StoredResponse(body_hash, status_code, body, expires_at))
+
+    async def release(self, key: str) -> None:
+        """Give up a claimed key so the request can be retried."""
+        async with get_db_session() as session:
+            await session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status_code.is_(None),
+                )
+            )
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    async def purge_expired(self) -> int:
+        """Delete expired keys; returns how many were removed."""
+        async with get_db_session() as session:
+            result = await session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())
+            )
+        return result.rowcount
+
+    def start(self) -> None:
+        """Start purging expired keys in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="idempotency-purge")
+
+    async def stop(self) -> None:
+        """Stop the background purge."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.purge_expired()
+            except Exception as e:
+                logger.error(f"Purging expired idempotency keys failed: {e}")
+            await asyncio.sleep(self.purge_interval)
+
+
+# Create a global idempotency store instance
+idempotency = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_TTL,
+    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    capacity=settings.IDEMPOTENCY_CACHE_SIZE,
+    purge_interval=settings.IDEMPOTENCY_PURGE_INTERVAL,
+)
+registry.gauge(
+    "idempotency_cached_responses",
+    "Completed Idempotency-Key responses kept in memory",
+    lambda: len(idempotency),
+)
@@ -0,0 +1,109 @@
+"""Validation of execution inputs against tool input schemas.
+
+A tool declares the input it accepts as the "input" member of its
+schema. An execution's input_data, as submitted, must satisfy the input
+schema of every enabled tool of the agent that declares one; tools
+without an input schema place no constraint on it.
+
+Compiled validators are cached by the content hash of the tool schema,
+which each ToolSet snapshot precomputes. Validating an input therefore
+costs only the validation itself.
+"""
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from jsonschema import Validator
+from jsonschema.exceptions import SchemaError
+from jsonschema.validators import validator_for
+
+from core.config import settings
+from core.metrics import registry
+from core.toolsets import ToolSet
+
+logger = logging.getLogger(__name__)
+
+# Errors reported per tool input before the rest are dropped
+MAX_ERRORS_PER_TOOL = 10
+
+compile_counter = registry.counter(
+    "input_validator_compiles_total",
+    "Tool input schemas compiled into validators",
+)
+
+
+class ValidatorCache:
+    """LRU of compiled validators keyed by tool schema hash; safe to share with worker threads."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, Optional[Validator]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, schema_hash: str, schema: Dict[str, Any]) -> Optional[Validator]:
+        """The validator for a tool schema's "input" member, or None if it is unusable."""
+        with self._lock:
+            if schema_hash in self._entries:
+                self._entries.move_to_end(schema_hash)
+                return self._entries[schema_hash]
+
+        validator = self._compile(schema)
+        with self._lock:
+            self._entries[schema_hash] = validator
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return validator
+
+    @staticmethod
+    def _compile(schema: Dict[str, Any]) -> Optional[Validator]:
+        compile_counter.inc()
+        input_schema = schema["input"]
+        cls = validator_for(input_schema)
+        try:
+            cls.check_schema(input_schema)
+        except SchemaError as e:
+            logger.warning(f"Not validating inputs against invalid tool schema: {e.message}")
+            return None
+        return cls(input_schema, format_checker=cls.FORMAT_CHECKER)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def validate_input(tool_set: ToolSet, input_data: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Check input_data against each tool's input schema; returns the errors found."""
+    errors: List[Dict[str, str]] = []
+    for tool in tool_set.tools:
+        if not isinstance(tool.schema, dict) or "input" not in tool.schema:
+            continue
+        validator = validators.get(tool.schema_hash, tool.schema)
+        if validator is None:
+            continue
+        for error in islice(validator.iter_errors(input_data), MAX_ERRORS_PER_TOOL):
+            errors.append({"tool": tool.name, "path": error.json_path, "message": error.message})
+    return errors
+
+
+def _validate_all(items: Sequence[Tuple[ToolSet, Dict[str, Any]]]) -> List[List[Dict[str, str]]]:
+    return [validate_input(tool_set, input_data) for tool_set, input_data in items]
+
+
+async def validate_inputs(
+    items: Sequence[Tuple[ToolSet, Dict[str, Any]]],
+) -> List[List[Dict[str, str]]]:
+    """Validate many (tool set, input) pairs; large batches run in a worker thread."""
+    if len(items) < settings.INPUT_VALIDATION_THREAD_THRESHOLD:
+        return _validate_all(items)
+    return await asyncio.to_thread(_validate_all, items)
+
+
+# Create a global validator cache instance
+validators = ValidatorCache(settings.INPUT_VALIDATOR_CACHE_SIZE)
+registry.gauge(
+    "input_validator_cache_entries",
+    "Compiled tool input validators cached",
+    lambda: len(validators),
+)
@@ -0,0 +1,59 @@
+from typing import Any, Dict, List
+
+
+def _escape(key: Any) -> str:
+    """Escape a key for use in a JSON Pointer (RFC 6901)."""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _same(source: Any, target: Any) -> bool:
+    # True == 1 and 1 == 1.0 in Python but not in JSON, also inside containers
+    if type(source) is not type(target):
+        return False
+    if isinstance(source, dict):
+        return source.keys() == target.keys() and all(
+            _same(value, target[key]) for key, value in source.items()
+        )
+    if isinstance(source, list):
+        return len(source) == len(target) and all(map(_same, source, target))
+    return source == target
+
+
+def _diff(source: Any, target: Any, path: str, ops: List[Dict[str, Any]]) -> None:
+    if _same(source, target):
+        return
+
+    if isinstance(source, dict) and isinstance(target, dict):
+        for key in source:
+            if key not in target:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            child = f"{path}/{_escape(key)}"
+            if key in source:
+                _diff(source[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+
+    elif isinstance(source, list) and isinstance(target, list):
+        common = min(len(source), len(target))
+        for index in range(common):
+            _diff(source[index], target[index], f"{path}/{index}", ops)
+        for index in range(common, len(target)):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": target[index]})
+        # Remove from the end so earlier indexes stay valid
+        for index in range(len(source) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+
+    else:
+        ops.append({"op": "replace", "path": path, "value": target})
+
+
+def make_patch(source: Any, target: Any) -> List[Dict[str, Any]]:
+    """Build an RFC 6902 JSON Patch that turns source into target.
+
+    Objects are diffed key by key and arrays index by index; anything else
+    that differs is replaced wholesale.
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff(source, target, "", ops)
+    return ops
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from typing import Optional
+
+from core.config import settings
+from core.metrics import registry
+from core.profiling import collapse_stack
+
+logger = logging.getLogger(__name__)
+
+lag_gauge = registry.gauge(
+    "event_loop_lag_seconds",
+    "Delay of the most recent event loop heartbeat beyond its schedule",
+)
+max_lag_gauge = registry.gauge(
+    "event_loop_lag_max_seconds",
+    "Largest event loop lag observed since startup",
+)
+blocked_counter = registry.counter(
+    "event_loop_blocked_total",
+    "Number of times the event loop was blocked longer than the lag threshold",
+)
+
+
+class LoopLagMonitor:
+    """Measures event loop lag and captures the stack of blocking code.
+
+    A heartbeat coroutine sleeps for a fixed interval and records how late
+    it wakes up. A watchdog thread notices when the heartbeat is overdue
+    while the loop is still blocked and captures the loop thread's stack,
+    so the log points at the offending code rather than at the victim.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        threshold: float,
+        debug: bool = False,
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.max_lag = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._reported_heartbeat: Optional[float] = None
+
+    def start(self) -> None:
+        """Start the heartbeat task and watchdog thread on the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0.0)
+            self._heartbeat = time.monotonic()
+
+            lag_gauge.set(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+                max_lag_gauge.set(lag)
+            if lag > self.threshold:
+                blocked_counter.inc()
+                logger.warning(f"Event loop lag {lag * 1000:.1f}ms")
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(check_every):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue > self.threshold and self._reported_heartbeat != heartbeat:
+                self._reported_heartbeat = heartbeat
+                self._report_blocked(overdue)
+
+    def _report_blocked(self, overdue: float) -> None:
+        """Log the stack the loop thread is currently stuck in."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = collapse_stack(frame).replace(";", "\n    ")
+        del frame
+
+        culprit = ""
+        if self.debug and self._loop is not None:
+            task = asyncio.current_task(self._loop)
+            if task is not None:
+                coro = task.get_coro()
+                culprit = f" in task {task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+        logger.warning(
+            f"Event loop blocked for over {overdue * 1000:.0f}ms{culprit}; "
+            f"loop thread stack:\n    {stack}"
+        )
+
+
+# Create a global loop monitor instance
+loop_monitor = LoopLagMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL,
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000,
+    debug=settings.LOOP_MONITOR_DEBUG,
+)
@@ -0,0 +1,136 @@
+import linecache
+import os
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from core.metrics import registry
+
+# Snapshots kept in memory for diffing
+MAX_SNAPSHOTS = 10
+# Allowed tracemalloc grouping keys
+GROUP_BY = ("lineno", "filename", "traceback")
+
+
+def _resident_memory_bytes() -> float:
+    """Resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+registry.gauge(
+    "process_resident_memory_bytes",
+    "Resident memory size of the worker process in bytes",
+    _resident_memory_bytes,
+)
+registry.gauge(
+    "tracemalloc_traced_bytes",
+    "Memory currently traced by tracemalloc (0 when tracing is off)",
+    lambda: tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+)
+
+
+class SnapshotStore:
+    """Takes and diffs tracemalloc snapshots for leak hunting."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS) -> None:
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 1
+
+    def start(self, frames: int = 1) -> None:
+        """Start tracing allocations with the given traceback depth."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots."""
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def status(self) -> Dict[str, Any]:
+        """Tracing state and stored snapshots."""
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traceback_limit": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "snapshots": [self._describe(snapshot_id) for snapshot_id in self._snapshots],
+        }
+
+    def take(self) -> Dict[str, Any]:
+        """Take a snapshot and store it."""
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+        ))
+        snapshot_id = self._next_id
+        self._next_id += 1
+        self._snapshots[snapshot_id] = {
+            "snapshot": snapshot,
+            "taken_at": datetime.now(timezone.utc),
+            "traced_bytes": tracemalloc.get_traced_memory()[0],
+        }
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return self._describe(snapshot_id)
+
+    def diff(
+        self,
+        base_id: int,
+        target_id: Optional[int] = None,
+        group_by: str = "lineno",
+        limit: int = 25,
+    ) -> List[Dict[str, Any]]:
+        """Largest allocation changes between two snapshots.
+
+        If target_id is omitted, the latest snapshot is used.
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        if target_id is None and self._snapshots:
+            target_id = next(reversed(self._snapshots))
+        if base_id not in self._snapshots or target_id not in self._snapshots:
+            raise KeyError("Snapshot not found")
+
+        base = self._snapshots[base_id]["snapshot"]
+        target = self._snapshots[target_id]["snapshot"]
+        stats = target.compare_to(base, group_by)
+        return [
+            {
+                "location": "\n".join(stat.traceback.format()),
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def _describe(self, snapshot_id: int) -> Dict[str, Any]:
+        entry = self._snapshots[snapshot_id]
+        return {
+            "id": snapshot_id,
+            "taken_at": entry["taken_at"].isoformat(),
+            "traced_bytes": entry["traced_bytes"],
+        }
+
+
+# Create a global snapshot store
+snapshots = SnapshotStore()
+registry.gauge(
+    "tracemalloc_stored_snapshots",
+    "tracemalloc snapshots kept for diffing",
+    lambda: len(snapshots),
+)
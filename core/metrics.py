@@ -0,0 +1,118 @@
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in key) + "}"
+
+
+class Metric:
+    """Base class for in-process metrics rendered in Prometheus text format."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        """Current (labels, value) pairs."""
+        with self._lock:
+            return list(self._values.items())
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set."""
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> str:
+        """Render the metric in Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for key, value in self.samples():
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increment the counter."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Gauge that is either set explicitly or read from a callback."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        callback: Optional[Callable[[], float]] = None,
+    ) -> None:
+        super().__init__(name, description)
+        self.callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge value."""
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        if self.callback is not None:
+            return [((), float(self.callback()))]
+        return super().samples()
+
+
+class MetricsRegistry:
+    """Registry of all in-process metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Register a metric, returning the existing one if the name is taken."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Create or get a counter."""
+        return self.register(Counter(name, description))
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        callback: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        """Create or get a gauge."""
+        return self.register(Gauge(name, description, callback))
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Get a metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Create a global metrics registry
+registry = MetricsRegistry()
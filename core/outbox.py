@@ -0,0 +1,298 @@
+"""Transactional outbox for Toolhouse writes.
+
+Endpoints that change agents or tools commit the change together with an
+OutboxEvent describing the Toolhouse call that mirrors it, and mark the
+entity pending_sync. The dispatcher then makes those calls in the
+background, so API latency no longer depends on Toolhouse:
+
+- Each round claims up to OUTBOX_BATCH_SIZE due events and sends them
+  with at most OUTBOX_CONCURRENCY calls in flight.
+- Only the oldest event of each entity is ever claimed, so an entity's
+  calls reach Toolhouse in the order they were committed.
+- Failed calls are retried with exponential backoff. After
+  OUTBOX_MAX_ATTEMPTS the event is parked (next_attempt_at NULL) and its
+  entity marked sync_failed. A parked event still heads its entity's
+  queue; the next change to the entity, or retry_parked() (exposed as
+  POST /admin/outbox/retry), puts it back in line with a fresh budget.
+- Claims are leases (next_attempt_at pushed OUTBOX_LEASE_SECONDS ahead),
+  so events held by a crashed process are picked up again.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Row, case, delete, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.metrics import registry
+from core.toolhouse import toolhouse_client
+from db.base import get_db_session
+from models.agent import Agent
+from models.outbox import OutboxEvent
+from models.tool import Tool
+
+logger = logging.getLogger(__name__)
+
+ENTITY_MODELS = {"agent": Agent, "tool": Tool}
+REMOTE_ID_COLUMNS = {"agent": "toolhouse_agent_id", "tool": "toolhouse_tool_id"}
+
+sent_counter = registry.counter(
+    "toolhouse_outbox_sent_total",
+    "Outbox events delivered to Toolhouse",
+)
+failure_counter = registry.counter(
+    "toolhouse_outbox_failures_total",
+    "Failed Toolhouse calls made for outbox events",
+)
+
+
+class OutboxDispatcher:
+    """Delivers outbox events to Toolhouse in the background."""
+
+    def __init__(
+        self,
+        batch_size: int,
+        concurrency: int,
+        poll_interval: float,
+        lease_seconds: float,
+        max_attempts: int,
+        retry_base: float,
+        retry_max: float,
+    ) -> None:
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        entity_type: str,
+        entity: Any,
+        operation: str,
+        payload: Dict[str, Any],
+    ) -> None:
+        """Queue a Toolhouse call for entity in the caller's transaction.
+
+        Call notify() once the transaction has committed.
+        """
+        if entity.id is None:
+            await db.flush()
+        else:
+            # Earlier calls parked after failing go out again first, keeping the order
+            await db.execute(
+                update(OutboxEvent)
+                .where(
+                    OutboxEvent.entity_type == entity_type,
+                    OutboxEvent.entity_id == entity.id,
+                    OutboxEvent.next_attempt_at.is_(None),
+                )
+                .values(attempts=0, next_attempt_at=datetime.utcnow())
+            )
+        entity.sync_status = "pending_sync"
+        db.add(OutboxEvent(
+            entity_type=entity_type,
+            entity_id=entity.id,
+            operation=operation,
+            payload=payload,
+            next_attempt_at=datetime.utcnow(),
+        ))
+
+    async def discard(self, db: AsyncSession, entity_type: str, entity_id: int) -> None:
+        """Drop the queued calls of a deleted entity in the caller's transaction."""
+        await db.execute(
+            delete(OutboxEvent).where(
+                OutboxEvent.entity_type == entity_type,
+                OutboxEvent.entity_id == entity_id,
+            )
+        )
+
+    async def retry_parked(
+        self,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+    ) -> int:
+        """Requeue parked events, optionally only one entity's; returns how many."""
+        conditions = [OutboxEvent.next_attempt_at.is_(None)]
+        if entity_type is not None:
+            conditions.append(OutboxEvent.entity_type == entity_type)
+        if entity_id is not None:
+            conditions.append(OutboxEvent.entity_id == entity_id)
+        async with get_db_session() as session:
+            requeued = (await session.execute(
+                update(OutboxEvent)
+                .where(*conditions)
+                .values(attempts=0, next_attempt_at=datetime.utcnow())
+                .returning(OutboxEvent.entity_type, OutboxEvent.entity_id)
+            )).all()
+            for requeued_type, model in ENTITY_MODELS.items():
+                ids = {row.entity_id for row in requeued if row.entity_type == requeued_type}
+                if ids:
+                    await session.execute(
+                        update(model).where(model.id.in_(ids)).values(sync_status="pending_sync")
+                    )
+        if requeued:
+            self.notify()
+        return len(requeued)
+
+    def notify(self) -> None:
+        """Wake the dispatcher for newly committed events."""
+        self._wakeup.set()
+
+    async def dispatch_batch(self) -> int:
+        """Claim and deliver one round of due events; returns how many were claimed."""
+        now = datetime.utcnow()
+        heads = select(func.min(OutboxEvent.id)).group_by(
+            OutboxEvent.entity_type, OutboxEvent.entity_id
+        )
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.id.in_(heads), OutboxEvent.next_attempt_at <= now)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+        )
+        async with get_db_session() as session:
+            events = (await session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(due))
+                .values(next_attempt_at=now + timedelta(seconds=self.lease_seconds))
+                .returning(
+                    OutboxEvent.id,
+                    OutboxEvent.entity_type,
+                    OutboxEvent.entity_id,
+                    OutboxEvent.operation,
+                    OutboxEvent.payload,
+                    OutboxEvent.attempts,
+                )
+            )).all()
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._dispatch(event, semaphore) for event in events))
+        return len(events)
+
+    async def _dispatch(self, event: Row, semaphore: asyncio.Semaphore) -> None:
+        model = ENTITY_MODELS[event.entity_type]
+        remote_column = getattr(model, REMOTE_ID_COLUMNS[event.entity_type])
+        async with get_db_session() as session:
+            entity = (await session.execute(
+                select(remote_column).where(model.id == event.entity_id)
+            )).first()
+            if entity is None:
+                # Entity deleted since; nothing left to mirror
+                await session.execute(delete(OutboxEvent).where(OutboxEvent.id == event.id))
+                return
+
+        try:
+            async with semaphore:
+                remote_id = await self._call(event, entity[0])
+        except Exception as e:
+            failure_counter.inc(operation=event.operation)
+            await self._retry_later(event, e)
+            return
+
+        sent_counter.inc(operation=event.operation)
+        async with get_db_session() as session:
+            await session.execute(delete(OutboxEvent).where(OutboxEvent.id == event.id))
+            # Synced once nothing else is queued for the entity
+            queued = exists().where(
+                OutboxEvent.entity_type == event.entity_type,
+                OutboxEvent.entity_id == event.entity_id,
+            )
+            values: Dict[str, Any] = {
+                "sync_status": case((queued, "pending_sync"), else_="synced"),
+            }
+            if remote_id is not None:
+                values[remote_column.key] = remote_id
+            await session.execute(
+                update(model).where(model.id == event.entity_id).values(values)
+            )
+
+    async def _call(self, event: Row, remote_id: Optional[str]) -> Optional[str]:
+        """Make an event's Toolhouse call; returns the new remote ID for registrations."""
+        payload = event.payload
+        if event.operation == "register":
+            if event.entity_type == "agent":
+                return await toolhouse_client.register_agent(**payload)
+            return await toolhouse_client.register_tool(**payload)
+
+        if remote_id is None:
+            # Never registered with Toolhouse, so there is nothing to update
+            return None
+        if event.entity_type == "agent":
+            await toolhouse_client.update_agent(agent_id=remote_id, **payload)
+        else:
+            await toolhouse_client.update_tool(tool_id=remote_id, **payload)
+        return None
+
+    async def _retry_later(self, event: Row, error: Exception) -> None:
+        attempts = event.attempts + 1
+        next_attempt_at: Optional[datetime] = None
+        if attempts < self.max_attempts:
+            delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+            next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        else:
+            logger.error(
+                f"Giving up on outbox event {event.id} ({event.operation} "
+                f"{event.entity_type} {event.entity_id}) after {attempts} attempts: {error}"
+            )
+
+        async with get_db_session() as session:
+            await session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id == event.id)
+                .values(attempts=attempts, next_attempt_at=next_attempt_at, last_error=str(error))
+            )
+            if next_attempt_at is None:
+                model = ENTITY_MODELS[event.entity_type]
+                await session.execute(
+                    update(model).where(model.id == event.entity_id).values(sync_status="sync_failed")
+                )
+
+    def start(self) -> None:
+        """Start delivering events in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="toolhouse-outbox")
+
+    async def stop(self) -> None:
+        """Stop the background dispatcher; undelivered events stay queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                claimed = await self.dispatch_batch()
+            except Exception as e:
+                logger.error(f"Outbox dispatch failed: {e}")
+                claimed = 0
+            if claimed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Create a global outbox dispatcher instance
+toolhouse_outbox = OutboxDispatcher(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    concurrency=settings.OUTBOX_CONCURRENCY,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retry_base=settings.OUTBOX_RETRY_BASE,
+    retry_max=settings.OUTBOX_RETRY_MAX,
+)
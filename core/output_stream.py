@@ -0,0 +1,40 @@
+import asyncio
+from typing import Dict
+
+from core.metrics import registry
+
+
+class OutputNotifier:
+    """Wakes readers streaming an execution's output when something new arrives.
+
+    Readers grab the current event before checking the database, so a
+    notification that lands between the check and the wait is not lost.
+    """
+
+    def __init__(self) -> None:
+        self._events: Dict[int, asyncio.Event] = {}
+
+    def event(self, execution_id: int) -> asyncio.Event:
+        """Get the event the next notification for an execution will set."""
+        event = self._events.get(execution_id)
+        if event is None:
+            event = self._events[execution_id] = asyncio.Event()
+        return event
+
+    def notify(self, execution_id: int) -> None:
+        """Wake everyone waiting on an execution."""
+        event = self._events.pop(execution_id, None)
+        if event is not None:
+            event.set()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+# Create a global output notifier
+output_notifier = OutputNotifier()
+registry.gauge(
+    "output_stream_waiting_executions",
+    "Executions with readers waiting for new output chunks",
+    lambda: len(output_notifier),
+)
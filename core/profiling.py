@@ -0,0 +1,108 @@
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from types import FrameType
+from typing import Optional
+
+from core.config import settings
+from core.metrics import registry
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """Render a frame chain as a root-first collapsed stack line."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", code.co_filename)
+        parts.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def format_collapsed(samples: Counter) -> str:
+    """Format samples in the collapsed-stack format used by flamegraph tools."""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class SamplingProfiler:
+    """Low-overhead sampling profiler for a single thread.
+
+    A helper thread periodically reads the target thread's current frame
+    via sys._current_frames() and counts collapsed stacks, so the target
+    (normally the event loop thread) is never instrumented or paused.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005) -> None:
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the collected stacks."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.started_at is not None:
+            self.duration = time.monotonic() - self.started_at
+        return self.samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[collapse_stack(frame)] += 1
+                self.sample_count += 1
+            del frame
+
+    def collapsed(self) -> str:
+        """Collected samples in collapsed-stack format."""
+        return format_collapsed(self.samples)
+
+
+# Only one on-demand profile may run per process at a time
+profile_lock = threading.Lock()
+
+
+class ProfileStore:
+    """Keeps the most recent per-request profiles for later retrieval."""
+
+    def __init__(self, max_profiles: int) -> None:
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, str]" = OrderedDict()
+
+    def add(self, collapsed: str) -> str:
+        """Store a profile and return its ID."""
+        profile_id = uuid.uuid4().hex
+        self._profiles[profile_id] = collapsed
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[str]:
+        """Get a stored profile by ID."""
+        return self._profiles.get(profile_id)
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+
+# Create a global store for per-request profiles
+request_profiles = ProfileStore(settings.PROFILER_KEEP_REQUEST_PROFILES)
+registry.gauge(
+    "profiler_stored_request_profiles",
+    "Per-request profiles kept for retrieval",
+    lambda: len(request_profiles),
+)
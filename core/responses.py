@@ -0,0 +1,31 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "_mapping"):  # sqlalchemy Row
+        return dict(value._mapping)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RowJSONResponse(JSONResponse):
+    """JSON response for dicts and rows read straight from the database.
+
+    Returning a Response makes FastAPI skip response_model validation, so
+    endpoints on the read fast path serialize their rows exactly once.
+    The route's response_model still documents the shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=json_default,
+        ).encode("utf-8")
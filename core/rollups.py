@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.sketch import LatencySketch
+from models.rollup import ExecutionRollup, ExecutionRollupLatency
+
+# Bucket widths rollups are kept at
+GRANULARITIES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+ROLLUP_KEY = ("granularity", "bucket_start", "user_id", "agent_id")
+
+# Shared sketch used to compute bins; stored bins depend on its accuracy
+bins = LatencySketch(settings.ROLLUP_SKETCH_ACCURACY)
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket."""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class RollupBatch:
+    """Folds finished executions into rollup increments and writes them at once.
+
+    Every write is an upsert that adds to the stored counters, so
+    concurrent writers never need to read a bucket before updating it.
+    """
+
+    def __init__(self) -> None:
+        self.rollups: Dict[Tuple, List[float]] = {}
+        self.latency: Dict[Tuple, int] = {}
+
+    def add(self, execution: Any) -> None:
+        """Fold in one finished execution, bucketed by its completion time."""
+        if execution.completed_at is None:
+            return
+        duration = None
+        if execution.started_at is not None:
+            duration = max((execution.completed_at - execution.started_at).total_seconds(), 0.0)
+        failed = execution.status == "failed"
+
+        for granularity in GRANULARITIES:
+            key = (
+                granularity,
+                bucket_start(execution.completed_at, granularity),
+                execution.user_id,
+                execution.agent_id,
+            )
+            totals = self.rollups.setdefault(key, [0, 0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += failed
+            if duration is not None:
+                totals[2] += duration
+                totals[3] += 1
+                latency_key = (*key, bins.bin(duration))
+                self.latency[latency_key] = self.latency.get(latency_key, 0) + 1
+
+    async def flush(self, db: AsyncSession) -> None:
+        """Write the accumulated increments in the caller's transaction."""
+        if self.rollups:
+            stmt = insert(ExecutionRollup)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=ROLLUP_KEY,
+                    set_={
+                        column: getattr(ExecutionRollup, column) + getattr(stmt.excluded, column)
+                        for column in ("count", "failed_count", "total_duration", "timed_count")
+                    },
+                ),
+                [
+                    {
+                        **dict(zip(ROLLUP_KEY, key)),
+                        "count": count,
+                        "failed_count": failed,
+                        "total_duration": total_duration,
+                        "timed_count": timed,
+                    }
+                    for key, (count, failed, total_duration, timed) in self.rollups.items()
+                ],
+            )
+        if self.latency:
+            stmt = insert(ExecutionRollupLatency)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=(*ROLLUP_KEY, "bin"),
+                    set_={"count": ExecutionRollupLatency.count + stmt.excluded.count},
+                ),
+                [
+                    {**dict(zip((*ROLLUP_KEY, "bin"), key)), "count": count}
+                    for key, count in self.latency.items()
+                ],
+            )
+        self.rollups.clear()
+        self.latency.clear()
+
+
+async def record_completion(db: AsyncSession, execution: Any) -> None:
+    """Fold one newly finished execution into the rollups."""
+    batch = RollupBatch()
+    batch.add(execution)
+    await batch.flush(db)
+
+
+async def query_analytics(
+    db: AsyncSession,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    quantiles: Sequence[float],
+    user_id: Optional[int] = None,
+    agent_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Per-bucket counts, failure rate and latency quantiles between start and end.
+
+    Reads only the rollup tables; rows for the selected users and agents
+    are summed per bucket, and their latency bins merged.
+    """
+    def scoped(model: Any) -> Any:
+        conditions = [
+            model.granularity == granularity,
+            model.bucket_start >= bucket_start(start, granularity),
+            model.bucket_start < end,
+        ]
+        if user_id is not None:
+            conditions.append(model.user_id == user_id)
+        if agent_id is not None:
+            conditions.append(model.agent_id == agent_id)
+        return and_(*conditions)
+
+    totals = await db.execute(
+        select(
+            ExecutionRollup.bucket_start,
+            func.sum(ExecutionRollup.count),
+            func.sum(ExecutionRollup.failed_count),
+            func.sum(ExecutionRollup.total_duration),
+            func.sum(ExecutionRollup.timed_count),
+        )
+        .where(scoped(ExecutionRollup))
+        .group_by(ExecutionRollup.bucket_start)
+        .order_by(ExecutionRollup.bucket_start)
+    )
+    latency = await db.execute(
+        select(
+            ExecutionRollupLatency.bucket_start,
+            ExecutionRollupLatency.bin,
+            func.sum(ExecutionRollupLatency.count),
+        )
+        .where(scoped(ExecutionRollupLatency))
+        .group_by(ExecutionRollupLatency.bucket_start, ExecutionRollupLatency.bin)
+    )
+    sketches: Dict[datetime, LatencySketch] = {}
+    for bucket, index, count in latency:
+        sketch = sketches.get(bucket)
+        if sketch is None:
+            sketch = sketches[bucket] = LatencySketch(settings.ROLLUP_SKETCH_ACCURACY)
+        sketch.counts[index] = count
+
+    buckets = []
+    for bucket, count, failed, total_duration, timed in totals:
+        sketch = sketches.get(bucket)
+        estimates = sketch.quantiles(quantiles) if sketch else [None] * len(quantiles)
+        buckets.append({
+            "bucket_start": bucket,
+            "count": count,
+            "failed_count": failed,
+            "failure_rate": failed / count if count else 0.0,
+            "average_duration": total_duration / timed if timed else None,
+            "percentiles": {f"p{q * 100:g}": value for q, value in zip(quantiles, estimates)},
+        })
+    return buckets
@@ -0,0 +1,63 @@
+import math
+from typing import Dict, Iterable, List, Optional
+
+
+class LatencySketch:
+    """Mergeable latency histogram with bounded relative error.
+
+    Values land in logarithmic bins (as in DDSketch): bin i covers
+    (gamma^(i-1), gamma^i], so any quantile is reported within
+    `relative_accuracy` of the true value. Two sketches merge by adding
+    bin counts, which is what lets rollup rows be summed in SQL and then
+    combined across buckets, agents or users.
+    """
+
+    # Durations below this (seconds) share the lowest bin
+    MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy: float, counts: Optional[Dict[int, int]] = None) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts: Dict[int, int] = dict(counts or {})
+
+    def bin(self, value: float) -> int:
+        """Index of the bin a value falls into."""
+        return math.ceil(math.log(max(value, self.MIN_VALUE)) / self._log_gamma)
+
+    def bin_value(self, index: int) -> float:
+        """Representative value of a bin, within relative_accuracy of all its members."""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        index = self.bin(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other: "LatencySketch") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """Estimate several quantiles (0..1) in one pass over the bins."""
+        qs = list(qs)
+        total = self.count
+        if total == 0:
+            return [None] * len(qs)
+
+        # Walk the bins once, answering quantiles in ascending order
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        results: List[Optional[float]] = [None] * len(qs)
+        bins = sorted(self.counts.items())
+        seen = 0
+        position = 0
+        for i in order:
+            rank = qs[i] * (total - 1)
+            while seen + bins[position][1] <= rank:
+                seen += bins[position][1]
+                position += 1
+            results[i] = self.bin_value(bins[position][0])
+        return results
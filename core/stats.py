@@ -0,0 +1,290 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Type
+
+from sqlalchemy import Select, and_, case, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.rollups import record_completion
+from models.execution import Execution
+from models.stats import AgentStats, ExecutionStatsMixin, ToolStats
+from models.tool import AgentTool
+from schemas.stats import ExecutionStats
+
+# Statuses with their own counter column
+STATUS_COUNT_COLUMNS = {
+    "pending": "pending_count",
+    "running": "running_count",
+    "completed": "completed_count",
+    "failed": "failed_count",
+}
+# Statuses whose runs contribute to the duration totals
+FINISHED_STATUSES = ("completed", "failed")
+# Additive stats columns, everything but last_run_at
+COUNTER_COLUMNS = ("run_count", *STATUS_COUNT_COLUMNS.values(), "total_duration", "timed_count")
+
+
+def _duration(execution: Execution) -> Optional[float]:
+    if execution.started_at is None or execution.completed_at is None:
+        return None
+    return (execution.completed_at - execution.started_at).total_seconds()
+
+
+def _deltas(
+    execution: Execution,
+    previous_status: Optional[str],
+    new_status: Optional[str],
+) -> Dict[str, float]:
+    """Counter changes for one transition; None stands for created or deleted."""
+    deltas: Dict[str, float] = defaultdict(int)
+    if previous_status is None:
+        deltas["run_count"] += 1
+    if new_status is None:
+        deltas["run_count"] -= 1
+    if previous_status in STATUS_COUNT_COLUMNS:
+        deltas[STATUS_COUNT_COLUMNS[previous_status]] -= 1
+    if new_status in STATUS_COUNT_COLUMNS:
+        deltas[STATUS_COUNT_COLUMNS[new_status]] += 1
+
+    duration = _duration(execution)
+    was_timed = previous_status in FINISHED_STATUSES
+    is_timed = new_status in FINISHED_STATUSES
+    if duration is not None and was_timed != is_timed:
+        sign = 1 if is_timed else -1
+        deltas["total_duration"] += sign * duration
+        deltas["timed_count"] += sign
+    return {name: delta for name, delta in deltas.items() if delta}
+
+
+def _values(
+    model: Type[ExecutionStatsMixin],
+    deltas: Dict[str, float],
+    last_run_at: Optional[datetime],
+) -> Dict[str, Any]:
+    """SET clause applying deltas; last_run_at only ever moves forward."""
+    values: Dict[str, Any] = {
+        name: getattr(model, name) + delta for name, delta in deltas.items()
+    }
+    if last_run_at is not None:
+        values["last_run_at"] = case(
+            (model.last_run_at.is_(None), last_run_at),
+            (model.last_run_at < last_run_at, last_run_at),
+            else_=model.last_run_at,
+        )
+    return values
+
+
+async def record_status_change(
+    db: AsyncSession,
+    execution: Execution,
+    previous_status: Optional[str],
+    new_status: Optional[str] = None,
+) -> None:
+    """Apply an execution status transition to its agent's and tools' stats.
+
+    Call in the same transaction as the transition itself. new_status
+    defaults to execution.status; pass previous_status=None for a newly
+    created execution and record_deletion() for a deleted one. Tool stats
+    change along with those of the tools enabled on the agent, which
+    record_tool_change() keeps equal to the sum over those agents.
+    Finished runs are also folded into the time-bucketed rollups.
+    """
+    if new_status is None:
+        new_status = execution.status
+    if new_status == previous_status:
+        return
+    await _apply(db, execution, previous_status, new_status)
+    if new_status in FINISHED_STATUSES and previous_status not in FINISHED_STATUSES:
+        await record_completion(db, execution)
+
+
+async def record_creations(db: AsyncSession, executions: Sequence[Execution]) -> None:
+    """Apply many newly created executions to the stats, one update per agent."""
+    per_agent: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(int))
+    for execution in executions:
+        for name, delta in _deltas(execution, None, execution.status).items():
+            per_agent[execution.agent_id][name] += delta
+    for agent_id, deltas in per_agent.items():
+        await _apply_deltas(db, agent_id, deltas, None)
+    for execution in executions:
+        if execution.status in FINISHED_STATUSES:
+            await record_completion(db, execution)
+
+
+async def record_deletion(db: AsyncSession, execution: Execution) -> None:
+    """Remove a deleted execution from its agent's and tools' stats."""
+    await _apply(db, execution, execution.status, None)
+
+
+def _enabled_tool_ids(agent_id: int) -> Select:
+    """IDs of the tools enabled on an agent; the tools its runs count against."""
+    return select(AgentTool.tool_id).where(
+        AgentTool.agent_id == agent_id,
+        AgentTool.is_enabled.is_(True),
+    )
+
+
+async def _agent_deltas(db: AsyncSession, agent_id: int, sign: int) -> Dict[str, float]:
+    """An agent's totals as deltas, negated for sign=-1."""
+    row = (await db.execute(
+        select(*(getattr(AgentStats, name) for name in COUNTER_COLUMNS))
+        .where(AgentStats.agent_id == agent_id)
+    )).first()
+    if row is None:
+        return {}
+    return {name: sign * value for name, value in zip(COUNTER_COLUMNS, row) if value}
+
+
+async def tool_enabled(db: AsyncSession, agent_id: int, tool_id: int) -> bool:
+    """Whether an agent's runs currently count against a tool."""
+    result = await db.execute(
+        _enabled_tool_ids(agent_id).where(AgentTool.tool_id == tool_id).limit(1)
+    )
+    return result.first() is not None
+
+
+async def record_tool_change(db: AsyncSession, agent_id: int, tool_id: int, was_enabled: bool) -> None:
+    """Move an agent's totals onto or off a tool after its AgentTool rows changed.
+
+    A tool's stats are the sum of the stats of the agents it is enabled
+    on, so attaching or enabling it adds the agent's totals and detaching
+    or disabling it subtracts them. was_enabled is tool_enabled() from
+    before the change; call in the same transaction as the change, which
+    is flushed first.
+    """
+    await db.flush()
+    enabled = await tool_enabled(db, agent_id, tool_id)
+    if enabled == was_enabled:
+        return
+    deltas = await _agent_deltas(db, agent_id, 1 if enabled else -1)
+    if not deltas:
+        return
+    await db.execute(insert(ToolStats).values(tool_id=tool_id).on_conflict_do_nothing())
+    last_run_at = None
+    if enabled:
+        last_run_at = (await db.execute(
+            select(AgentStats.last_run_at).where(AgentStats.agent_id == agent_id)
+        )).scalar()
+    await db.execute(
+        update(ToolStats)
+        .where(ToolStats.tool_id == tool_id)
+        .values(_values(ToolStats, deltas, last_run_at))
+    )
+
+
+async def record_agent_deletion(db: AsyncSession, agent_id: int) -> None:
+    """Remove a deleted agent's runs from its tools' stats and drop its own stats.
+
+    Call before deleting the agent's AgentTool rows. The agent's stats
+    include its archived runs, so each tool is left with the runs of its
+    other agents; last_run_at cannot be undone and is kept.
+    """
+    deltas = await _agent_deltas(db, agent_id, -1)
+    if deltas:
+        await db.execute(
+            update(ToolStats)
+            .where(ToolStats.tool_id.in_(_enabled_tool_ids(agent_id)))
+            .values(_values(ToolStats, deltas, None))
+        )
+    await db.execute(delete(AgentStats).where(AgentStats.agent_id == agent_id))
+
+
+async def _apply(
+    db: AsyncSession,
+    execution: Execution,
+    previous_status: Optional[str],
+    new_status: Optional[str],
+) -> None:
+    deltas = _deltas(execution, previous_status, new_status)
+    last_run_at = execution.started_at if new_status == "running" else None
+    if not deltas and last_run_at is None:
+        return
+    await _apply_deltas(db, execution.agent_id, deltas, last_run_at)
+
+
+async def _apply_deltas(
+    db: AsyncSession,
+    agent_id: int,
+    deltas: Dict[str, float],
+    last_run_at: Optional[datetime],
+) -> None:
+    await db.execute(
+        insert(AgentStats).values(agent_id=agent_id).on_conflict_do_nothing()
+    )
+    await db.execute(
+        update(AgentStats)
+        .where(AgentStats.agent_id == agent_id)
+        .values(_values(AgentStats, deltas, last_run_at))
+    )
+
+    tool_ids = _enabled_tool_ids(agent_id)
+    await db.execute(
+        insert(ToolStats).from_select(["tool_id"], tool_ids).on_conflict_do_nothing()
+    )
+    await db.execute(
+        update(ToolStats)
+        .where(ToolStats.tool_id.in_(tool_ids))
+        .values(_values(ToolStats, deltas, last_run_at))
+    )
+
+
+def _aggregate(key: Any) -> Select:
+    """Recompute stats columns from executions, grouped by key."""
+    timed = and_(
+        Execution.status.in_(FINISHED_STATUSES),
+        Execution.started_at.is_not(None),
+        Execution.completed_at.is_not(None),
+    )
+    duration = (func.julianday(Execution.completed_at) - func.julianday(Execution.started_at)) * 86400
+    return select(
+        key,
+        func.count(),
+        *(
+            func.sum(case((Execution.status == status, 1), else_=0))
+            for status in STATUS_COUNT_COLUMNS
+        ),
+        func.coalesce(func.sum(case((timed, duration), else_=0.0)), 0.0),
+        func.sum(case((timed, 1), else_=0)),
+        func.max(Execution.started_at),
+    ).group_by(key)
+
+
+async def rebuild_stats(db: AsyncSession) -> None:
+    """Recompute all agent and tool stats from the executions table."""
+    columns = [*COUNTER_COLUMNS, "last_run_at"]
+    await db.execute(delete(AgentStats))
+    await db.execute(
+        insert(AgentStats).from_select(["agent_id", *columns], _aggregate(Execution.agent_id))
+    )
+    await db.execute(delete(ToolStats))
+    # Each agent counts once per tool, however many associations enable it
+    enabled = (
+        select(AgentTool.agent_id, AgentTool.tool_id)
+        .where(AgentTool.is_enabled.is_(True))
+        .distinct()
+        .subquery()
+    )
+    await db.execute(
+        insert(ToolStats).from_select(
+            ["tool_id", *columns],
+            _aggregate(enabled.c.tool_id).join_from(
+                Execution, enabled, enabled.c.agent_id == Execution.agent_id
+            ),
+        )
+    )
+
+
+def stats_response(stats: Optional[Any]) -> ExecutionStats:
+    """Build the API view of a stats row; None means no runs yet."""
+    if stats is None:
+        return ExecutionStats()
+    return ExecutionStats(
+        run_count=stats.run_count,
+        status_counts={
+            status: getattr(stats, column) for status, column in STATUS_COUNT_COLUMNS.items()
+        },
+        total_duration=stats.total_duration,
+        average_duration=stats.total_duration / stats.timed_count if stats.timed_count else None,
+        last_run_at=stats.last_run_at,
+    )
@@ -0,0 +1,64 @@
+"""Latest known status of executions being processed in this process.
+
+process_execution only writes an execution's row when its status
+changes, but polls Toolhouse every couple of seconds. Each poll result
+is kept here so status lookups can answer for running executions with
+the freshest data, without a Toolhouse call of their own.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from core.config import settings
+from core.metrics import registry
+
+
+@dataclass(frozen=True)
+class CachedStatus:
+    """One Toolhouse poll result for an execution."""
+
+    status: str
+    progress: Optional[float]  # 0..1 when Toolhouse reports it
+    updated_at: datetime
+
+
+def progress_hint(value: Any) -> Optional[float]:
+    """A progress value from Toolhouse as a fraction, or None if it is not one."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return min(max(float(value), 0.0), 1.0)
+
+
+class ExecutionStatusCache:
+    """LRU of CachedStatus per execution ID."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._entries: "OrderedDict[int, CachedStatus]" = OrderedDict()
+
+    def update(self, execution_id: int, status: str, progress: Any = None) -> None:
+        """Record the latest polled status of an execution."""
+        self._entries[execution_id] = CachedStatus(status, progress_hint(progress), datetime.utcnow())
+        self._entries.move_to_end(execution_id)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, execution_id: int) -> Optional[CachedStatus]:
+        return self._entries.get(execution_id)
+
+    def discard(self, execution_id: int) -> None:
+        """Forget an execution whose final status is in the database."""
+        self._entries.pop(execution_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Create a global execution status cache instance
+status_cache = ExecutionStatusCache(settings.EXECUTION_STATUS_CACHE_SIZE)
+registry.gauge(
+    "execution_status_cache_entries",
+    "Executions whose latest polled status is cached",
+    lambda: len(status_cache),
+)
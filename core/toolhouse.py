@@ -101,6 +101,14 @@ class ToolhouseClient:
         """Get the status of an execution."""
         return await self._make_request("GET", f"/executions/{execution_id}")
 
+    async def get_execution_output(
+        self,
+        execution_id: str,
+        after: int = 0,
+    ) -> Dict[str, Any]:
+        """Get output chunks of an execution, skipping the first `after` chunks."""
+        return await self._make_request("GET", f"/executions/{execution_id}/output?after={after}")
+
     async def stop_execution(self, execution_id: str) -> Dict[str, Any]:
         """Stop an ongoing execution."""
         return await self._make_request("POST", f"/executions/{execution_id}/stop")
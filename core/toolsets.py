@@ -0,0 +1,162 @@
+"""Resolved, cached per-agent tool sets.
+
+An agent's effective tool set is its enabled AgentTool associations with
+active tools, each tool's configuration overlaid with the association's.
+Resolving it takes a join over agent_tools and tools, so resolved sets
+are cached as immutable ToolSet snapshots.
+
+Snapshots are keyed by Agent.tool_set_version, which every change to
+the agent's associations or to one of its tools bumps in the same
+transaction (see invalidate_agent / invalidate_tool). A cached snapshot
+is used only while its version matches the agent row the caller already
+loaded, so the cache stays correct across workers without any
+cross-process signalling.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.canonical import content_hash
+from core.config import settings
+from core.metrics import registry
+from models.agent import Agent
+from models.tool import AgentTool, Tool
+
+agent_tools = AgentTool.__table__
+tools = Tool.__table__
+
+lookups_counter = registry.counter(
+    "tool_set_cache_lookups_total",
+    "Tool set lookups, by whether the cached snapshot was current",
+)
+
+RESOLVE_TOOL_SET = (
+    select(
+        tools.c.id,
+        tools.c.name,
+        tools.c.version,
+        tools.c.toolhouse_tool_id,
+        tools.c.schema,
+        tools.c.configuration,
+        agent_tools.c.configuration.label("agent_configuration"),
+    )
+    .join(agent_tools, agent_tools.c.tool_id == tools.c.id)
+    .where(
+        agent_tools.c.agent_id == bindparam("agent_id"),
+        agent_tools.c.is_enabled.is_(True),
+        tools.c.is_active.is_(True),
+    )
+    .order_by(agent_tools.c.id)
+)
+
+# Tool columns a snapshot depends on besides configuration; changing one invalidates it
+TOOL_SNAPSHOT_FIELDS = frozenset(
+    ("name", "version", "toolhouse_tool_id", "schema", "is_active")
+)
+
+
+@dataclass(frozen=True)
+class ResolvedTool:
+    """One tool as an agent sees it. Treat schema and configuration as read-only."""
+
+    tool_id: int
+    name: str
+    version: str
+    toolhouse_tool_id: Optional[str]
+    schema: Dict[str, Any]
+    schema_hash: str  # content hash of schema, keys compiled input validators
+    configuration: Dict[str, Any]  # the tool's, overlaid with the agent's
+
+
+@dataclass(frozen=True)
+class ToolSet:
+    """An agent's effective tools at one tool_set_version."""
+
+    agent_id: int
+    version: int
+    tools: Tuple[ResolvedTool, ...]
+
+
+async def resolve_tool_set(db: AsyncSession, agent_id: int, version: int) -> ToolSet:
+    """Build an agent's tool set from the database."""
+    rows = await db.execute(RESOLVE_TOOL_SET, {"agent_id": agent_id})
+    return ToolSet(
+        agent_id=agent_id,
+        version=version,
+        tools=tuple(
+            ResolvedTool(
+                tool_id=row.id,
+                name=row.name,
+                version=row.version,
+                toolhouse_tool_id=row.toolhouse_tool_id,
+                schema=row.schema or {},
+                schema_hash=content_hash(row.schema or {}),
+                configuration={**(row.configuration or {}), **(row.agent_configuration or {})},
+            )
+            for row in rows
+        ),
+    )
+
+
+class ToolSetCache:
+    """LRU of the latest resolved ToolSet per agent."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._entries: "OrderedDict[int, ToolSet]" = OrderedDict()
+
+    async def get(self, db: AsyncSession, agent: Any) -> ToolSet:
+        """The tool set of an agent row (anything with id and tool_set_version)."""
+        cached = self._entries.get(agent.id)
+        if cached is not None and cached.version == agent.tool_set_version:
+            self._entries.move_to_end(agent.id)
+            lookups_counter.inc(result="hit")
+            return cached
+
+        lookups_counter.inc(result="miss")
+        tool_set = await resolve_tool_set(db, agent.id, agent.tool_set_version)
+        self._entries[agent.id] = tool_set
+        self._entries.move_to_end(agent.id)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return tool_set
+
+    def discard(self, *agent_ids: int) -> None:
+        for agent_id in agent_ids:
+            self._entries.pop(agent_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+async def invalidate_agent(db: AsyncSession, agent_id: int) -> None:
+    """Bump an agent's tool_set_version in the caller's transaction."""
+    await db.execute(
+        update(Agent)
+        .where(Agent.id == agent_id)
+        .values(tool_set_version=Agent.tool_set_version + 1)
+    )
+    tool_sets.discard(agent_id)
+
+
+async def invalidate_tool(db: AsyncSession, tool_id: int) -> None:
+    """Bump the tool_set_version of every agent using a tool."""
+    result = await db.execute(
+        update(Agent)
+        .where(Agent.id.in_(select(AgentTool.agent_id).where(AgentTool.tool_id == tool_id)))
+        .values(tool_set_version=Agent.tool_set_version + 1)
+        .returning(Agent.id)
+    )
+    tool_sets.discard(*result.scalars().all())
+
+
+# Create a global tool set cache instance
+tool_sets = ToolSetCache(settings.TOOL_SET_CACHE_SIZE)
+registry.gauge(
+    "tool_set_cache_entries",
+    "Agents whose resolved tool set is cached",
+    lambda: len(tool_sets),
+)
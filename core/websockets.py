@@ -1,63 +1,323 @@
-from typing import Dict, Set, Optional, Any
-from fastapi import WebSocket
+from collections import deque
+from typing import Deque, Dict, Iterable, Set, Optional, Any
+from fastapi import WebSocket, status
+import asyncio
 import json
 import logging
+import time
+
+from core.config import settings
+from core.jsonpatch import make_patch
+from core.metrics import registry
+from core.ws_codec import DEFAULT_FORMAT, EncodedMessage, WireFormat
 
 logger = logging.getLogger(__name__)
 
 
+class SendQueueFull(Exception):
+    """Raised when a connection has too many messages waiting to be sent."""
+
+
+class ConnectionLimitExceeded(Exception):
+    """Raised when accepting a socket would exceed a connection cap."""
+
+
+reaped_counter = registry.counter(
+    "ws_reaped_connections_total",
+    "WebSocket connections closed by the heartbeat for being idle or dead",
+)
+rejected_counter = registry.counter(
+    "ws_rejected_connections_total",
+    "WebSocket connections refused because a connection cap was reached",
+)
+
+
+class Connection:
+    """Per-socket state tracked by the ConnectionManager.
+
+    Uses __slots__ to keep the per-connection footprint small; the
+    subscription set and send queue are only allocated while needed.
+    """
+
+    __slots__ = (
+        "websocket",
+        "user_id",
+        "executions",
+        "queue",
+        "versions",
+        "wire_format",
+        "connected_at",
+        "last_seen",
+        "messages_sent",
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        wire_format: WireFormat = DEFAULT_FORMAT,
+    ) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        # Execution IDs this connection is subscribed to
+        self.executions: Optional[Set[int]] = None
+        # Messages waiting while another send is in flight
+        self.queue: Optional[Deque[EncodedMessage]] = None
+        # output_data version held by the client, per execution
+        self.versions: Optional[Dict[int, int]] = None
+        # (encoding, compression) negotiated at connect time
+        self.wire_format = wire_format
+        self.connected_at = time.monotonic()
+        self.last_seen = self.connected_at
+        self.messages_sent = 0
+
+    async def send(self, message: Any) -> None:
+        """Send a message, queueing it behind a send that is already in flight.
+
+        Sends on one socket are serialized; the coroutine that started the
+        in-flight send drains the queue.
+        """
+        if not isinstance(message, EncodedMessage):
+            message = EncodedMessage(message)
+
+        if self.queue is not None:
+            if len(self.queue) >= settings.WS_SEND_QUEUE_SIZE:
+                raise SendQueueFull(f"{len(self.queue)} messages already queued")
+            self.queue.append(message)
+            return
+
+        self.queue = deque()
+        try:
+            await self._send_frame(message)
+            while self.queue:
+                await self._send_frame(self.queue.popleft())
+        finally:
+            self.queue = None
+
+    async def _send_frame(self, message: EncodedMessage) -> None:
+        frame = message.frame(self.wire_format)
+        if isinstance(frame, str):
+            await self.websocket.send_text(frame)
+            size = message.json_size
+        else:
+            await self.websocket.send_bytes(frame)
+            size = len(frame)
+        message.record_sent(self.wire_format, size)
+        self.messages_sent += 1
+
+
+class OutputState:
+    """Last output_data sent for an execution and its version number."""
+
+    __slots__ = ("user_id", "version", "output", "updated_at")
+
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        self.version = 0
+        self.output: Any = None
+        self.updated_at = time.monotonic()
+
+
 class ConnectionManager:
     """Manages WebSocket connections and message broadcasting."""
-    
+
     def __init__(self):
-        # All active connections
-        self.active_connections: Set[WebSocket] = set()
+        # Reverse index from socket to its connection record
+        self.connections: Dict[WebSocket, Connection] = {}
         # Connections by user_id
-        self.user_connections: Dict[int, Set[WebSocket]] = {}
+        self.user_connections: Dict[int, Set[Connection]] = {}
         # Connections subscribed to specific executions
-        self.execution_connections: Dict[int, Set[WebSocket]] = {}
+        self.execution_connections: Dict[int, Set[Connection]] = {}
+        # Last output_data broadcast per running execution, for JSON Patch deltas
+        self.output_states: Dict[int, OutputState] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    def check_limits(self, user_id: int) -> None:
+        """Raise ConnectionLimitExceeded if a new socket for user_id would exceed a cap."""
+        if len(self.connections) >= settings.WS_MAX_CONNECTIONS:
+            rejected_counter.inc(scope="global")
+            raise ConnectionLimitExceeded("Server connection limit reached")
+        if len(self.user_connections.get(user_id, ())) >= settings.WS_MAX_CONNECTIONS_PER_USER:
+            rejected_counter.inc(scope="user")
+            raise ConnectionLimitExceeded("Too many connections for this user")
 
     async def connect(
         self,
         websocket: WebSocket,
         user_id: int,
         execution_id: Optional[int] = None,
-    ) -> None:
-        """Connect a new WebSocket client."""
+        wire_format: WireFormat = DEFAULT_FORMAT,
+    ) -> Connection:
+        """Connect a new WebSocket client.
+
+        Raises ConnectionLimitExceeded before accepting if a cap is reached.
+        """
+        self.check_limits(user_id)
         await websocket.accept()
-        self.active_connections.add(websocket)
-        
+        connection = Connection(websocket, user_id, wire_format)
+        self.connections[websocket] = connection
+
         # Add to user connections
-        if user_id not in self.user_connections:
-            self.user_connections[user_id] = set()
-        self.user_connections[user_id].add(websocket)
-        
+        self.user_connections.setdefault(user_id, set()).add(connection)
+
         # Add to execution connections if specified
         if execution_id is not None:
-            if execution_id not in self.execution_connections:
-                self.execution_connections[execution_id] = set()
-            self.execution_connections[execution_id].add(websocket)
+            self.subscribe(connection, execution_id)
+        return connection
+
+    def subscribe(self, connection: Connection, execution_id: int) -> None:
+        """Subscribe a connection to updates of an execution."""
+        if connection.executions is None:
+            connection.executions = set()
+        connection.executions.add(execution_id)
+        self.execution_connections.setdefault(execution_id, set()).add(connection)
+
+    def unsubscribe(self, connection: Connection, execution_id: int) -> None:
+        """Unsubscribe a connection from updates of an execution."""
+        if connection.executions is not None:
+            connection.executions.discard(execution_id)
+        subscribers = self.execution_connections.get(execution_id)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self.execution_connections[execution_id]
+
+    async def disconnect(self, websocket: WebSocket) -> None:
+        """Disconnect a WebSocket client.
+
+        Costs O(subscriptions of the socket); unknown sockets are ignored.
+        """
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return
 
-    async def disconnect(
-        self,
-        websocket: WebSocket,
-        user_id: int,
-        execution_id: Optional[int] = None,
-    ) -> None:
-        """Disconnect a WebSocket client."""
-        self.active_connections.discard(websocket)
-        
         # Remove from user connections
-        if user_id in self.user_connections:
-            self.user_connections[user_id].discard(websocket)
-            if not self.user_connections[user_id]:
-                del self.user_connections[user_id]
-        
+        user_connections = self.user_connections.get(connection.user_id)
+        if user_connections is not None:
+            user_connections.discard(connection)
+            if not user_connections:
+                del self.user_connections[connection.user_id]
+
         # Remove from execution connections
-        if execution_id is not None and execution_id in self.execution_connections:
-            self.execution_connections[execution_id].discard(websocket)
-            if not self.execution_connections[execution_id]:
-                del self.execution_connections[execution_id]
+        for execution_id in tuple(connection.executions or ()):
+            self.unsubscribe(connection, execution_id)
+
+    def can_view(self, connection: Connection, execution_id: int) -> bool:
+        """Whether a socket may receive snapshots of an execution.
+
+        Subscriptions are only made after the endpoint checked ownership;
+        callers still recheck it against the database before sending.
+        """
+        if execution_id in (connection.executions or ()):
+            return True
+        state = self.output_states.get(execution_id)
+        return state is not None and state.user_id == connection.user_id
+
+    async def send_snapshot(self, connection: Connection, execution_id: int) -> None:
+        """Send the full last-known output_data of an execution to one socket.
+
+        Used on subscribe and when a client asks to resync; does nothing
+        if no update has been broadcast for the execution yet.
+        """
+        state = self.output_states.get(execution_id)
+        if connection.versions is not None:
+            connection.versions.pop(execution_id, None)
+        if state is None:
+            return
+
+        if connection.versions is None:
+            connection.versions = {}
+        connection.versions[execution_id] = state.version
+        await self._send(connection, EncodedMessage({
+            "type": "execution_snapshot",
+            "data": {
+                "execution_id": execution_id,
+                "output_data": state.output,
+                "output_version": state.version,
+            },
+        }))
+
+    def touch(self, connection: Connection) -> None:
+        """Record that the client was heard from."""
+        connection.last_seen = time.monotonic()
+
+    async def close(self, connection: Connection, code: int, reason: str = "") -> None:
+        """Close a socket and remove it from the registry."""
+        await self.disconnect(connection.websocket)
+        try:
+            await connection.websocket.close(code=code, reason=reason)
+        except Exception:
+            # The socket is most likely already dead
+            pass
+
+    def start_heartbeat(self) -> None:
+        """Start pinging idle sockets and reaping dead ones."""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="ws-heartbeat")
+
+    async def stop_heartbeat(self) -> None:
+        """Stop the heartbeat task."""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    async def _heartbeat(self) -> None:
+        """Ping sockets that have been quiet and close those that stopped answering.
+
+        A client that answers pings (or sends anything else) keeps its
+        last_seen fresh; one that has been silent for WS_IDLE_TIMEOUT is
+        treated as half-open and reaped.
+        """
+        while True:
+            await asyncio.sleep(settings.WS_PING_INTERVAL)
+            now = time.monotonic()
+            self.expire_output_states(now - settings.WS_OUTPUT_STATE_TTL)
+            ping = EncodedMessage({"type": "ping", "data": {"ts": time.time()}})
+            for connection in tuple(self.connections.values()):
+                idle = now - connection.last_seen
+                if idle >= settings.WS_IDLE_TIMEOUT:
+                    reaped_counter.inc()
+                    await self.close(connection, status.WS_1001_GOING_AWAY, "Idle timeout")
+                elif idle >= settings.WS_PING_INTERVAL:
+                    await self._send(connection, ping)
+
+    def discard_output_state(self, execution_id: int) -> None:
+        """Forget the last output_data of an execution that was deleted."""
+        self.output_states.pop(execution_id, None)
+
+    def expire_output_states(self, cutoff: float) -> int:
+        """Forget output_data not updated since cutoff (a monotonic time).
+
+        Covers executions whose final update never came, e.g. because the
+        worker polling them died; returns how many states were dropped.
+        """
+        stale = [
+            execution_id
+            for execution_id, state in self.output_states.items()
+            if state.updated_at < cutoff
+        ]
+        for execution_id in stale:
+            del self.output_states[execution_id]
+        return len(stale)
+
+    async def _send(self, connection: Connection, message: EncodedMessage) -> None:
+        """Send to one connection, dropping it if the send fails."""
+        try:
+            await connection.send(message)
+        except Exception as e:
+            logger.error(f"Error sending message to user {connection.user_id}: {e}")
+            await self.disconnect(connection.websocket)
+
+    async def _broadcast(self, connections: Iterable[Connection], message: Any) -> None:
+        # Encode once per wire format for all recipients
+        message = EncodedMessage(message)
+        # Iterate over a copy; failed sends remove connections from the registry
+        for connection in tuple(connections):
+            await self._send(connection, message)
 
     async def broadcast_to_user(
         self,
@@ -68,18 +328,12 @@ class ConnectionManager:
         """Broadcast a message to all connections of a specific user."""
         if user_id not in self.user_connections:
             return
-        
+
         message = {
             "type": message_type,
             "data": data,
         }
-        
-        for connection in self.user_connections[user_id]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message to user {user_id}: {e}")
-                await self.disconnect(connection, user_id)
+        await self._broadcast(self.user_connections[user_id], message)
 
     async def broadcast_to_execution(
         self,
@@ -90,19 +344,98 @@ class ConnectionManager:
         """Broadcast a message to all connections watching a specific execution."""
         if execution_id not in self.execution_connections:
             return
-        
+
         message = {
             "type": message_type,
             "data": data,
         }
-        
-        for connection in self.execution_connections[execution_id]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message to execution {execution_id}: {e}")
-                # Get user_id from connection (you might need to store this information)
-                await self.disconnect(connection, 0, execution_id)
+        await self._broadcast(self.execution_connections[execution_id], message)
+
+    def _execution_targets(self, execution_id: int, user_id: int) -> Set[Connection]:
+        """Subscribers of an execution plus its owner's connections, without duplicates."""
+        targets = set(self.execution_connections.get(execution_id, ()))
+        targets.update(self.user_connections.get(user_id, ()))
+        return targets
+
+    async def broadcast_execution_event(
+        self,
+        execution_id: int,
+        user_id: int,
+        message_type: str,
+        data: Any,
+    ) -> None:
+        """Broadcast a message to an execution's subscribers and its owner, once per socket."""
+        message = {
+            "type": message_type,
+            "data": data,
+        }
+        await self._broadcast(self._execution_targets(execution_id, user_id), message)
+
+    async def broadcast_execution_update(
+        self,
+        execution_id: int,
+        user_id: int,
+        message_type: str,
+        data: Dict[str, Any],
+        final: bool = False,
+    ) -> None:
+        """Broadcast an execution update to its subscribers and its owner.
+
+        `data["output_data"]` is sent as an RFC 6902 JSON Patch
+        (`output_patch` against `base_version`) to sockets holding the
+        previous version, and as a full `output_data` snapshot to everyone
+        else or when the patch would not be smaller. Every message carries
+        `output_version`. `final` drops the remembered output afterwards.
+        """
+        targets = self._execution_targets(execution_id, user_id)
+
+        output = data.get("output_data")
+        state = self.output_states.get(execution_id)
+        if state is None:
+            state = self.output_states[execution_id] = OutputState(user_id)
+        base_version = state.version
+        patch = make_patch(state.output, output) if base_version else None
+        state.version += 1
+        state.output = output
+        state.updated_at = time.monotonic()
+
+        full = EncodedMessage({
+            "type": message_type,
+            "data": {**data, "output_version": state.version},
+        })
+        delta: Optional[EncodedMessage] = None
+        if patch is not None:
+            delta_data = {key: value for key, value in data.items() if key != "output_data"}
+            delta = EncodedMessage({
+                "type": message_type,
+                "data": {
+                    **delta_data,
+                    "output_patch": patch,
+                    "base_version": base_version,
+                    "output_version": state.version,
+                },
+            })
+            if delta.json_size >= full.json_size:
+                delta = None
+
+        # Settle every socket's version before the first await, so a concurrent
+        # update for the same execution sees consistent bookkeeping
+        sends = []
+        for connection in targets:
+            if connection.versions is None:
+                connection.versions = {}
+            has_base = connection.versions.get(execution_id) == base_version
+            if final:
+                connection.versions.pop(execution_id, None)
+            else:
+                connection.versions[execution_id] = state.version
+            sends.append((connection, delta if delta is not None and has_base else full))
+
+        for connection, message in sends:
+            await self._send(connection, message)
+
+        if final:
+            self.output_states.pop(execution_id, None)
 
     async def broadcast_system_message(
         self,
@@ -114,15 +447,30 @@ class ConnectionManager:
             "type": message_type,
             "data": data,
         }
-        
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting system message: {e}")
-                # Clean up failed connection
-                self.active_connections.discard(connection)
+        await self._broadcast(self.connections.values(), message)
 
 
 # Create a global connection manager instance
-manager = ConnectionManager() 
\ No newline at end of file
+manager = ConnectionManager()
+
+# Registry sizes; entry counts above the active count point at stale sockets
+registry.gauge(
+    "ws_active_connections",
+    "Active WebSocket connections",
+    lambda: len(manager.connections),
+)
+registry.gauge(
+    "ws_user_connection_entries",
+    "WebSocket entries indexed by user",
+    lambda: sum(len(connections) for connections in manager.user_connections.values()),
+)
+registry.gauge(
+    "ws_execution_connection_entries",
+    "WebSocket entries indexed by execution",
+    lambda: sum(len(connections) for connections in manager.execution_connections.values()),
+)
+registry.gauge(
+    "ws_output_states",
+    "Executions whose last output_data is kept for delta updates",
+    lambda: len(manager.output_states),
+)
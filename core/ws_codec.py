@@ -0,0 +1,96 @@
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple, Union
+
+import msgpack
+
+from core.metrics import registry
+
+ENCODINGS = ("json", "msgpack")
+COMPRESSIONS = ("none", "deflate")
+# Wire format used when the client does not negotiate one
+DEFAULT_FORMAT = ("json", "none")
+
+WireFormat = Tuple[str, str]
+
+bytes_sent_counter = registry.counter(
+    "ws_bytes_sent_total",
+    "WebSocket payload bytes sent, by encoding and compression",
+)
+# Savings are ws_json_bytes_equivalent_total - ws_bytes_sent_total; they go
+# negative when framing overhead outweighs compression, which a counter can't
+json_bytes_counter = registry.counter(
+    "ws_json_bytes_equivalent_total",
+    "Uncompressed JSON size of the WebSocket payloads sent, by encoding and compression",
+)
+encode_counter = registry.counter(
+    "ws_encodes_total",
+    "Messages encoded per wire format; broadcasts encode once per format",
+)
+
+
+def negotiate_format(encoding: Optional[str], compression: Optional[str]) -> WireFormat:
+    """Validate the encoding and compression a client asked for at connect time."""
+    encoding = encoding or DEFAULT_FORMAT[0]
+    compression = compression or DEFAULT_FORMAT[1]
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return encoding, compression
+
+
+def _deflate(payload: bytes) -> bytes:
+    """Raw DEFLATE, as used by permessage-deflate and DecompressionStream('deflate-raw')."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(payload) + compressor.flush()
+
+
+class EncodedMessage:
+    """A message that is encoded at most once per wire format.
+
+    Broadcasting one EncodedMessage to many sockets costs one encode per
+    distinct format instead of one per socket.
+    """
+
+    __slots__ = ("message", "_frames", "_json_size")
+
+    def __init__(self, message: Any) -> None:
+        self.message = message
+        self._frames: Dict[WireFormat, Union[str, bytes]] = {}
+        self._json_size: Optional[int] = None
+
+    def frame(self, wire_format: WireFormat) -> Union[str, bytes]:
+        """Get the frame for a format: text for plain JSON, bytes otherwise."""
+        frame = self._frames.get(wire_format)
+        if frame is None:
+            frame = self._encode(wire_format)
+            self._frames[wire_format] = frame
+            encode_counter.inc(encoding=wire_format[0], compression=wire_format[1])
+        return frame
+
+    @property
+    def json_size(self) -> int:
+        """Size of the uncompressed JSON encoding, the baseline for savings."""
+        if self._json_size is None:
+            self._json_size = len(self.frame(DEFAULT_FORMAT).encode())
+        return self._json_size
+
+    def _encode(self, wire_format: WireFormat) -> Union[str, bytes]:
+        encoding, compression = wire_format
+        if encoding == "msgpack":
+            payload: Union[str, bytes] = msgpack.packb(self.message, default=str)
+        else:
+            # Same separators as WebSocket.send_json
+            payload = json.dumps(self.message, separators=(",", ":"), ensure_ascii=False, default=str)
+        if compression == "deflate":
+            if isinstance(payload, str):
+                payload = payload.encode()
+            payload = _deflate(payload)
+        return payload
+
+    def record_sent(self, wire_format: WireFormat, size: int) -> None:
+        """Update bandwidth metrics for one frame sent."""
+        encoding, compression = wire_format
+        bytes_sent_counter.inc(size, encoding=encoding, compression=compression)
+        json_bytes_counter.inc(self.json_size, encoding=encoding, compression=compression)
@@ -0,0 +1,319 @@
+"""Move old finished executions into a separate archive database.
+
+Usage:
+    python -m db.archive [--older-than-days N] [--batch-size N] [--max-batches N]
+
+The hot database keeps recent and unfinished executions; finished ones
+older than ARCHIVE_AFTER_DAYS move, with their output chunks, into the
+SQLite file at ARCHIVE_DB_PATH. Each batch runs as one short transaction
+on a hot connection with the archive ATTACHed, followed by a
+`PRAGMA incremental_vacuum` so the freed pages are returned to the OS.
+Reads by ID fall through to the archive through a separate read engine.
+
+Archived executions keep their IDs, so the hot executions table is
+declared AUTOINCREMENT and its sequence is kept past the archive's
+highest ID; databases created before that need `python -m
+db.execution_ids` once before archiving.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import DateTime, Row, bindparam, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from core.config import settings
+from core.metrics import registry
+from db.base import engine
+from models.execution import Execution, ExecutionOutputChunk
+
+logger = logging.getLogger(__name__)
+
+executions = Execution.__table__
+chunks = ExecutionOutputChunk.__table__
+
+archived_counter = registry.counter(
+    "executions_archived_total",
+    "Executions moved from the hot database into the archive",
+)
+archive_reads_counter = registry.counter(
+    "archive_reads_total",
+    "Reads that fell through to the archive database",
+)
+
+EXECUTION_BY_ID = select(executions).where(executions.c.id == bindparam("execution_id"))
+SELECT_BATCH = text(
+    "SELECT id FROM main.executions "
+    "WHERE status IN ('completed', 'failed') AND completed_at < :cutoff "
+    "ORDER BY id LIMIT :limit"
+).bindparams(bindparam("cutoff", type_=DateTime(timezone=True)))
+# Run with the archive attached: keep the hot ID sequence past every archived ID,
+# e.g. when the hot database was recreated next to an existing archive
+SEED_SEQUENCE = (
+    "INSERT INTO main.sqlite_sequence (name, seq) SELECT 'executions', 0 "
+    "WHERE NOT EXISTS (SELECT 1 FROM main.sqlite_sequence WHERE name = 'executions')",
+    "UPDATE main.sqlite_sequence "
+    "SET seq = max(seq, coalesce((SELECT max(id) FROM archive.executions), 0)) "
+    "WHERE name = 'executions'",
+)
+STATUSES_BY_IDS = select(
+    executions.c.id, executions.c.user_id, executions.c.status, executions.c.completed_at
+).where(executions.c.id.in_(bindparam("execution_ids", expanding=True)))
+CHUNKS_AFTER = (
+    select(chunks)
+    .where(chunks.c.execution_id == bindparam("execution_id"), chunks.c.seq >= bindparam("seq"))
+    .order_by(chunks.c.seq)
+)
+
+
+async def has_autoincrement(conn: AsyncConnection) -> bool:
+    """Whether the hot executions table never reuses IDs (declared AUTOINCREMENT)."""
+    sql = (await conn.exec_driver_sql(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'executions'"
+    )).scalar()
+    return sql is not None and "AUTOINCREMENT" in sql.upper()
+
+
+async def seed_sequence(conn: AsyncConnection) -> None:
+    """Move the hot ID sequence past the archive's IDs; needs the archive attached."""
+    for statement in SEED_SEQUENCE:
+        await conn.exec_driver_sql(statement)
+
+
+class ExecutionArchive:
+    """Cold storage for finished executions in an attachable SQLite file."""
+
+    def __init__(self, path: str, after_days: int, batch_size: int, interval: float) -> None:
+        self.path = path
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self._engine: Optional[AsyncEngine] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def exists(self) -> bool:
+        return Path(self.path).exists()
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Engine for reads from (and schema setup in) the archive file."""
+        if self._engine is None:
+            self._engine = create_async_engine(
+                f"sqlite+aiosqlite:///{self.path}",
+                connect_args={"check_same_thread": False, "timeout": settings.DB_TIMEOUT},
+            )
+        return self._engine
+
+    async def ensure_schema(self) -> None:
+        """Create the archive tables, mirroring the hot ones."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        async with self.engine.begin() as conn:
+            await conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+            await conn.run_sync(
+                lambda sync_conn: executions.metadata.create_all(
+                    sync_conn, tables=[executions, chunks]
+                )
+            )
+
+    async def archive_batch(self, cutoff: datetime) -> int:
+        """Move one batch of executions finished before cutoff; returns how many moved."""
+        execution_columns = ", ".join(column.name for column in executions.c)
+        # Chunk ids are not copied; archived chunks get their own
+        chunk_columns = ", ".join(column.name for column in chunks.c if column.name != "id")
+
+        async with engine.connect() as conn:
+            if not await has_autoincrement(conn):
+                raise RuntimeError(
+                    "executions table can reuse archived IDs; "
+                    "run `python -m db.execution_ids` before archiving"
+                )
+            await conn.exec_driver_sql("ATTACH DATABASE ? AS archive", (self.path,))
+            try:
+                await seed_sequence(conn)
+                ids = (await conn.execute(
+                    SELECT_BATCH, {"cutoff": cutoff, "limit": self.batch_size}
+                )).scalars().all()
+                if ids:
+                    id_list = ", ".join(str(execution_id) for execution_id in ids)
+                    # Plain INSERTs: an ID already in the archive aborts the batch
+                    # instead of overwriting the archived execution
+                    await conn.exec_driver_sql(
+                        f"INSERT INTO archive.executions ({execution_columns}) "
+                        f"SELECT {execution_columns} FROM main.executions WHERE id IN ({id_list})"
+                    )
+                    await conn.exec_driver_sql(
+                        f"INSERT INTO archive.execution_output_chunks ({chunk_columns}) "
+                        f"SELECT {chunk_columns} FROM main.execution_output_chunks "
+                        f"WHERE execution_id IN ({id_list})"
+                    )
+                    await conn.exec_driver_sql(
+                        f"DELETE FROM main.execution_output_chunks WHERE execution_id IN ({id_list})"
+                    )
+                    await conn.exec_driver_sql(f"DELETE FROM main.executions WHERE id IN ({id_list})")
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+            finally:
+                await conn.exec_driver_sql("DETACH DATABASE archive")
+
+            if ids:
+                # Hand the pages freed by the deletes back to the filesystem
+                await conn.exec_driver_sql("PRAGMA incremental_vacuum")
+            await conn.commit()
+
+        if not ids:
+            return 0
+        archived_counter.inc(len(ids))
+        return len(ids)
+
+    async def run(
+        self,
+        older_than_days: Optional[int] = None,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """Archive everything past the retention age, one batch at a time."""
+        days = self.after_days if older_than_days is None else older_than_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        await self.ensure_schema()
+
+        moved = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = await self.archive_batch(cutoff)
+            if not count:
+                break
+            moved += count
+            batches += 1
+            # Let other writers at the database between batches
+            await asyncio.sleep(0)
+        if moved:
+            logger.info(f"Archived {moved} executions finished before {cutoff.isoformat()}")
+        return moved
+
+    async def get_execution(
+        self,
+        execution_id: int,
+        user_id: Optional[int] = None,
+    ) -> Optional[Row]:
+        """Read an archived execution row by ID, optionally only if owned by user_id."""
+        if not self.exists:
+            return None
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(EXECUTION_BY_ID, {"execution_id": execution_id})).first()
+        if row is None or (user_id is not None and row.user_id != user_id):
+            return None
+        archive_reads_counter.inc(kind="execution")
+        return row
+
+    async def get_statuses(
+        self,
+        execution_ids: Sequence[int],
+        user_id: Optional[int] = None,
+    ) -> List[Row]:
+        """Read the status columns of archived executions, optionally only those owned by user_id."""
+        if not self.exists or not execution_ids:
+            return []
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(STATUSES_BY_IDS, {"execution_ids": list(execution_ids)})).all()
+        rows = [row for row in rows if user_id is None or row.user_id == user_id]
+        if rows:
+            archive_reads_counter.inc(kind="statuses")
+        return rows
+
+    async def delete_execution(self, execution_id: int) -> None:
+        """Delete an archived execution and its output chunks."""
+        if not self.exists:
+            return
+        async with self.engine.begin() as conn:
+            await conn.execute(chunks.delete().where(chunks.c.execution_id == execution_id))
+            await conn.execute(executions.delete().where(executions.c.id == execution_id))
+
+    async def delete_agent_executions(self, agent_id: int) -> List[int]:
+        """Delete all archived executions of an agent and their output chunks; returns their IDs."""
+        if not self.exists:
+            return []
+        agent_executions = select(executions.c.id).where(executions.c.agent_id == agent_id)
+        async with self.engine.begin() as conn:
+            await conn.execute(chunks.delete().where(chunks.c.execution_id.in_(agent_executions)))
+            result = await conn.execute(
+                executions.delete()
+                .where(executions.c.agent_id == agent_id)
+                .returning(executions.c.id)
+            )
+            return list(result.scalars())
+
+    async def get_chunks(self, execution_id: int, after: int = 0) -> List[Any]:
+        """Read an archived execution's output chunks from seq `after` on."""
+        if not self.exists:
+            return []
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(
+                CHUNKS_AFTER, {"execution_id": execution_id, "seq": after}
+            )).all()
+        archive_reads_counter.inc(kind="chunks")
+        return rows
+
+    def start(self) -> None:
+        """Start archiving periodically in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="execution-archiver")
+
+    async def stop(self) -> None:
+        """Stop the background job and close the archive engine."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Execution archival failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# Create a global archive instance
+archive = ExecutionArchive(
+    settings.ARCHIVE_DB_PATH,
+    after_days=settings.ARCHIVE_AFTER_DAYS,
+    batch_size=settings.ARCHIVE_BATCH_SIZE,
+    interval=settings.ARCHIVE_INTERVAL,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.batch_size is not None:
+        archive.batch_size = args.batch_size
+
+    async def run() -> None:
+        try:
+            moved = await archive.run(args.older_than_days, args.max_batches)
+            logger.info(f"Moved {moved} executions to {archive.path}")
+        finally:
+            await archive.stop()
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Rebuild execution rollups from existing history.
+
+Usage:
+    python -m db.backfill_rollups [--batch-size 1000]
+
+Clears the rollup tables, then folds every finished execution back in,
+reading executions by primary key in batches and committing after each
+batch so the SQLite writer is released between them. New executions are
+folded in as they finish; this is only needed for history that predates
+the rollup tables.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import delete, select
+
+from core.rollups import RollupBatch
+from core.stats import FINISHED_STATUSES
+from db.base import engine, get_db_session
+from models.execution import Execution
+from models.rollup import ExecutionRollup, ExecutionRollupLatency
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(batch_size: int) -> None:
+    async with get_db_session() as session:
+        await session.execute(delete(ExecutionRollupLatency))
+        await session.execute(delete(ExecutionRollup))
+
+    last_id = 0
+    folded = 0
+    while True:
+        async with get_db_session() as session:
+            rows = (await session.execute(
+                select(
+                    Execution.id,
+                    Execution.user_id,
+                    Execution.agent_id,
+                    Execution.status,
+                    Execution.started_at,
+                    Execution.completed_at,
+                )
+                .where(Execution.id > last_id)
+                .order_by(Execution.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+
+            batch = RollupBatch()
+            for row in rows:
+                if row.status in FINISHED_STATUSES:
+                    batch.add(row)
+                    folded += 1
+            await batch.flush(session)
+            last_id = rows[-1].id
+
+    logger.info(f"Folded {folded} finished executions into rollups")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run() -> None:
+        try:
+            await backfill(args.batch_size)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from core.config import settings
+from db.instrumentation import install_query_hooks
 
 # Create async engine
 engine: AsyncEngine = create_async_engine(
@@ -24,6 +25,9 @@ engine: AsyncEngine = create_async_engine(
     }
 )
 
+# Record per-request query stats and log slow queries
+install_query_hooks(engine.sync_engine)
+
 # Create async session factory
 async_session_factory = async_sessionmaker(
     engine,
@@ -0,0 +1,113 @@
+"""Compare per-request CPU cost of the ORM and Core read paths.
+
+Usage:
+    python -m db.bench_reads [--iterations 500] [--limit 100]
+
+Each case runs the query and serializes the response body the way the
+endpoint does, against rows already in the configured database. CPU time
+(time.process_time) is reported, so waiting on SQLite I/O is excluded.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from core.responses import RowJSONResponse
+from db import reads
+from db.base import async_session_factory, engine
+from models.execution import Execution
+from models.user import User
+from schemas.execution import Execution as ExecutionSchema, ExecutionSummary
+
+logger = logging.getLogger(__name__)
+
+# Serializer used by the fast path, without building a full Response
+render = RowJSONResponse(None).render
+
+
+async def timed(name: str, iterations: int, case: Callable[[], Awaitable[None]]) -> float:
+    """Run a case repeatedly and log its CPU time per iteration."""
+    await case()  # Warm up caches, including the compiled statement cache
+    start = time.process_time()
+    for _ in range(iterations):
+        await case()
+    per_call = (time.process_time() - start) / iterations * 1e6
+    logger.info(f"{name}: {per_call:.0f}us CPU/request")
+    return per_call
+
+
+async def run(iterations: int, limit: int) -> None:
+    async with async_session_factory() as session:
+        execution_id = (await session.execute(
+            select(Execution.id).order_by(Execution.id.desc()).limit(1)
+        )).scalar_one_or_none()
+        user_id = (await session.execute(select(User.id).limit(1))).scalar_one_or_none()
+    if execution_id is None or user_id is None:
+        raise SystemExit("Need at least one user and one execution to benchmark")
+
+    summary_fields = list(ExecutionSummary.model_fields)
+
+    async def orm_user() -> None:
+        async with async_session_factory() as session:
+            await session.get(User, user_id)
+
+    async def core_user() -> None:
+        async with async_session_factory() as session:
+            await reads.get_user(session, user_id)
+
+    async def orm_get_execution() -> None:
+        async with async_session_factory() as session:
+            execution = (await session.execute(
+                select(Execution)
+                .where(Execution.id == execution_id)
+                .options(selectinload(Execution.agent))
+            )).scalar_one()
+            ExecutionSchema.model_validate(execution).model_dump_json()
+
+    async def core_get_execution() -> None:
+        async with async_session_factory() as session:
+            render(await reads.get_execution(session, execution_id))
+
+    async def orm_list_executions() -> None:
+        async with async_session_factory() as session:
+            executions = (await session.execute(select(Execution).limit(limit))).scalars().all()
+            for execution in executions:
+                ExecutionSummary.model_validate(execution).model_dump_json()
+
+    async def core_list_executions() -> None:
+        async with async_session_factory() as session:
+            render(await reads.list_rows(session, reads.executions, summary_fields, 0, limit))
+
+    cases: List[tuple] = [
+        ("user lookup", orm_user, core_user),
+        ("get_execution", orm_get_execution, core_get_execution),
+        (f"list_executions (limit={limit})", orm_list_executions, core_list_executions),
+    ]
+    for name, orm_case, core_case in cases:
+        orm_cost = await timed(f"{name} [orm]", iterations, orm_case)
+        core_cost = await timed(f"{name} [core]", iterations, core_case)
+        logger.info(f"{name}: core path saves {1 - core_cost / orm_cost:.0%} CPU")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def bench() -> None:
+        try:
+            await run(args.iterations, args.limit)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
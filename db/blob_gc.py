@@ -0,0 +1,121 @@
+"""Delete blob store files that no execution references any more.
+
+Usage:
+    python -m db.blob_gc [--grace-seconds N]
+
+Blobs are shared between executions with identical payloads, so they
+are not deleted along with rows: deleted executions and agents,
+overwritten outputs and rolled-back transactions all leave files
+behind. A sweep collects every input_blob/output_blob digest from the
+hot and archive databases and deletes the other files older than the
+grace period, which protects blobs written by transactions that have
+not committed yet.
+"""
+import argparse
+import asyncio
+import logging
+from typing import Optional, Set
+
+from sqlalchemy import inspect, select, union
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.blobstore import blob_store
+from core.config import settings
+from core.metrics import registry
+from db.archive import archive, executions
+from db.base import engine
+
+logger = logging.getLogger(__name__)
+
+collected_counter = registry.counter(
+    "blobs_collected_total",
+    "Unreferenced blob store files deleted",
+)
+
+REFERENCED_DIGESTS = union(
+    select(executions.c.input_blob).where(executions.c.input_blob.is_not(None)),
+    select(executions.c.output_blob).where(executions.c.output_blob.is_not(None)),
+)
+
+
+async def _digests(conn: AsyncConnection) -> Set[str]:
+    return set((await conn.execute(REFERENCED_DIGESTS)).scalars())
+
+
+class BlobCollector:
+    """Periodically sweeps unreferenced blobs out of the blob store."""
+
+    def __init__(self, interval: float, grace: float) -> None:
+        self.interval = interval
+        self.grace = grace
+        self._task: Optional[asyncio.Task] = None
+
+    async def collect(self) -> int:
+        """Run one sweep; returns how many files were deleted."""
+        # Listed before the sweep starts, so blobs newer than the listing are within grace
+        async with engine.connect() as conn:
+            referenced = await _digests(conn)
+        if archive.exists:
+            async with archive.engine.connect() as conn:
+                # The archiver may have created the file without its tables yet
+                if await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(executions.name)):
+                    referenced |= await _digests(conn)
+        removed = await asyncio.to_thread(blob_store.sweep, referenced, self.grace)
+        if removed:
+            collected_counter.inc(removed)
+            logger.info(f"Deleted {removed} unreferenced blobs")
+        return removed
+
+    def start(self) -> None:
+        """Start sweeping periodically in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="blob-collector")
+
+    async def stop(self) -> None:
+        """Stop the background sweep."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            # Sleep first so startup isn't slowed down by a full sweep
+            await asyncio.sleep(self.interval)
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Blob collection failed: {e}")
+
+
+# Create a global blob collector instance
+blob_collector = BlobCollector(
+    interval=settings.BLOB_GC_INTERVAL,
+    grace=settings.BLOB_GC_GRACE_SECONDS,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grace-seconds", type=float, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.grace_seconds is not None:
+        blob_collector.grace = args.grace_seconds
+
+    async def run() -> None:
+        try:
+            removed = await blob_collector.collect()
+            logger.info(f"Removed {removed} blobs from {blob_store.root}")
+        finally:
+            await archive.stop()
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
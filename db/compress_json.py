@@ -0,0 +1,188 @@
+"""Rewrite JSON columns into the CompressedJSON encoding.
+
+Usage:
+    python -m db.compress_json migrate [--batch-size 500]
+    python -m db.compress_json train-dict PATH [--samples 5000] [--size 65536]
+    python -m db.compress_json benchmark [--samples 1000]
+
+`migrate` walks each table by primary key in small batches, committing
+after each batch so the single SQLite writer is never held for long.
+Rows already in the current encoding are skipped, so the command can be
+re-run at any time, e.g. after training a dictionary.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import zstandard
+from sqlalchemy import text
+
+from db.base import engine
+from db.types import json_codec
+
+logger = logging.getLogger(__name__)
+
+# Tables and their CompressedJSON columns
+COMPRESSED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "agents": ("configuration",),
+    "tools": ("schema", "configuration"),
+    "agent_tools": ("configuration",),
+    "executions": ("input_data", "output_data"),
+}
+
+
+async def migrate(batch_size: int) -> None:
+    """Re-encode every row whose stored value is not in the current encoding."""
+    for table, columns in COMPRESSED_COLUMNS.items():
+        column_list = ", ".join(columns)
+        last_id = 0
+        rewritten = 0
+        bytes_before = 0
+        bytes_after = 0
+        while True:
+            async with engine.begin() as conn:
+                rows = (await conn.execute(
+                    text(
+                        f"SELECT id, {column_list} FROM {table} "
+                        f"WHERE id > :last_id ORDER BY id LIMIT :limit"
+                    ),
+                    {"last_id": last_id, "limit": batch_size},
+                )).all()
+                if not rows:
+                    break
+
+                updates = []
+                for row in rows:
+                    stored = row[1:]
+                    if all(json_codec.is_current(value) for value in stored):
+                        continue
+                    encoded = [
+                        None if value is None else json_codec.encode(json_codec.decode(value))
+                        for value in stored
+                    ]
+                    bytes_before += sum(len(value) for value in stored if value is not None)
+                    bytes_after += sum(len(value) for value in encoded if value is not None)
+                    updates.append({"id": row[0], **dict(zip(columns, encoded))})
+
+                if updates:
+                    assignments = ", ".join(f"{column} = :{column}" for column in columns)
+                    await conn.execute(
+                        text(f"UPDATE {table} SET {assignments} WHERE id = :id"),
+                        updates,
+                    )
+                rewritten += len(updates)
+                last_id = rows[-1][0]
+
+        logger.info(
+            f"{table}: rewrote {rewritten} rows, {bytes_before} -> {bytes_after} bytes"
+        )
+
+
+async def sample_values(limit: int) -> List[bytes]:
+    """Collect raw JSON encodings of stored values for training and benchmarks."""
+    samples: List[bytes] = []
+    per_column = max(limit // sum(len(c) for c in COMPRESSED_COLUMNS.values()), 1)
+    async with engine.connect() as conn:
+        for table, columns in COMPRESSED_COLUMNS.items():
+            for column in columns:
+                rows = await conn.execute(
+                    text(
+                        f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL "
+                        f"ORDER BY id DESC LIMIT :limit"
+                    ),
+                    {"limit": per_column},
+                )
+                for (stored,) in rows:
+                    value = json_codec.decode(stored)
+                    samples.append(
+                        json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+                    )
+    return samples
+
+
+async def train_dictionary(path: str, samples: int, size: int) -> None:
+    """Train a zstd dictionary from stored values and write it to path."""
+    data = await sample_values(samples)
+    if len(data) < 10:
+        raise SystemExit(f"Only {len(data)} samples available; need at least 10 to train")
+    dictionary = zstandard.train_dictionary(size, data)
+    Path(path).write_bytes(dictionary.as_bytes())
+    logger.info(
+        f"Wrote {len(dictionary.as_bytes())}-byte dictionary {dictionary.dict_id()} "
+        f"trained on {len(data)} samples to {path}; set JSON_COMPRESSION_DICT_PATH to use it"
+    )
+
+
+async def benchmark(samples: int) -> None:
+    """Report encode/decode cost per value against the bytes saved."""
+    data = await sample_values(samples)
+    if not data:
+        raise SystemExit("No stored values to benchmark")
+    values = [json_codec.decode(raw) for raw in data]
+
+    start = time.perf_counter()
+    encoded = [json_codec.encode(value) for value in values]
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for stored in encoded:
+        json_codec.decode(stored)
+    decode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for raw in data:
+        json_codec.decode(raw.decode())
+    plain_decode_time = time.perf_counter() - start
+
+    raw_bytes = sum(len(raw) for raw in data)
+    stored_bytes = sum(len(stored) for stored in encoded)
+    count = len(values)
+    logger.info(
+        f"{count} values: {raw_bytes} -> {stored_bytes} bytes "
+        f"({stored_bytes / raw_bytes:.1%}, {(raw_bytes - stored_bytes) / count:.0f} bytes saved/value); "
+        f"encode {encode_time / count * 1e6:.1f}us/value, "
+        f"decode {decode_time / count * 1e6:.1f}us/value "
+        f"vs {plain_decode_time / count * 1e6:.1f}us/value for plain JSON"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Rewrite rows into the current encoding")
+    migrate_parser.add_argument("--batch-size", type=int, default=500)
+
+    train_parser = commands.add_parser("train-dict", help="Train a zstd dictionary")
+    train_parser.add_argument("path")
+    train_parser.add_argument("--samples", type=int, default=5000)
+    train_parser.add_argument("--size", type=int, default=65536)
+
+    benchmark_parser = commands.add_parser("benchmark", help="Measure codec cost against bytes saved")
+    benchmark_parser.add_argument("--samples", type=int, default=1000)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "migrate":
+        job = migrate(args.batch_size)
+    elif args.command == "train-dict":
+        job = train_dictionary(args.path, args.samples, args.size)
+    else:
+        job = benchmark(args.samples)
+
+    async def run() -> None:
+        try:
+            await job
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Rebuild the executions table so it never reuses IDs.
+
+Usage:
+    python -m db.execution_ids
+
+Archived executions keep their IDs, so the hot table must not hand one
+out again after the row with the highest ID is archived or deleted.
+New databases declare executions AUTOINCREMENT; this rebuilds a table
+created before that, in one transaction, and seeds its ID sequence past
+every archived ID. Run it once with the API stopped, after
+`python -m db.upgrade_schema`; re-running is a no-op.
+"""
+import asyncio
+import logging
+
+from db.archive import archive, executions, has_autoincrement, seed_sequence
+from db.base import engine
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate() -> None:
+    """Recreate executions as AUTOINCREMENT, keeping every row and ID."""
+    columns = ", ".join(column.name for column in executions.c)
+    async with engine.connect() as conn:
+        if await has_autoincrement(conn):
+            logger.info("executions already never reuses IDs; nothing to do")
+            return
+
+        await conn.commit()
+        # Outside a transaction: keep chunk foreign keys pointing at "executions"
+        await conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        await conn.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+        if archive.exists:
+            await conn.exec_driver_sql("ATTACH DATABASE ? AS archive", (archive.path,))
+        try:
+            await conn.exec_driver_sql("BEGIN")
+            for index in executions.indexes:
+                await conn.exec_driver_sql(f"DROP INDEX IF EXISTS main.{index.name}")
+            await conn.exec_driver_sql("ALTER TABLE main.executions RENAME TO executions_legacy")
+            await conn.run_sync(lambda sync_conn: executions.create(sync_conn))
+            await conn.exec_driver_sql(
+                f"INSERT INTO main.executions ({columns}) "
+                f"SELECT {columns} FROM main.executions_legacy"
+            )
+            await conn.exec_driver_sql("DROP TABLE main.executions_legacy")
+            if archive.exists:
+                await seed_sequence(conn)
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        finally:
+            if archive.exists:
+                await conn.exec_driver_sql("DETACH DATABASE archive")
+            await conn.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+            await conn.exec_driver_sql("PRAGMA foreign_keys = ON")
+            await conn.commit()
+    logger.info("Rebuilt executions with AUTOINCREMENT IDs")
+
+
+async def run() -> None:
+    try:
+        await migrate()
+    finally:
+        await archive.stop()
+        await engine.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
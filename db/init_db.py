@@ -3,7 +3,9 @@ import logging
 from pathlib import Path
 
 from core.config import settings
-from db.base import init_db
+from db.archive import has_autoincrement
+from db.base import Base, engine, init_db
+from db.upgrade_schema import missing_columns
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,10 @@ async def init_sqlite() -> None:
     
     try:
         async with aiosqlite.connect(db_path) as db:
+            # Let archival hand freed pages back with incremental_vacuum;
+            # only takes effect on a new database (or after a full VACUUM)
+            await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
             # Enable Write-Ahead Logging for better concurrency
             await db.execute(f"PRAGMA journal_mode = {settings.DB_JOURNAL_MODE}")
             
@@ -47,6 +53,14 @@ async def init_sqlite() -> None:
             async with db.execute("PRAGMA synchronous") as cursor:
                 synchronous = await cursor.fetchone()
                 logger.info(f"SQLite synchronous: {synchronous[0]}")
+
+            async with db.execute("PRAGMA auto_vacuum") as cursor:
+                auto_vacuum = await cursor.fetchone()
+                if auto_vacuum[0] != 2:
+                    logger.warning(
+                        "SQLite auto_vacuum is not INCREMENTAL; run VACUUM once so "
+                        "archival can return freed pages"
+                    )
             
     except Exception as e:
         logger.error(f"Error initializing SQLite: {e}")
@@ -61,6 +75,20 @@ async def init() -> None:
         
         # Create all tables
         await init_db()
+
+        async with engine.connect() as conn:
+            missing = await missing_columns(conn, Base.metadata.sorted_tables)
+            if missing:
+                logger.error(
+                    "Database predates columns "
+                    f"{', '.join(f'{column.table.name}.{column.name}' for column in missing)}; "
+                    "run `python -m db.upgrade_schema`"
+                )
+            if not await has_autoincrement(conn):
+                logger.warning(
+                    "executions table predates AUTOINCREMENT IDs; run "
+                    "`python -m db.execution_ids` before archiving"
+                )
         
         logger.info("Database initialized successfully")
         
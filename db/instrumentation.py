@@ -0,0 +1,139 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements worth running EXPLAIN QUERY PLAN against
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+# Collapse whitespace and variable-length IN lists so similar statements group together
+_WHITESPACE_RE = re.compile(r"\s+")
+_IN_LIST_RE = re.compile(r"IN \(\?(?:, ?\?)*\)")
+
+
+def normalize_statement(statement: str) -> str:
+    """Normalize a SQL statement so repeated queries share a key."""
+    statement = _WHITESPACE_RE.sub(" ", statement).strip()
+    return _IN_LIST_RE.sub("IN (?)", statement)
+
+
+class QueryStats:
+    """Query count and DB time accumulated for a single request."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """Record one executed statement."""
+        self.count += 1
+        self.total_time += duration
+        self.statements[normalize_statement(statement)] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_time * 1000
+
+    def n_plus_one_suspects(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements issued more than `threshold` times in this request."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count > threshold
+        ]
+
+    def server_timing(self) -> str:
+        """Format the stats as a Server-Timing header value."""
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> QueryStats:
+    """Start collecting query stats for the current request context."""
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Get the query stats of the current request context, if any."""
+    return _current_stats.get()
+
+
+def _explain_query_plan(conn: Any, statement: str, parameters: Any) -> List[str]:
+    """Run EXPLAIN QUERY PLAN for a statement on the same connection."""
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def _log_slow_query(conn: Any, statement: str, parameters: Any, duration: float) -> None:
+    """Log a slow statement together with its query plan."""
+    plan: List[str] = []
+    if statement.lstrip().upper().startswith(_EXPLAINABLE):
+        try:
+            plan = _explain_query_plan(conn, statement, parameters)
+        except Exception as e:
+            plan = [f"<explain failed: {e}>"]
+    logger.warning(
+        f"Slow query ({duration * 1000:.1f}ms): {normalize_statement(statement)} "
+        f"| plan: {' / '.join(plan) or 'n/a'}"
+    )
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attach timing hooks to an engine.
+
+    Every statement is timed and added to the current request's
+    QueryStats; statements slower than DB_SLOW_QUERY_MS are logged
+    together with their EXPLAIN QUERY PLAN output.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+
+        if duration * 1000 >= settings.DB_SLOW_QUERY_MS and not executemany:
+            _log_slow_query(conn, statement, parameters, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+
+def log_request_stats(method: str, path: str, status_code: int, stats: QueryStats) -> None:
+    """Emit the structured per-request DB log line and N+1 warnings."""
+    suspects = stats.n_plus_one_suspects(settings.DB_N_PLUS_ONE_THRESHOLD)
+    logger.info(
+        f"db_stats method={method} path={path} status={status_code} "
+        f"queries={stats.count} db_ms={stats.total_ms:.2f} n_plus_one={len(suspects)}"
+    )
+    for statement, count in suspects:
+        logger.warning(
+            f"Possible N+1 query pattern on {method} {path}: "
+            f"{count}x {statement}"
+        )
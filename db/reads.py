@@ -0,0 +1,312 @@
+"""Read-only data access for hot endpoints.
+
+These queries use Core select() over the mapped tables instead of the
+ORM: rows skip the identity map and attribute instrumentation, and come
+back as Row tuples or plain dicts ready to serialize. Statements are
+built once at import with bind parameters, so every execution hits
+SQLAlchemy's compiled statement cache instead of recompiling.
+
+Lookups by execution ID fall through to the archive database (see
+db.archive) when the execution is no longer in the hot one.
+
+Compare against the ORM path with `python -m db.bench_reads`.
+"""
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, Select, Table, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.blobstore import blob_store
+from db.archive import archive
+from db.base import Base
+from models.agent import Agent
+from models.execution import Execution
+from models.stats import AgentStats, ToolStats
+from models.tool import Tool
+from models.user import User
+
+users: Table = User.__table__
+agents: Table = Agent.__table__
+tools: Table = Tool.__table__
+executions: Table = Execution.__table__
+agent_stats: Table = AgentStats.__table__
+tool_stats: Table = ToolStats.__table__
+
+# Blob-backed payload columns and the digest columns that replace them
+BLOB_COLUMNS = {"input_data": "input_blob", "output_data": "output_blob"}
+
+# What auth checks and GET /auth/me need; the password hash never leaves the login path
+USER_BY_ID = select(
+    users.c.id,
+    users.c.email,
+    users.c.full_name,
+    users.c.is_active,
+    users.c.is_superuser,
+    users.c.description,
+    users.c.created_at,
+    users.c.updated_at,
+).where(users.c.id == bindparam("user_id"))
+
+# Columns of schemas.execution.Execution and its nested schemas.agent.EmbeddedAgent;
+# rows are returned without passing through the response model, so list them here
+EXECUTION_FIELDS = (
+    "id", "created_at", "updated_at", "is_active", "description",
+    "input_data", "status", "user_id", "agent_id", "output_data", "error_message",
+    "started_at", "completed_at", "toolhouse_execution_id", "tool_set_version",
+)
+EMBEDDED_AGENT_FIELDS = (
+    "id", "created_at", "updated_at", "is_active", "description",
+    "name", "configuration", "status", "user_id", "toolhouse_agent_id",
+)
+
+EMBEDDED_AGENT = select(
+    *(agents.c[name] for name in EMBEDDED_AGENT_FIELDS)
+).where(agents.c.id == bindparam("agent_id"))
+AGENT_OWNER = select(agents.c.user_id).where(agents.c.id == bindparam("agent_id"))
+TOOL_OWNER = select(tools.c.user_id).where(tools.c.id == bindparam("tool_id"))
+
+AGENT_STATS = select(agent_stats).where(agent_stats.c.agent_id == bindparam("agent_id"))
+TOOL_STATS = select(tool_stats).where(tool_stats.c.tool_id == bindparam("tool_id"))
+
+EXECUTION_WITH_AGENT = (
+    select(
+        *(executions.c[name] for name in EXECUTION_FIELDS),
+        executions.c.input_blob,
+        executions.c.output_blob,
+        *(agents.c[name].label(f"agent__{name}") for name in EMBEDDED_AGENT_FIELDS),
+    )
+    .outerjoin(agents, agents.c.id == executions.c.agent_id)
+    .where(executions.c.id == bindparam("execution_id"))
+)
+EXECUTION_WITH_AGENT_FOR_USER = EXECUTION_WITH_AGENT.where(
+    executions.c.user_id == bindparam("user_id")
+)
+
+EXECUTION_RESULT = select(
+    executions.c.id,
+    executions.c.status,
+    executions.c.output_data,
+    executions.c.output_blob,
+    executions.c.error_message,
+    executions.c.completed_at,
+    executions.c.toolhouse_execution_id,
+).where(executions.c.id == bindparam("execution_id"))
+EXECUTION_RESULT_FOR_USER = EXECUTION_RESULT.where(
+    executions.c.user_id == bindparam("user_id")
+)
+
+EXECUTION_STATUSES = select(
+    executions.c.id,
+    executions.c.status,
+    executions.c.completed_at,
+).where(executions.c.id.in_(bindparam("execution_ids", expanding=True)))
+EXECUTION_STATUSES_FOR_USER = EXECUTION_STATUSES.where(
+    executions.c.user_id == bindparam("user_id")
+)
+
+
+async def _resolve_blobs(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace blob digests with the payloads they reference, read off the event loop."""
+    for column, blob_column in BLOB_COLUMNS.items():
+        if blob_column not in values:
+            continue
+        digest = values.pop(blob_column)
+        if digest is not None:
+            values[column] = await blob_store.load_async(digest)
+    return values
+
+
+def _select_fields(table: Table, fields: Sequence[str]) -> Select:
+    """Select the given fields, plus the blob digest behind any blob-backed one."""
+    columns = []
+    for name in fields:
+        columns.append(table.c[name])
+        blob_column = BLOB_COLUMNS.get(name)
+        if blob_column is not None and blob_column in table.c:
+            columns.append(table.c[blob_column])
+    return select(*columns)
+
+
+@lru_cache(maxsize=256)
+def _list_statement(
+    table_name: str,
+    fields: Tuple[str, ...],
+    filters: Tuple[str, ...],
+    newest_first: bool,
+) -> Select:
+    """Build (once per shape) the statement behind list_rows()."""
+    table = Base.metadata.tables[table_name]
+    query = _select_fields(table, fields)
+    for name in filters:
+        query = query.where(table.c[name] == bindparam(name))
+    order = table.c.id.desc() if newest_first else table.c.id
+    return query.order_by(order).offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[Row]:
+    """Look up a user row by ID."""
+    result = await db.execute(USER_BY_ID, {"user_id": user_id})
+    return result.first()
+
+
+async def get_agent_owner(db: AsyncSession, agent_id: int) -> Optional[int]:
+    """Get the ID of the user owning an agent, or None if it does not exist."""
+    result = await db.execute(AGENT_OWNER, {"agent_id": agent_id})
+    return result.scalar_one_or_none()
+
+
+async def get_tool_owner(db: AsyncSession, tool_id: int) -> Optional[int]:
+    """Get the ID of the user owning a tool, or None if it does not exist."""
+    result = await db.execute(TOOL_OWNER, {"tool_id": tool_id})
+    return result.scalar_one_or_none()
+
+
+async def get_agent_stats(db: AsyncSession, agent_id: int) -> Optional[Row]:
+    """Get an agent's materialized execution stats, if it has any."""
+    result = await db.execute(AGENT_STATS, {"agent_id": agent_id})
+    return result.first()
+
+
+async def get_tool_stats(db: AsyncSession, tool_id: int) -> Optional[Row]:
+    """Get a tool's materialized execution stats, if it has any."""
+    result = await db.execute(TOOL_STATS, {"tool_id": tool_id})
+    return result.first()
+
+
+async def get_execution(
+    db: AsyncSession,
+    execution_id: int,
+    user_id: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """Load an execution with its agent nested under "agent".
+
+    Pass user_id to only match executions owned by that user.
+    """
+    if user_id is None:
+        result = await db.execute(EXECUTION_WITH_AGENT, {"execution_id": execution_id})
+    else:
+        result = await db.execute(
+            EXECUTION_WITH_AGENT_FOR_USER,
+            {"execution_id": execution_id, "user_id": user_id},
+        )
+    row = result.first()
+    if row is None:
+        return await _get_archived_execution(db, execution_id, user_id)
+
+    execution: Dict[str, Any] = {}
+    agent: Dict[str, Any] = {}
+    for key, value in row._mapping.items():
+        if key.startswith("agent__"):
+            agent[key[len("agent__"):]] = value
+        else:
+            execution[key] = value
+    execution["agent"] = agent if agent["id"] is not None else None
+    return await _resolve_blobs(execution)
+
+
+async def _get_archived_execution(
+    db: AsyncSession,
+    execution_id: int,
+    user_id: Optional[int],
+) -> Optional[Dict[str, Any]]:
+    """get_execution() for an archived execution; its agent is still hot."""
+    row = await archive.get_execution(execution_id, user_id)
+    if row is None:
+        return None
+    execution = {
+        key: value
+        for key, value in row._mapping.items()
+        if key in EXECUTION_FIELDS or key in BLOB_COLUMNS.values()
+    }
+    agent = (await db.execute(EMBEDDED_AGENT, {"agent_id": execution["agent_id"]})).first()
+    execution["agent"] = dict(agent._mapping) if agent is not None else None
+    return await _resolve_blobs(execution)
+
+
+async def get_execution_result(
+    db: AsyncSession,
+    execution_id: int,
+    user_id: Optional[int] = None,
+) -> Optional[Row]:
+    """Load the columns behind an ExecutionResult.
+
+    output_data is left as stored: when output_blob is set the caller can
+    stream the blob instead of loading it. Archived executions come back
+    as their full row.
+    """
+    if user_id is None:
+        result = await db.execute(EXECUTION_RESULT, {"execution_id": execution_id})
+    else:
+        result = await db.execute(
+            EXECUTION_RESULT_FOR_USER,
+            {"execution_id": execution_id, "user_id": user_id},
+        )
+    row = result.first()
+    if row is None:
+        return await archive.get_execution(execution_id, user_id)
+    return row
+
+
+async def get_execution_statuses(
+    db: AsyncSession,
+    execution_ids: Sequence[int],
+    user_id: Optional[int] = None,
+) -> List[Row]:
+    """Load id, status and completed_at of many executions in one query.
+
+    IDs that are missing, or not owned by user_id, are left out. Those
+    not in the hot database are looked up in the archive in one more.
+    """
+    if user_id is None:
+        result = await db.execute(EXECUTION_STATUSES, {"execution_ids": list(execution_ids)})
+    else:
+        result = await db.execute(
+            EXECUTION_STATUSES_FOR_USER,
+            {"execution_ids": list(execution_ids), "user_id": user_id},
+        )
+    rows = list(result)
+    found = {row.id for row in rows}
+    missing = [execution_id for execution_id in execution_ids if execution_id not in found]
+    if missing:
+        rows.extend(await archive.get_statuses(missing, user_id))
+    return rows
+
+
+async def list_rows(
+    db: AsyncSession,
+    table: Table,
+    fields: Sequence[str],
+    skip: int,
+    limit: int,
+    newest_first: bool = False,
+    **filters: Any,
+) -> List[Dict[str, Any]]:
+    """List rows of a table as dicts holding only the given fields.
+
+    Keyword filters match columns by equality; None values are ignored,
+    so `user_id=None` lists every user's rows. Blob-backed fields also
+    select their digest column and are resolved from the blob store.
+    """
+    filters = {name: value for name, value in filters.items() if value is not None}
+    query = _list_statement(table.name, tuple(fields), tuple(sorted(filters)), newest_first)
+    result = await db.execute(query, {**filters, "skip": skip, "limit": limit})
+    return [await _resolve_blobs(dict(row._mapping)) for row in result]
+
+
+async def stream_rows(
+    db: AsyncSession,
+    table: Table,
+    fields: Sequence[str],
+    conditions: Sequence[Any] = (),
+    batch_size: int = 1000,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stream every row matching conditions, in ID order, as batches of dicts.
+
+    Rows come off a server-side cursor batch_size at a time, so memory
+    stays bounded by one batch however many rows match.
+    """
+    query = _select_fields(table, fields).where(*conditions).order_by(table.c.id)
+    result = await db.stream(query, execution_options={"yield_per": batch_size})
+    async for partition in result.mappings().partitions():
+        yield [await _resolve_blobs(dict(row)) for row in partition]
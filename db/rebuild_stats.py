@@ -0,0 +1,34 @@
+"""Rebuild materialized agent and tool execution stats.
+
+Usage:
+    python -m db.rebuild_stats
+
+Stats are maintained incrementally on every status change; run this once
+after the stats tables are first created on an existing database, or to
+repair drift (e.g. after executions were edited outside the API).
+"""
+import asyncio
+import logging
+
+from core.stats import rebuild_stats
+from db.base import engine, get_db_session
+
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    try:
+        async with get_db_session() as session:
+            await rebuild_stats(session)
+        logger.info("Rebuilt agent and tool execution stats")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import zstandard
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class JSONCodec:
+    """Encodes JSON values as raw UTF-8 or as zstd frames above a size threshold.
+
+    An optional trained dictionary improves the ratio on the many small,
+    similarly shaped documents these columns hold. Frames record whether
+    a dictionary was used, so rows written before or after training are
+    both readable.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        level: int,
+        dictionary: Optional[zstandard.ZstdCompressionDict] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.level = level
+        self.dictionary = dictionary
+        self._compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary)
+        self._plain_decompressor = zstandard.ZstdDecompressor()
+        self._dict_decompressor = (
+            zstandard.ZstdDecompressor(dict_data=dictionary) if dictionary is not None else None
+        )
+
+    def encode(self, value: Any) -> bytes:
+        """Encode a JSON value for storage."""
+        payload = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+        if len(payload) < self.threshold:
+            return payload
+        return self._compressor.compress(payload)
+
+    def decode(self, stored: Union[bytes, str]) -> Any:
+        """Decode a stored value; plain JSON text from legacy rows is accepted."""
+        if isinstance(stored, str):
+            return json.loads(stored)
+        if stored[:4] == ZSTD_MAGIC:
+            stored = self._decompressor_for(stored).decompress(stored)
+        return json.loads(stored)
+
+    def is_current(self, stored: Union[bytes, str, None]) -> bool:
+        """Whether a stored value is already in the encoding encode() would produce."""
+        if stored is None:
+            return True
+        if isinstance(stored, str):
+            return False
+        compressed = stored[:4] == ZSTD_MAGIC
+        if not compressed:
+            return len(stored) < self.threshold
+        dict_id = zstandard.get_frame_parameters(stored).dict_id
+        return dict_id == (self.dictionary.dict_id() if self.dictionary is not None else 0)
+
+    def _decompressor_for(self, frame: bytes) -> zstandard.ZstdDecompressor:
+        dict_id = zstandard.get_frame_parameters(frame).dict_id
+        if dict_id == 0:
+            return self._plain_decompressor
+        if self._dict_decompressor is None or dict_id != self.dictionary.dict_id():
+            raise ValueError(f"Value was compressed with unknown dictionary {dict_id}")
+        return self._dict_decompressor
+
+
+def load_dictionary(path: Optional[str]) -> Optional[zstandard.ZstdCompressionDict]:
+    """Load a trained zstd dictionary, if one is configured and present."""
+    if not path:
+        return None
+    dictionary_path = Path(path)
+    if not dictionary_path.exists():
+        logger.warning(f"JSON compression dictionary {path} not found; compressing without it")
+        return None
+    return zstandard.ZstdCompressionDict(dictionary_path.read_bytes())
+
+
+# Create a global codec shared by all CompressedJSON columns
+json_codec = JSONCodec(
+    threshold=settings.JSON_COMPRESSION_THRESHOLD,
+    level=settings.JSON_COMPRESSION_LEVEL,
+    dictionary=load_dictionary(settings.JSON_COMPRESSION_DICT_PATH),
+)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored as a BLOB, zstd-compressed above a size threshold.
+
+    Rows written by the plain JSON type are still read, and are rewritten
+    by `python -m db.compress_json`.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+        return json_codec.encode(value)
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        if value is None:
+            return None
+        return json_codec.decode(value)
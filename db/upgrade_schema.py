@@ -0,0 +1,93 @@
+"""Add the columns and indexes a database created by an older release lacks.
+
+Usage:
+    python -m db.upgrade_schema
+
+create_all() creates missing tables but never alters existing ones, so
+columns added to existing models (agents.configuration_hash,
+tool_set_version and sync_status, tools.configuration_hash and
+sync_status, executions.input_blob, output_blob and tool_set_version)
+and new indexes on old tables would otherwise be absent and every query
+naming them would fail. This adds each missing column with ALTER TABLE
+ADD COLUMN, using the model's server default for existing rows, in the
+hot database and in the archive. Run it once with the API stopped, before
+`python -m db.execution_ids`; re-running is a no-op.
+"""
+import asyncio
+import logging
+from typing import List, Sequence
+
+from sqlalchemy import Column, Connection, Table, inspect
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateColumn
+
+from db.archive import archive, chunks, executions
+from db.base import Base, engine
+
+logger = logging.getLogger(__name__)
+
+# Tables kept in the archive database
+ARCHIVE_TABLES = (executions, chunks)
+
+
+def _missing_columns(sync_conn: Connection, tables: Sequence[Table]) -> List[Column]:
+    inspector = inspect(sync_conn)
+    missing = []
+    for table in tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.c if column.name not in existing)
+    return missing
+
+
+async def missing_columns(conn: AsyncConnection, tables: Sequence[Table]) -> List[Column]:
+    """Model columns absent from existing tables in the connected database."""
+    return await conn.run_sync(_missing_columns, tables)
+
+
+def _upgrade(sync_conn: Connection, tables: Sequence[Table]) -> List[str]:
+    added = []
+    for column in _missing_columns(sync_conn, tables):
+        if not column.nullable and column.server_default is None:
+            # SQLite can't add a NOT NULL column without a default to existing rows
+            raise RuntimeError(f"{column.table.name}.{column.name} needs a server_default to be added")
+        ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+        sync_conn.exec_driver_sql(f"ALTER TABLE {column.table.name} ADD COLUMN {ddl}")
+        added.append(f"{column.table.name}.{column.name}")
+    existing = set(inspect(sync_conn).get_table_names())
+    for table in tables:
+        if table.name in existing:
+            for index in table.indexes:
+                index.create(sync_conn, checkfirst=True)
+    return added
+
+
+async def upgrade(conn: AsyncConnection, tables: Sequence[Table]) -> List[str]:
+    """Add missing columns and indexes to tables in one transaction; returns the columns added."""
+    return await conn.run_sync(_upgrade, tables)
+
+
+async def run() -> None:
+    try:
+        async with engine.begin() as conn:
+            added = await upgrade(conn, list(Base.metadata.sorted_tables))
+        if archive.exists:
+            async with archive.engine.begin() as conn:
+                added += [f"archive.{name}" for name in await upgrade(conn, ARCHIVE_TABLES)]
+        if added:
+            logger.info(f"Added columns: {', '.join(added)}")
+        else:
+            logger.info("Schema is up to date; nothing to do")
+    finally:
+        await archive.stop()
+        await engine.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
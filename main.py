@@ -1,12 +1,20 @@
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 
 from core.config import settings
 from api.v1.api import api_router
 from db.init_db import init as init_database
+from db.archive import archive
+from db.blob_gc import blob_collector
 from db.base import dispose_db
+from db.instrumentation import start_query_stats, log_request_stats
+from core.idempotency import IdempotentReplay, idempotency
+from core.profiling import SamplingProfiler, request_profiles
+from core.loop_monitor import loop_monitor
+from core.outbox import toolhouse_outbox
+from core.websockets import manager
 
 # Import all models and schemas to ensure they are registered
 from models import *  # noqa: F403
@@ -59,6 +67,83 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    """Report per-request DB query count and time."""
+    if not settings.DB_QUERY_STATS:
+        return await call_next(request)
+
+    stats = start_query_stats()
+    response = await call_next(request)
+    response.headers.append("Server-Timing", stats.server_timing())
+    log_request_stats(request.method, request.url.path, response.status_code, stats)
+    return response
+
+
+@app.middleware("http")
+async def request_profile_middleware(request: Request, call_next):
+    """Profile a single request when the profiling header is present.
+
+    The sampler watches the whole event loop thread, so concurrent
+    requests show up in the profile too. The result is stored and its
+    ID returned in the X-Profile-Id header.
+    """
+    token = settings.PROFILER_REQUEST_TOKEN
+    if not token or request.headers.get(settings.PROFILER_REQUEST_HEADER) != token:
+        return await call_next(request)
+
+    profiler = SamplingProfiler(interval=settings.PROFILER_INTERVAL_MS / 1000)
+    profiler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.stop()
+    response.headers["X-Profile-Id"] = request_profiles.add(profiler.collapsed())
+    return response
+
+
+@app.middleware("http")
+async def idempotency_middleware(request: Request, call_next):
+    """Record the response of a request that claimed an Idempotency-Key.
+
+    Successful responses are stored for replay; on failure the key is
+    released so the client can retry with it.
+    """
+    try:
+        response = await call_next(request)
+    except Exception:
+        claim = getattr(request.state, "idempotency_claim", None)
+        if claim is not None:
+            await idempotency.release(claim[0])
+        raise
+
+    claim = getattr(request.state, "idempotency_claim", None)
+    if claim is None:
+        return response
+    if not 200 <= response.status_code < 300:
+        await idempotency.release(claim[0])
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    await idempotency.complete(claim[0], claim[1], response.status_code, body)
+    stored = Response(content=body, status_code=response.status_code)
+    # Raw headers keep repeats such as Set-Cookie, which a dict would collapse;
+    # the body is unchanged, so any Content-Length still holds
+    stored.raw_headers = response.raw_headers
+    return stored
+
+
+@app.exception_handler(IdempotentReplay)
+async def idempotent_replay_handler(request: Request, exc: IdempotentReplay):
+    """Answer a repeated Idempotency-Key with the original response."""
+    return Response(
+        content=exc.response.body,
+        status_code=exc.response.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -83,10 +168,28 @@ async def startup_event():
         logger.error(f"Error initializing database: {e}")
         raise
 
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    manager.start_heartbeat()
+    toolhouse_outbox.start()
+    idempotency.start()
+    if settings.ARCHIVE_INTERVAL > 0:
+        archive.start()
+    if settings.BLOB_GC_INTERVAL > 0:
+        blob_collector.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown."""
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.stop()
+    await manager.stop_heartbeat()
+    await toolhouse_outbox.stop()
+    await idempotency.stop()
+    await blob_collector.stop()
+    await archive.stop()
+
     try:
         await dispose_db()
         logger.info("Database connections disposed successfully")
@@ -2,7 +2,12 @@ from models.base_model import BaseModel
 from models.user import User
 from models.agent import Agent
 from models.tool import Tool, AgentTool
-from models.execution import Execution
+from models.execution import Execution, ExecutionOutputChunk
+from models.stats import AgentStats, ToolStats
+from models.rollup import ExecutionRollup, ExecutionRollupLatency
+from models.outbox import OutboxEvent
+from models.configuration import ConfigurationContent, ConfigurationVersion
+from models.idempotency import IdempotencyKey
 
 # Import all models here so they are registered with SQLAlchemy
 __all__ = [
@@ -12,4 +17,13 @@ __all__ = [
     "Tool",
     "AgentTool",
     "Execution",
+    "ExecutionOutputChunk",
+    "AgentStats",
+    "ToolStats",
+    "ExecutionRollup",
+    "ExecutionRollupLatency",
+    "OutboxEvent",
+    "ConfigurationContent",
+    "ConfigurationVersion",
+    "IdempotencyKey",
 ] 
\ No newline at end of file
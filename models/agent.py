@@ -1,7 +1,8 @@
 from typing import Optional, List
-from sqlalchemy import String, JSON, ForeignKey
+from sqlalchemy import String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from db.types import CompressedJSON
 from models.base_model import BaseModel
 
 
@@ -11,20 +12,29 @@ class Agent(BaseModel):
     __tablename__ = "agents"
 
     name: Mapped[str] = mapped_column(String(255), index=True)
-    configuration: Mapped[dict] = mapped_column(JSON, default={})
+    configuration: Mapped[dict] = mapped_column(CompressedJSON, default={})
+    # core.canonical.content_hash of configuration; NULL until first recorded
+    configuration_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     toolhouse_agent_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     status: Mapped[str] = mapped_column(
         String(50),
         default="inactive",  # inactive, active, error
     )
+    # Bumped whenever the agent's effective tool set changes (core.toolsets)
+    tool_set_version: Mapped[int] = mapped_column(default=0, server_default="0")
+    sync_status: Mapped[str] = mapped_column(
+        String(20),
+        default="synced",  # pending_sync, synced, sync_failed
+        server_default="synced",
+    )
     
     # Foreign Keys
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     
-    # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="agents")
-    executions: Mapped[List["Execution"]] = relationship("Execution", back_populates="agent", cascade="all, delete-orphan")
-    agent_tools: Mapped[List["AgentTool"]] = relationship("AgentTool", back_populates="agent", cascade="all, delete-orphan")
+    # Relationships; lazy="raise" so unbounded collections are never loaded implicitly
+    user: Mapped["User"] = relationship("User", back_populates="agents", lazy="raise")
+    executions: Mapped[List["Execution"]] = relationship("Execution", back_populates="agent", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    agent_tools: Mapped[List["AgentTool"]] = relationship("AgentTool", back_populates="agent", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
 
     def __repr__(self) -> str:
         return f"Agent(id={self.id}, name={self.name}, status={self.status})" 
\ No newline at end of file
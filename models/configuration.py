@@ -0,0 +1,46 @@
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from db.base import Base
+from db.types import CompressedJSON
+
+
+class ConfigurationContent(Base):
+    """A distinct configuration, stored once however many versions refer to it"""
+
+    __tablename__ = "configuration_contents"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # core.canonical.content_hash
+    configuration: Mapped[dict] = mapped_column(CompressedJSON)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"ConfigurationContent(hash={self.hash})"
+
+
+class ConfigurationVersion(Base):
+    """One change to an agent's or tool's configuration"""
+
+    __tablename__ = "configuration_versions"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", "version"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(20))  # agent, tool
+    entity_id: Mapped[int]
+    version: Mapped[int]  # 1-based, per entity
+    configuration_hash: Mapped[str] = mapped_column(ForeignKey("configuration_contents.hash"))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"ConfigurationVersion(entity={self.entity_type}:{self.entity_id}, "
+            f"version={self.version}, hash={self.configuration_hash})"
+        )
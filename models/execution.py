@@ -1,18 +1,66 @@
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import String, JSON, ForeignKey, DateTime
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import Any, Optional
+from sqlalchemy import String, JSON, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym
+from sqlalchemy.sql import func
 
+from core.blobstore import blob_store
+from db.base import Base
+from db.types import CompressedJSON
 from models.base_model import BaseModel
 
 
+# Blob-backed payload attribute -> (inline column attribute, digest column)
+BLOB_PAYLOADS = {
+    "input_data": ("_input_data", "input_blob"),
+    "output_data": ("_output_data", "output_blob"),
+}
+
+
+def _store_payload(instance: Any, column: str, blob_column: str, value: Any, digest: Optional[str], inline: Any) -> None:
+    setattr(instance, blob_column, digest)
+    setattr(instance, column, inline)
+    if digest is not None:
+        instance.__dict__[f"_{blob_column}_cache"] = (digest, value)
+
+
+def _blob_backed(column: str, blob_column: str) -> property:
+    """Property reading a JSON payload inline or lazily from the blob store.
+
+    Assigning offloads large values to the blob store and keeps only the
+    digest in `blob_column`. Blob contents are cached on the instance.
+    """
+    cache_key = f"_{blob_column}_cache"
+
+    def get(self) -> Any:
+        digest = getattr(self, blob_column)
+        if digest is None:
+            return getattr(self, column)
+        cached = self.__dict__.get(cache_key)
+        if cached is None or cached[0] != digest:
+            cached = (digest, blob_store.load(digest))
+            self.__dict__[cache_key] = cached
+        return cached[1]
+
+    def set(self, value: Any) -> None:
+        digest, inline = blob_store.offload(value)
+        _store_payload(self, column, blob_column, value, digest, inline)
+
+    return property(get, set)
+
+
 class Execution(BaseModel):
     """Execution model for tracking agent runs"""
     
     __tablename__ = "executions"
+    # IDs are never reused, so an archived execution's ID stays its own (see db.archive)
+    __table_args__ = {"sqlite_autoincrement": True}
 
-    input_data: Mapped[dict] = mapped_column(JSON)
-    output_data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Payloads above BLOB_THRESHOLD_BYTES live in the blob store; the row keeps the digest
+    _input_data: Mapped[Optional[dict]] = mapped_column("input_data", CompressedJSON)
+    input_blob: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    _output_data: Mapped[Optional[dict]] = mapped_column("output_data", CompressedJSON, nullable=True)
+    output_blob: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     status: Mapped[str] = mapped_column(
         String(50),
         default="pending"  # pending, running, completed, failed
@@ -21,14 +69,56 @@ class Execution(BaseModel):
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     toolhouse_execution_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    tool_set_version: Mapped[Optional[int]] = mapped_column(nullable=True)  # Agent tool set the run started with
     
     # Foreign Keys
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    agent_id: Mapped[int] = mapped_column(ForeignKey("agents.id"))
+    agent_id: Mapped[int] = mapped_column(ForeignKey("agents.id"), index=True)
     
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="executions")
-    agent: Mapped["Agent"] = relationship("Agent", back_populates="executions")
+    user: Mapped["User"] = relationship("User", back_populates="executions", lazy="raise")
+    agent: Mapped["Agent"] = relationship("Agent", back_populates="executions", lazy="raise")
+
+    input_data = synonym("_input_data", descriptor=_blob_backed(*BLOB_PAYLOADS["input_data"]))
+    output_data = synonym("_output_data", descriptor=_blob_backed(*BLOB_PAYLOADS["output_data"]))
+
+    async def set_payload(self, name: str, value: Any) -> None:
+        """Assign input_data or output_data, writing any blob off the event loop."""
+        column, blob_column = BLOB_PAYLOADS[name]
+        digest, inline = await blob_store.offload_async(value)
+        _store_payload(self, column, blob_column, value, digest, inline)
+
+    async def load_payload(self, name: str) -> Any:
+        """Read input_data or output_data, loading any blob off the event loop."""
+        column, blob_column = BLOB_PAYLOADS[name]
+        digest = getattr(self, blob_column)
+        cached = self.__dict__.get(f"_{blob_column}_cache")
+        if digest is None or (cached is not None and cached[0] == digest):
+            return getattr(self, name)
+        value = await blob_store.load_async(digest)
+        self.__dict__[f"_{blob_column}_cache"] = (digest, value)
+        return value
+
+    def __repr__(self) -> str:
+        return f"Execution(id={self.id}, agent_id={self.agent_id}, status={self.status})" 
+
+
+class ExecutionOutputChunk(Base):
+    """Append-only chunk of an execution's streamed output.
+
+    Deliberately skips BaseModel's audit columns to keep rows small.
+    """
+
+    __tablename__ = "execution_output_chunks"
+    __table_args__ = (UniqueConstraint("execution_id", "seq"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    execution_id: Mapped[int] = mapped_column(ForeignKey("executions.id"))
+    seq: Mapped[int]  # 0-based position within the execution's output
+    data: Mapped[Any] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
 
     def __repr__(self) -> str:
-        return f"Execution(id={self.id}, agent_id={self.agent_id}, status={self.status})" 
\ No newline at end of file
+        return f"ExecutionOutputChunk(execution_id={self.execution_id}, seq={self.seq})"
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class IdempotencyKey(Base):
+    """A claimed Idempotency-Key and, once the request succeeded, its response"""
+
+    __tablename__ = "idempotency_keys"
+
+    # core.idempotency.scoped_key: hash of user, method, path and client key
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64))  # hash of the request body
+    # None while the original request is still being handled
+    status_code: Mapped[Optional[int]] = mapped_column(nullable=True)
+    response_body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    # In-progress claims expire after a lock timeout, completed ones after the TTL
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+    def __repr__(self) -> str:
+        return f"IdempotencyKey(key={self.key}, status_code={self.status_code})"
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Index, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from db.base import Base
+
+
+class OutboxEvent(Base):
+    """A pending Toolhouse call, written in the same transaction as the change it mirrors"""
+
+    __tablename__ = "toolhouse_outbox"
+    __table_args__ = (
+        # Head-of-line lookup per entity and the dispatcher's due scan
+        Index("ix_toolhouse_outbox_entity", "entity_type", "entity_id", "id"),
+        Index("ix_toolhouse_outbox_due", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(20))  # agent, tool
+    entity_id: Mapped[int]
+    operation: Mapped[str] = mapped_column(String(20))  # register, update
+    payload: Mapped[dict] = mapped_column(JSON)
+    attempts: Mapped[int] = mapped_column(default=0)
+    # None once retries are exhausted; the event then blocks its entity
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True, server_default=func.now()
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"OutboxEvent(id={self.id}, entity={self.entity_type}:{self.entity_id}, "
+            f"operation={self.operation}, attempts={self.attempts})"
+        )
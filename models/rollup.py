@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class ExecutionRollup(Base):
+    """Finished executions folded into one time bucket, per user and agent"""
+
+    __tablename__ = "execution_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "user_id", "agent_id"),
+        Index("ix_execution_rollups_agent", "granularity", "agent_id", "bucket_start"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(10))  # minute, hour, day
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    agent_id: Mapped[int] = mapped_column(ForeignKey("agents.id"))
+    count: Mapped[int] = mapped_column(default=0)
+    failed_count: Mapped[int] = mapped_column(default=0)
+    total_duration: Mapped[float] = mapped_column(default=0.0)  # seconds
+    timed_count: Mapped[int] = mapped_column(default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"ExecutionRollup(granularity={self.granularity}, bucket_start={self.bucket_start}, "
+            f"agent_id={self.agent_id}, count={self.count})"
+        )
+
+
+class ExecutionRollupLatency(Base):
+    """One LatencySketch bin of an ExecutionRollup bucket"""
+
+    __tablename__ = "execution_rollup_latency"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "user_id", "agent_id", "bin"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(10))
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    agent_id: Mapped[int] = mapped_column(ForeignKey("agents.id"))
+    bin: Mapped[int]
+    count: Mapped[int] = mapped_column(default=0)
+
+    def __repr__(self) -> str:
+        return f"ExecutionRollupLatency(bucket_start={self.bucket_start}, bin={self.bin}, count={self.count})"
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class ExecutionStatsMixin:
+    """Running execution totals, maintained incrementally by core.stats"""
+
+    run_count: Mapped[int] = mapped_column(default=0)
+    pending_count: Mapped[int] = mapped_column(default=0)
+    running_count: Mapped[int] = mapped_column(default=0)
+    completed_count: Mapped[int] = mapped_column(default=0)
+    failed_count: Mapped[int] = mapped_column(default=0)
+    # Sum of completed_at - started_at over finished runs that have both
+    total_duration: Mapped[float] = mapped_column(default=0.0)  # seconds
+    timed_count: Mapped[int] = mapped_column(default=0)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class AgentStats(ExecutionStatsMixin, Base):
+    """Execution statistics for one agent"""
+
+    __tablename__ = "agent_stats"
+
+    agent_id: Mapped[int] = mapped_column(ForeignKey("agents.id"), primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"AgentStats(agent_id={self.agent_id}, run_count={self.run_count})"
+
+
+class ToolStats(ExecutionStatsMixin, Base):
+    """Execution statistics for one tool, across the agents it is enabled on"""
+
+    __tablename__ = "tool_stats"
+
+    tool_id: Mapped[int] = mapped_column(ForeignKey("tools.id"), primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"ToolStats(tool_id={self.tool_id}, run_count={self.run_count})"
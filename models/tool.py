@@ -1,7 +1,8 @@
 from typing import Optional, List
-from sqlalchemy import String, JSON, ForeignKey
+from sqlalchemy import String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from db.types import CompressedJSON
 from models.base_model import BaseModel
 
 
@@ -11,17 +12,24 @@ class Tool(BaseModel):
     __tablename__ = "tools"
 
     name: Mapped[str] = mapped_column(String(255), index=True)
-    schema: Mapped[dict] = mapped_column(JSON)  # Input/output schema
-    configuration: Mapped[dict] = mapped_column(JSON, default={})
+    schema: Mapped[dict] = mapped_column(CompressedJSON)  # Input/output schema
+    configuration: Mapped[dict] = mapped_column(CompressedJSON, default={})
+    # core.canonical.content_hash of configuration; NULL until first recorded
+    configuration_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     toolhouse_tool_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     version: Mapped[str] = mapped_column(String(50), default="1.0.0")
+    sync_status: Mapped[str] = mapped_column(
+        String(20),
+        default="synced",  # pending_sync, synced, sync_failed
+        server_default="synced",
+    )
     
     # Foreign Keys
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="tools")
-    agent_tools: Mapped[List["AgentTool"]] = relationship("AgentTool", back_populates="tool", cascade="all, delete-orphan")
+    user: Mapped["User"] = relationship("User", back_populates="tools", lazy="raise")
+    agent_tools: Mapped[List["AgentTool"]] = relationship("AgentTool", back_populates="tool", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
 
     def __repr__(self) -> str:
         return f"Tool(id={self.id}, name={self.name}, version={self.version})"
@@ -37,12 +45,12 @@ class AgentTool(BaseModel):
     tool_id: Mapped[int] = mapped_column(ForeignKey("tools.id"))
     
     # Additional fields
-    configuration: Mapped[dict] = mapped_column(JSON, default={})  # Tool-specific config for this agent
+    configuration: Mapped[dict] = mapped_column(CompressedJSON, default={})  # Tool-specific config for this agent
     is_enabled: Mapped[bool] = mapped_column(default=True)
     
     # Relationships
-    agent: Mapped["Agent"] = relationship("Agent", back_populates="agent_tools")
-    tool: Mapped["Tool"] = relationship("Tool", back_populates="agent_tools")
+    agent: Mapped["Agent"] = relationship("Agent", back_populates="agent_tools", lazy="raise")
+    tool: Mapped["Tool"] = relationship("Tool", back_populates="agent_tools", lazy="raise")
 
     def __repr__(self) -> str:
         return f"AgentTool(agent_id={self.agent_id}, tool_id={self.tool_id}, enabled={self.is_enabled})" 
\ No newline at end of file
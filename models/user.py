@@ -16,9 +16,9 @@ class User(BaseModel):
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
     
     # Relationships
-    agents: Mapped[List["Agent"]] = relationship("Agent", back_populates="user", cascade="all, delete-orphan")
-    tools: Mapped[List["Tool"]] = relationship("Tool", back_populates="user", cascade="all, delete-orphan")
-    executions: Mapped[List["Execution"]] = relationship("Execution", back_populates="user", cascade="all, delete-orphan")
+    agents: Mapped[List["Agent"]] = relationship("Agent", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    tools: Mapped[List["Tool"]] = relationship("Tool", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    executions: Mapped[List["Execution"]] = relationship("Execution", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
 
     def __repr__(self) -> str:
         return f"User(id={self.id}, email={self.email}, full_name={self.full_name})" 
\ No newline at end of file
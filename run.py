@@ -1,10 +1,13 @@
 import uvicorn
 
+from core.config import settings
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
-        workers=1
+        workers=1,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
     ) 
\ No newline at end of file
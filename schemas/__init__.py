@@ -15,6 +15,7 @@ from schemas.agent import (
     AgentWithTools,
     AgentWithExecutions,
     AgentComplete,
+    AgentSummary,
 )
 from schemas.tool import (
     Tool,
@@ -24,13 +25,25 @@ from schemas.tool import (
     AgentToolCreate,
     AgentToolUpdate,
     ToolWithAgents,
+    ToolSummary,
 )
 from schemas.execution import (
     Execution,
     ExecutionCreate,
     ExecutionUpdate,
     ExecutionResult,
+    ExecutionOutputChunk,
+    ExecutionSummary,
+    ExecutionInputError,
+    ExecutionBatchItem,
+    ExecutionBatchResult,
+    ExecutionStatusBatch,
+    ExecutionStatusItem,
 )
+from schemas.stats import ExecutionStats
+from schemas.analytics import ExecutionAnalytics, ExecutionBucket
+from schemas.bulk import BulkImportItem, BulkImportResult
+from schemas.configuration import ConfigurationVersion
 
 __all__ = [
     # Base
@@ -52,6 +65,7 @@ __all__ = [
     "AgentWithTools",
     "AgentWithExecutions",
     "AgentComplete",
+    "AgentSummary",
     # Tool
     "Tool",
     "ToolCreate",
@@ -60,9 +74,27 @@ __all__ = [
     "AgentToolCreate",
     "AgentToolUpdate",
     "ToolWithAgents",
+    "ToolSummary",
     # Execution
     "Execution",
     "ExecutionCreate",
     "ExecutionUpdate",
     "ExecutionResult",
+    "ExecutionOutputChunk",
+    "ExecutionSummary",
+    "ExecutionInputError",
+    "ExecutionBatchItem",
+    "ExecutionBatchResult",
+    "ExecutionStatusBatch",
+    "ExecutionStatusItem",
+    # Stats
+    "ExecutionStats",
+    # Analytics
+    "ExecutionAnalytics",
+    "ExecutionBucket",
+    # Bulk import
+    "BulkImportItem",
+    "BulkImportResult",
+    # Configuration history
+    "ConfigurationVersion",
 ] 
\ No newline at end of file
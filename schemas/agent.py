@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional, Dict, List, ForwardRef
 from pydantic import BaseModel, ConfigDict
 
@@ -6,6 +7,7 @@ from schemas.base import BaseSchema, BaseCreateSchema, BaseUpdateSchema
 # Forward references for circular imports
 ToolBase = ForwardRef("ToolBase")
 ExecutionBase = ForwardRef("ExecutionBase")
+ExecutionSummary = ForwardRef("ExecutionSummary")
 
 
 class AgentBase(BaseModel):
@@ -39,17 +41,41 @@ class AgentUpdate(BaseUpdateSchema):
     toolhouse_agent_id: Optional[str] = None
 
 
-class AgentInDBBase(BaseSchema, AgentBase):
-    """Base schema for Agent in DB"""
+class EmbeddedAgent(BaseSchema, AgentBase):
+    """Agent as nested in execution responses, without sync bookkeeping"""
     user_id: int
     toolhouse_agent_id: Optional[str] = None
 
 
+class AgentInDBBase(EmbeddedAgent):
+    """Base schema for Agent in DB"""
+    configuration_hash: Optional[str] = None
+    sync_status: str = "synced"  # pending_sync, synced, sync_failed
+
+
 class Agent(AgentInDBBase):
     """Schema for Agent with relationships"""
     pass
 
 
+class AgentSummary(BaseModel):
+    """Sparse Agent for list views; only the requested `fields` are set"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    status: Optional[str] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    toolhouse_agent_id: Optional[str] = None
+    configuration_hash: Optional[str] = None
+    sync_status: Optional[str] = None
+    configuration: Optional[Dict] = None
+
+
 class AgentWithTools(Agent):
     """Schema for Agent with associated tools"""
     tools: List[ToolBase] = []
@@ -61,14 +87,17 @@ class AgentWithExecutions(Agent):
 
 
 class AgentComplete(Agent):
-    """Complete Agent schema with all relationships"""
-    tools: List[ToolBase] = []
-    executions: List[ExecutionBase] = []
+    """Agent with its tools, most recent executions and execution counts"""
+    tools: List[ToolBase] = []  # enabled tools, configuration merged with the agent's
+    tool_set_version: int = 0
+    executions: List[ExecutionSummary] = []
+    execution_count: int = 0
+    execution_status_counts: Dict[str, int] = {}
 
 
 # Update forward references after all classes are defined
 from schemas.tool import ToolBase  # noqa: E402
-from schemas.execution import ExecutionBase  # noqa: E402
+from schemas.execution import ExecutionBase, ExecutionSummary  # noqa: E402
 
 AgentComplete.model_rebuild()
 AgentWithTools.model_rebuild()
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class ExecutionBucket(BaseModel):
+    """Schema for one time bucket of execution analytics"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "bucket_start": "2024-01-20T12:00:00Z",
+                "count": 120,
+                "failed_count": 6,
+                "failure_rate": 0.05,
+                "average_duration": 12.4,
+                "percentiles": {"p50": 9.8, "p90": 21.0, "p99": 48.3}
+            }
+        }
+    )
+
+    bucket_start: datetime
+    count: int
+    failed_count: int
+    failure_rate: float
+    average_duration: Optional[float] = None  # seconds
+    percentiles: Dict[str, Optional[float]] = {}  # seconds
+
+
+class ExecutionAnalytics(BaseModel):
+    """Schema for bucketed execution analytics"""
+    granularity: str
+    start: datetime
+    end: datetime
+    buckets: List[ExecutionBucket] = []
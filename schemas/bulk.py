@@ -0,0 +1,31 @@
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class BulkImportItem(BaseModel):
+    """Schema for the outcome of one line of a bulk import"""
+    line: int  # 1-based line number in the NDJSON body
+    status: str  # created, invalid or failed
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkImportResult(BaseModel):
+    """Schema for the result of a bulk import"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "created": 2,
+                "failed": 1,
+                "results": [
+                    {"line": 1, "status": "created", "id": 12},
+                    {"line": 2, "status": "invalid", "error": "name: Field required"},
+                    {"line": 3, "status": "created", "id": 13}
+                ]
+            }
+        }
+    )
+
+    created: int = 0
+    failed: int = 0
+    results: List[BulkImportItem] = []
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Dict, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class ConfigurationVersion(BaseModel):
+    """Schema for one recorded version of an agent's or tool's configuration"""
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "version": 3,
+                "configuration_hash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "configuration": {"key": "value"},
+                "created_at": "2024-01-20T12:00:00Z"
+            }
+        }
+    )
+
+    version: int
+    configuration_hash: str
+    configuration: Dict
+    created_at: Optional[datetime] = None
@@ -1,11 +1,11 @@
 from datetime import datetime
-from typing import Optional, Dict, ForwardRef
+from typing import Any, List, Optional, Dict, ForwardRef
 from pydantic import BaseModel, ConfigDict
 
 from schemas.base import BaseSchema, BaseCreateSchema, BaseUpdateSchema
 
 # Forward references for circular imports
-Agent = ForwardRef("Agent")
+EmbeddedAgent = ForwardRef("EmbeddedAgent")
 
 
 class ExecutionBase(BaseModel):
@@ -25,7 +25,12 @@ class ExecutionBase(BaseModel):
 
 
 class ExecutionCreate(BaseCreateSchema, ExecutionBase):
-    """Schema for creating a new execution"""
+    """Schema for creating a new execution
+
+    input_data must satisfy the "input" schema of every enabled tool of
+    the agent that declares one; otherwise the request is rejected
+    with 422 and the list of violations.
+    """
     agent_id: int
 
 
@@ -48,11 +53,32 @@ class ExecutionInDBBase(BaseSchema, ExecutionBase):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     toolhouse_execution_id: Optional[str] = None
+    tool_set_version: Optional[int] = None
 
 
 class Execution(ExecutionInDBBase):
     """Schema for Execution with relationships"""
-    agent: Optional[Agent] = None
+    agent: Optional[EmbeddedAgent] = None
+
+
+class ExecutionSummary(BaseModel):
+    """Sparse Execution for list views; only the requested `fields` are set"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    status: Optional[str] = None
+    agent_id: Optional[int] = None
+    user_id: Optional[int] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+    toolhouse_execution_id: Optional[str] = None
+    input_data: Optional[Dict] = None
+    output_data: Optional[Dict] = None
 
 
 class ExecutionResult(BaseModel):
@@ -77,7 +103,89 @@ class ExecutionResult(BaseModel):
     completed_at: Optional[datetime] = None
 
 
+class ExecutionOutputChunk(BaseModel):
+    """Schema for a chunk of streamed execution output"""
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "seq": 0,
+                "data": {"text": "partial result"},
+                "created_at": "2024-01-20T12:00:00Z"
+            }
+        }
+    )
+
+    seq: int
+    data: Any
+    created_at: datetime
+
+
+class ExecutionInputError(BaseModel):
+    """Schema for a violation of a tool's input schema by input_data"""
+    tool: str
+    path: str  # JSON path within input_data, e.g. $.query
+    message: str
+
+
+class ExecutionBatchItem(BaseModel):
+    """Schema for the outcome of one execution of a batch submission"""
+    index: int  # 0-based position in the submitted list
+    status: str  # created, invalid or rejected
+    id: Optional[int] = None
+    error: Optional[str] = None
+    input_errors: List[ExecutionInputError] = []
+
+
+class ExecutionBatchResult(BaseModel):
+    """Schema for the result of a batch submission"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "created": 1,
+                "failed": 1,
+                "results": [
+                    {"index": 0, "status": "created", "id": 41},
+                    {
+                        "index": 1,
+                        "status": "invalid",
+                        "error": "Input does not match tool schemas",
+                        "input_errors": [
+                            {"tool": "search", "path": "$.query", "message": "'query' is a required property"}
+                        ]
+                    }
+                ]
+            }
+        }
+    )
+
+    created: int = 0
+    failed: int = 0
+    results: List[ExecutionBatchItem] = []
+
+
+class ExecutionStatusBatch(BaseModel):
+    """Schema for a batch status lookup"""
+    model_config = ConfigDict(json_schema_extra={"example": {"ids": [41, 42, 43]}})
+
+    ids: List[int]
+
+
+class ExecutionStatusItem(BaseModel):
+    """Schema for one execution's status in a batch lookup"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {"id": 41, "status": "running", "progress": 0.4, "completed_at": None}
+        }
+    )
+
+    id: int
+    status: str
+    progress: Optional[float] = None  # 0..1; reported by Toolhouse for running executions
+    completed_at: Optional[datetime] = None
+
+
 # Update forward references after all classes are defined
-from schemas.agent import Agent  # noqa: E402
+from schemas.agent import EmbeddedAgent  # noqa: E402
 
 Execution.model_rebuild() 
\ No newline at end of file
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Dict, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class ExecutionStats(BaseModel):
+    """Schema for per-agent or per-tool execution statistics"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "run_count": 42,
+                "status_counts": {"pending": 0, "running": 1, "completed": 38, "failed": 3},
+                "total_duration": 1260.5,
+                "average_duration": 30.7,
+                "last_run_at": "2024-01-20T12:00:00Z"
+            }
+        }
+    )
+
+    run_count: int = 0
+    status_counts: Dict[str, int] = {}
+    total_duration: float = 0.0  # seconds, over finished runs
+    average_duration: Optional[float] = None  # seconds
+    last_run_at: Optional[datetime] = None
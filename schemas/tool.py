@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional, Dict, List, ForwardRef
 from pydantic import BaseModel, ConfigDict
 
@@ -45,6 +46,8 @@ class ToolInDBBase(BaseSchema, ToolBase):
     """Base schema for Tool in DB"""
     user_id: int
     toolhouse_tool_id: Optional[str] = None
+    configuration_hash: Optional[str] = None
+    sync_status: str = "synced"  # pending_sync, synced, sync_failed
 
 
 class Tool(ToolInDBBase):
@@ -52,6 +55,25 @@ class Tool(ToolInDBBase):
     pass
 
 
+class ToolSummary(BaseModel):
+    """Sparse Tool for list views; only the requested `fields` are set"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    version: Optional[str] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    toolhouse_tool_id: Optional[str] = None
+    configuration_hash: Optional[str] = None
+    sync_status: Optional[str] = None
+    schema: Optional[Dict] = None
+    configuration: Optional[Dict] = None
+
+
 class AgentToolBase(BaseModel):
     """Base schema for AgentTool association"""
     model_config = ConfigDict(
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+# Make the application packages importable when running plain `pytest`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import asyncio  # noqa: E402
+from typing import Awaitable, Callable  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+
+@pytest.fixture
+def run_with_db(tmp_path) -> Callable[[Callable[[AsyncSession], Awaitable[None]]], None]:
+    """Run an async scenario against a fresh SQLite database with every table."""
+    import models  # noqa: F401  (registers every table)
+    from db.base import Base
+
+    def run(scenario: Callable[[AsyncSession], Awaitable[None]]) -> None:
+        async def main() -> None:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+            try:
+                async with session_factory() as db:
+                    await scenario(db)
+            finally:
+                await engine.dispose()
+
+        asyncio.run(main())
+
+    return run
@@ -0,0 +1,38 @@
+"""The execution detail row has exactly the fields of its response schema."""
+from db import reads
+from db.archive import archive
+from models.agent import Agent
+from models.execution import Execution
+from models.user import User
+from schemas.agent import EmbeddedAgent
+from schemas.execution import Execution as ExecutionSchema
+
+# Response keys of GET /executions/{id} before rows bypassed the response model
+BASE_FIELDS = {"id", "created_at", "updated_at", "is_active", "description"}
+EXECUTION_KEYS = BASE_FIELDS | {
+    "input_data", "status", "user_id", "agent_id", "output_data", "error_message",
+    "started_at", "completed_at", "toolhouse_execution_id", "agent",
+    "tool_set_version",  # added to the schema along with the column
+}
+AGENT_KEYS = BASE_FIELDS | {"name", "configuration", "status", "user_id", "toolhouse_agent_id"}
+
+
+def test_execution_detail_matches_schema(run_with_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "path", str(tmp_path / "missing-archive.db"))
+
+    async def scenario(db):
+        user = User(email="a@example.com", hashed_password="x", full_name="A")
+        db.add(user)
+        await db.flush()
+        agent = Agent(name="agent", configuration={}, user_id=user.id, configuration_hash="h")
+        db.add(agent)
+        await db.flush()
+        execution = Execution(agent_id=agent.id, user_id=user.id, input_data={"a": 1})
+        db.add(execution)
+        await db.commit()
+
+        row = await reads.get_execution(db, execution.id)
+        assert set(row) == EXECUTION_KEYS == set(ExecutionSchema.model_fields)
+        assert set(row["agent"]) == AGENT_KEYS == set(EmbeddedAgent.model_fields)
+
+    run_with_db(scenario)
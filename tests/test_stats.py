@@ -0,0 +1,119 @@
+"""Tool stats stay the sum of the stats of the agents a tool is enabled on."""
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.stats import (
+    COUNTER_COLUMNS,
+    record_deletion,
+    record_status_change,
+    record_tool_change,
+    tool_enabled,
+)
+from models.agent import Agent
+from models.execution import Execution
+from models.stats import AgentStats, ToolStats
+from models.tool import AgentTool, Tool
+from models.user import User
+
+
+async def _agent_and_tool(db: AsyncSession) -> Tuple[Agent, Tool]:
+    user = User(email="a@example.com", hashed_password="x", full_name="A")
+    db.add(user)
+    await db.flush()
+    agent = Agent(name="agent", configuration={}, user_id=user.id)
+    tool = Tool(name="tool", schema={}, configuration={}, user_id=user.id)
+    db.add_all([agent, tool])
+    await db.flush()
+    return agent, tool
+
+
+async def _attach(db: AsyncSession, agent: Agent, tool: Tool, enabled: bool = True) -> AgentTool:
+    was_enabled = await tool_enabled(db, agent.id, tool.id)
+    agent_tool = AgentTool(agent_id=agent.id, tool_id=tool.id, configuration={}, is_enabled=enabled)
+    db.add(agent_tool)
+    await record_tool_change(db, agent.id, tool.id, was_enabled)
+    return agent_tool
+
+
+async def _set_enabled(db: AsyncSession, agent_tool: AgentTool, enabled: bool) -> None:
+    was_enabled = await tool_enabled(db, agent_tool.agent_id, agent_tool.tool_id)
+    agent_tool.is_enabled = enabled
+    await record_tool_change(db, agent_tool.agent_id, agent_tool.tool_id, was_enabled)
+
+
+async def _detach(db: AsyncSession, agent_tool: AgentTool) -> None:
+    was_enabled = await tool_enabled(db, agent_tool.agent_id, agent_tool.tool_id)
+    await db.delete(agent_tool)
+    await record_tool_change(db, agent_tool.agent_id, agent_tool.tool_id, was_enabled)
+
+
+async def _completed_run(db: AsyncSession, agent: Agent) -> Execution:
+    execution = Execution(agent_id=agent.id, user_id=agent.user_id, input_data={})
+    db.add(execution)
+    await db.flush()
+    await record_status_change(db, execution, None)
+    execution.status = "completed"
+    execution.started_at = datetime(2024, 1, 1)
+    execution.completed_at = execution.started_at + timedelta(seconds=2)
+    await record_status_change(db, execution, "pending")
+    return execution
+
+
+async def _counters(db: AsyncSession, model, key: int) -> dict:
+    stats = await db.get(model, key, populate_existing=True)
+    if stats is None:
+        return {name: 0 for name in COUNTER_COLUMNS}
+    return {name: getattr(stats, name) for name in COUNTER_COLUMNS}
+
+
+async def _assert_zero(db: AsyncSession, agent: Agent, tool: Tool) -> None:
+    assert set((await _counters(db, AgentStats, agent.id)).values()) == {0}
+    assert set((await _counters(db, ToolStats, tool.id)).values()) == {0}
+
+
+def test_detached_tool_returns_to_zero(run_with_db):
+    async def scenario(db):
+        agent, tool = await _agent_and_tool(db)
+        agent_tool = await _attach(db, agent, tool)
+        execution = await _completed_run(db, agent)
+        assert (await _counters(db, ToolStats, tool.id))["completed_count"] == 1
+
+        await _detach(db, agent_tool)
+        assert (await _counters(db, ToolStats, tool.id))["run_count"] == 0
+        await record_deletion(db, execution)
+        await _assert_zero(db, agent, tool)
+
+    run_with_db(scenario)
+
+
+def test_tool_attached_after_run_returns_to_zero(run_with_db):
+    async def scenario(db):
+        agent, tool = await _agent_and_tool(db)
+        execution = await _completed_run(db, agent)
+        await _attach(db, agent, tool)
+        assert (await _counters(db, ToolStats, tool.id))["total_duration"] == 2
+
+        await record_deletion(db, execution)
+        await _assert_zero(db, agent, tool)
+
+    run_with_db(scenario)
+
+
+def test_only_enabled_tools_count(run_with_db):
+    async def scenario(db):
+        agent, tool = await _agent_and_tool(db)
+        agent_tool = await _attach(db, agent, tool, enabled=False)
+        execution = await _completed_run(db, agent)
+        assert (await _counters(db, ToolStats, tool.id))["run_count"] == 0
+
+        await _set_enabled(db, agent_tool, True)
+        # A second association enabling the same tool does not count twice
+        await _attach(db, agent, tool)
+        assert (await _counters(db, ToolStats, tool.id))["run_count"] == 1
+
+        await record_deletion(db, execution)
+        await _assert_zero(db, agent, tool)
+
+    run_with_db(scenario)
@@ -0,0 +1,62 @@
+"""Databases created before columns were added to existing tables can be upgraded."""
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import models  # noqa: F401  (registers every table)
+from db.base import Base
+from db.upgrade_schema import missing_columns, upgrade
+from models.agent import Agent
+from models.execution import Execution
+
+# Columns the series added to tables that already existed, without indexes of their own
+ADDED_COLUMNS = {
+    "agents": ("configuration_hash", "tool_set_version", "sync_status"),
+    "tools": ("configuration_hash", "sync_status"),
+    "executions": ("input_blob", "output_blob", "tool_set_version"),
+}
+
+
+def test_upgrade_adds_missing_columns(tmp_path):
+    async def run() -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/old.db")
+        tables = Base.metadata.sorted_tables
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.exec_driver_sql("DROP INDEX ix_executions_agent_id")
+                for table, columns in ADDED_COLUMNS.items():
+                    for column in columns:
+                        await conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+                await conn.exec_driver_sql(
+                    "INSERT INTO users (email, hashed_password, full_name, is_superuser, is_active) "
+                    "VALUES ('a@example.com', 'x', 'A', 0, 1)"
+                )
+                await conn.exec_driver_sql(
+                    "INSERT INTO agents (name, configuration, status, user_id, is_active) "
+                    "VALUES ('agent', '{}', 'inactive', 1, 1)"
+                )
+                assert len(await missing_columns(conn, tables)) == 8
+
+            async with engine.begin() as conn:
+                added = await upgrade(conn, tables)
+            assert len(added) == 8
+            async with engine.begin() as conn:
+                assert await missing_columns(conn, tables) == []
+                assert await upgrade(conn, tables) == []
+                agent = (await conn.execute(
+                    select(Agent.tool_set_version, Agent.sync_status, Agent.configuration_hash)
+                )).one()
+                assert tuple(agent) == (0, "synced", None)
+                await conn.execute(select(Execution.__table__))
+                indexes = await conn.run_sync(
+                    lambda sync_conn: sync_conn.exec_driver_sql(
+                        "SELECT name FROM sqlite_master WHERE type = 'index'"
+                    ).scalars().all()
+                )
+                assert "ix_executions_agent_id" in indexes
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+"""Soak test: opening and dropping many sockets leaves nothing behind."""
+import asyncio
+import gc
+import tracemalloc
+
+from core.metrics import registry
+from core.websockets import manager
+
+SOCKETS = 100_000
+WAVE = 1_000
+USERS = 100
+# Traced memory allowed to remain after all waves, for allocator noise
+SLACK_BYTES = 256 * 1024
+
+
+class FakeWebSocket:
+    """Just enough of a WebSocket for ConnectionManager."""
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def send_bytes(self, data: bytes) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+async def _wave(first: int) -> None:
+    sockets = []
+    for i in range(first, first + WAVE):
+        websocket = FakeWebSocket()
+        # Every other socket also subscribes to an execution
+        execution_id = i % 500 if i % 2 else None
+        await manager.connect(websocket, user_id=i % USERS, execution_id=execution_id)
+        sockets.append(websocket)
+    assert len(manager.connections) == WAVE
+    for websocket in sockets:
+        await manager.disconnect(websocket)
+
+
+def _gauge(name: str) -> float:
+    return registry.get(name).samples()[0][1]
+
+
+def _assert_empty() -> None:
+    assert manager.connections == {}
+    assert manager.user_connections == {}
+    assert manager.execution_connections == {}
+    for name in ("ws_active_connections", "ws_user_connection_entries", "ws_execution_connection_entries"):
+        assert _gauge(name) == 0, name
+
+
+def test_connect_disconnect_returns_to_baseline():
+    async def soak() -> None:
+        # Warm up so dict tables and caches reach their steady size first
+        await _wave(0)
+        _assert_empty()
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        for first in range(WAVE, SOCKETS + WAVE, WAVE):
+            await _wave(first)
+        _assert_empty()
+        gc.collect()
+        assert tracemalloc.get_traced_memory()[0] - baseline < SLACK_BYTES
+
+    tracemalloc.start()
+    try:
+        asyncio.run(soak())
+    finally:
+        tracemalloc.stop()